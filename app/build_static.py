@@ -0,0 +1,28 @@
+"""
+Build step for the files under app/static, run once per image build (see Dockerfile).
+
+Minifies the files under js/ and css/ into content-hashed copies under dist/,
+with a manifest.json the templates' static_url() resolves names through, then
+writes a brotli (.br) and gzip (.gz) copy next to every text asset, which
+PrecompressedStaticFiles serves without compressing anything per request.
+
+Usage:
+    python -m app.build_static [--directory app/static]
+"""
+import argparse
+
+from app.utils.assets import fingerprint_assets
+from app.utils.compression import precompress_directory
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--directory", default="app/static")
+    args = parser.parse_args()
+
+    manifest = fingerprint_assets(args.directory)
+    print(f"Fingerprinted {len(manifest)} file(s) under {args.directory}")
+    written = precompress_directory(args.directory)
+    print(f"Precompressed {len(written)} file(s) under {args.directory}")
+
+if __name__ == "__main__":
+    main()
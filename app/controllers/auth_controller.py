@@ -1,21 +1,18 @@
 from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import JSONResponse
 from fastapi.security import OAuth2PasswordRequestForm, OAuth2PasswordBearer
 from http import HTTPStatus
+from app.models.principal import Principal
 import datetime
 import jwt
 import os
 
-from app.utils.response import APIResponse
+from app.utils.response import APIResponse, FastJSONResponse
 from app.utils.debug import Debug
 from app.utils.messages import Messages
-from app.utils.db_connect import DBConnect
+from app.utils.unit_of_work import UnitOfWork
 from app.services.user_service import UserService
-from app.utils.common import exception_handler, verify_token
-from app.utils.config import (
-    ACCESS_TOKEN_EXPIRY_MINS, REFRESH_TOKEN_EXPIRY_HOURS,
-    SERVER, DATABASE, DB_USERNAME, DB_PASSWORD, TRUSTED_CONNECTION
-)
+from app.utils.common import exception_handler, verify_token, get_unit_of_work
+from app.utils.config import ACCESS_TOKEN_EXPIRY_MINS, REFRESH_TOKEN_EXPIRY_HOURS
 
 SECRET_KEY = os.getenv("SECRET_KEY")
 ALGORITHM = "HS256"
@@ -26,18 +23,19 @@ router = APIRouter()
 
 @router.post("/token")
 @exception_handler
-async def token(form_data: OAuth2PasswordRequestForm = Depends()):
+async def token(form_data: OAuth2PasswordRequestForm = Depends(), unit_of_work: UnitOfWork = Depends(get_unit_of_work, scope="function")):
     try:
-        with DBConnect(SERVER, DATABASE, TRUSTED_CONNECTION, DB_USERNAME, DB_PASSWORD) as db:
-            cursor = db.connection.cursor()
-            service = UserService(cursor)
-            Debug.log(f"Authenticating user: {form_data.username}")
-            user = await service.authenticate_user(form_data.username, form_data.password)
+        cursor = await unit_of_work.begin()
+        service = UserService(cursor)
+        Debug.log(f"Authenticating user: {form_data.username}")
+        user = await service.authenticate_user(form_data.username, form_data.password)
 
-        # Generate access token
+        # Generate access token, carrying the role so requests can be authorised without a user lookup
         access_token_data = {
             "user_id": user.user_id,
             "username": user.username,
+            "is_admin": user.is_admin,
+            "iat": datetime.datetime.now(datetime.timezone.utc),
             "exp": datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(minutes=ACCESS_TOKEN_EXPIRY_MINS)
         }
         access_token = jwt.encode(access_token_data, SECRET_KEY, algorithm=ALGORITHM)
@@ -59,7 +57,7 @@ async def token(form_data: OAuth2PasswordRequestForm = Depends()):
             )
         )
     
-    return JSONResponse(
+    return FastJSONResponse(
         content={
             "access_token": access_token,
             "refresh_token": refresh_token,
@@ -75,15 +73,23 @@ async def token(form_data: OAuth2PasswordRequestForm = Depends()):
     )
 
 @router.post("/refresh_token")
-async def refresh_token(refresh_token: str = Depends(oauth2_scheme)):
+async def refresh_token(refresh_token: str = Depends(oauth2_scheme), unit_of_work: UnitOfWork = Depends(get_unit_of_work, scope="function")):
     try:
         decoded_token = jwt.decode(refresh_token, SECRET_KEY, algorithms=[ALGORITHM])
         user_id = decoded_token["user_id"]
         username = decoded_token["username"]
 
+        # Role claims come from the current user record, never from the refresh token
+        cursor = await unit_of_work.begin()
+        service = UserService(cursor)
+        Debug.log(f"Refreshing token for user_id: {user_id}")
+        user = await service.get_user_by_id(user_id)
+
         access_token_data = {
             "user_id": user_id,
             "username": username,
+            "is_admin": user.is_admin,
+            "iat": datetime.datetime.now(datetime.timezone.utc),
             "exp": datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(minutes=ACCESS_TOKEN_EXPIRY_MINS)
         }
         access_token = jwt.encode(access_token_data, SECRET_KEY, algorithm=ALGORITHM)
@@ -95,12 +101,6 @@ async def refresh_token(refresh_token: str = Depends(oauth2_scheme)):
         }
         new_refresh_token = jwt.encode(refresh_token_data, SECRET_KEY, algorithm=ALGORITHM)
 
-        with DBConnect(SERVER, DATABASE, TRUSTED_CONNECTION, DB_USERNAME, DB_PASSWORD) as db:
-            cursor = db.connection.cursor()
-            service = UserService(cursor)
-            Debug.log(f"Refreshing token for user_id: {user_id}")
-            user = await service.get_user_by_id(user_id)
-
     except jwt.ExpiredSignatureError:
         raise HTTPException(
             status_code=HTTPStatus.UNAUTHORIZED,
@@ -112,7 +112,7 @@ async def refresh_token(refresh_token: str = Depends(oauth2_scheme)):
             detail=Messages.INVALID_REFRESH_TOKEN
         )
     
-    return JSONResponse(
+    return FastJSONResponse(
         content={
             "access_token": access_token,
             "refresh_token": new_refresh_token,
@@ -129,14 +129,14 @@ async def refresh_token(refresh_token: str = Depends(oauth2_scheme)):
 
 @router.post("/verify_authentication")
 @exception_handler
-async def verify_authentication(token_data: dict = Depends(verify_token)):
+async def verify_authentication(principal: Principal = Depends(verify_token)):
     response_content = {
-        "user_id": token_data["user_id"],
+        "user_id": principal.user_id,
         "message": Messages.TOKEN_VERIFICATION_SUCCESS
     }
-    if "username" in token_data:
-        response_content["username"] = token_data["username"]
-    return JSONResponse(
+    if principal.username is not None:
+        response_content["username"] = principal.username
+    return FastJSONResponse(
         content=response_content,
         status_code=HTTPStatus.OK
     )
\ No newline at end of file
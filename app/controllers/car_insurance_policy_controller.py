@@ -1,125 +1,223 @@
-from fastapi import APIRouter, Depends
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import StreamingResponse
 from http import HTTPStatus
 
-from app.models.car_insurance_policy import CarInsurancePolicy
+from app.models.car_insurance_policy import CarInsurancePolicy, CarInsurancePolicyBatchItem
 from app.models.optional_extra import OptionalExtra
-from app.utils.response import APIResponse
+from app.models.principal import Principal
+from app.utils.response import APIResponse, FastJSONResponse
 from app.utils.debug import Debug
 from app.utils.messages import Messages
-from app.utils.db_connect import DBConnect
-from app.services.car_insurance_policy_service import CarInsurancePolicyService
+from app.utils.db_connect import ConnectionPool
+from app.utils.unit_of_work import UnitOfWork
+from app.utils.async_db import run_blocking
+from app.services.car_insurance_policy_service import CarInsurancePolicyService, POLICY_COLUMNS
+from app.utils.projection import parse_fields
+from app.utils.etag import resource_etag, etag_matches, etag_headers, not_modified
 from app.services.user_service import UserService
-from app.utils.common import validate_required_fields, exception_handler, verify_token
-from app.utils.config import (
-    SERVER, DATABASE, DB_USERNAME, DB_PASSWORD, TRUSTED_CONNECTION
-)
+from app.utils.common import validate_required_fields, exception_handler, verify_token, get_db_pool, get_unit_of_work
 
 router = APIRouter()
 
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv"
+}
+
+# Tables read_car_insurance_policy responses are built from, for its ETag. Users is included
+# because it decides which policies the caller may see.
+READ_POLICY_TABLES = ("CarInsurancePolicy", "CarInsurancePolicyOptionalExtras", "OptionalExtras", "Users")
+
+READ_POLICY_MODES = ("list_all", "by_id", "myself", "filter")
+
 @router.post("/create_car_insurance_policy")
 @exception_handler
 async def create_car_insurance_policy(
     policy: CarInsurancePolicy,
     optional_extras: list[OptionalExtra] = None,
-    token_data: dict = Depends(verify_token)
+    principal: Principal = Depends(verify_token),
+    unit_of_work: UnitOfWork = Depends(get_unit_of_work, scope="function")
 ):
-    with DBConnect(SERVER, DATABASE, TRUSTED_CONNECTION, DB_USERNAME, DB_PASSWORD) as db:
-        cursor = db.connection.cursor()
-        user_service = UserService(cursor)
-        requesting_user = await user_service.get_user_by_id(token_data["user_id"])
-        if not requesting_user.is_admin and policy.user_id != requesting_user.user_id:
-            raise ValueError(
-                APIResponse(
-                    status=HTTPStatus.FORBIDDEN,
-                    message=Messages.USER_NO_PERMISSION,
-                    data=None
-                )
-            )   
-        validate_required_fields({"policy": policy})
-        await policy.validate_car_insurance_policy_values()           
-        service = CarInsurancePolicyService(cursor, requesting_user, policy, optional_extras)
-        policy_id = await service.create_car_insurance_policy()
-        policy.ci_policy_id = policy_id
-
-    return JSONResponse(
+    cursor = await unit_of_work.begin()
+    user_service = UserService(cursor)
+    requesting_user = await user_service.resolve_principal(principal)
+    if not requesting_user.is_admin and policy.user_id != requesting_user.user_id:
+        raise ValueError(
+            APIResponse(
+                status=HTTPStatus.FORBIDDEN,
+                message=Messages.USER_NO_PERMISSION,
+                data=None
+            )
+        )   
+    validate_required_fields({"policy": policy})
+    await policy.validate_car_insurance_policy_values()           
+    service = CarInsurancePolicyService(cursor, requesting_user, policy, optional_extras)
+    policy_id = await service.create_car_insurance_policy()
+    policy.ci_policy_id = policy_id
+
+    return FastJSONResponse(
         content={
             "message": Messages.POLICY_CREATED_SUCCESS,
-            "policy": policy.model_dump(),
-            "optional_extras": [extra.model_dump() for extra in optional_extras] if optional_extras else None
+            "policy": policy,
+            "optional_extras": optional_extras or None
         },
         status_code=HTTPStatus.CREATED
     )
 
+@router.post("/create_car_insurance_policies")
+@exception_handler
+async def create_car_insurance_policies(
+    items: list[CarInsurancePolicyBatchItem],
+    principal: Principal = Depends(verify_token),
+    unit_of_work: UnitOfWork = Depends(get_unit_of_work, scope="function")
+):
+    cursor = await unit_of_work.begin()
+    user_service = UserService(cursor)
+    requesting_user = await user_service.resolve_principal(principal)
+    service = CarInsurancePolicyService(cursor, requesting_user, None, None)
+    results = await service.create_car_insurance_policies(items)
+    created = sum(1 for result in results if result["status"] == HTTPStatus.CREATED)
+
+    return FastJSONResponse(
+        content={
+            "message": Messages.POLICIES_CREATED_SUCCESS.format(created, len(results)),
+            "results": results
+        },
+        status_code=HTTPStatus.CREATED if created == len(results) else HTTPStatus.MULTI_STATUS
+    )
+
 @router.get("/read_car_insurance_policy")
 @exception_handler
 async def read_car_insurance_policy(
+    request: Request,
     mode: str,
     policy_id: int = None,
     field: str = None,
     value: str = None,
-    token_data: dict = Depends(verify_token)
+    limit: int = None,
+    cursor: str = None,
+    fields: str = None,
+    filters: list[str] = Query(None, alias="filter"),
+    principal: Principal = Depends(verify_token),
+    unit_of_work: UnitOfWork = Depends(get_unit_of_work, scope="function")
 ):
     required_fields = {
         "mode": mode,
     }
     if mode == "by_id":
         required_fields["policy_id"] = policy_id
-    elif mode == "filter":
+    elif mode == "filter" and (field is not None or not filters):
         required_fields["field"] = field
         required_fields["value"] = value
     validate_required_fields(required_fields)
+    if mode not in READ_POLICY_MODES:
+        raise ValueError("Invalid mode. Use 'list_all', 'by_id', 'myself' or 'filter'.")
+    # "optional_extras" can be requested alongside the policy columns; leaving it out skips the extras lookup
+    columns = parse_fields(fields, POLICY_COLUMNS + ["optional_extras"], "ci_policy_id")
+    include_extras = columns is None or "optional_extras" in columns
+    if columns is not None:
+        columns = [column for column in columns if column != "optional_extras"]
 
-    with DBConnect(SERVER, DATABASE, TRUSTED_CONNECTION, DB_USERNAME, DB_PASSWORD) as db:
-        cursor = db.connection.cursor()
-        user_service = UserService(cursor)
-        requesting_user = await user_service.get_user_by_id(token_data["user_id"])
-        service = CarInsurancePolicyService(cursor, requesting_user, None, None)
+    db_cursor = await unit_of_work.begin()
+    user_service = UserService(db_cursor)
+    requesting_user = await user_service.resolve_principal(principal)
+    service = CarInsurancePolicyService(db_cursor, requesting_user, None, None)
+    # Authorise before answering a conditional request, so a 304 never stands in for a 403
+    await service.check_read_permissions(mode, policy_id)
+    etag = await resource_etag(request, user_service.db, READ_POLICY_TABLES, requesting_user.user_id)
+    if etag_matches(request, etag):
+        return not_modified(etag)
 
-        if mode == "list_all":
-            policies = await service.list_all_car_insurance_policies()
-        elif mode == "by_id":
-            policies = await service.get_car_insurance_policy_by_id(policy_id, format=True)
-        elif mode == "myself":
-            policies = service.get_car_insurance_policy_by_user_id(requesting_user.user_id)
-        elif mode == "filter":
-            policies = await service.filter_car_insurance_policies(field, value)
-        else:
-            raise ValueError("Invalid mode. Use 'list_all', 'by_id', 'myself' or 'filter'.")
+    if mode == "list_all":
+        policies = await service.list_all_car_insurance_policies(limit, cursor, columns)
+    elif mode == "by_id":
+        policies = await service.get_car_insurance_policy_by_id(policy_id, format=True, fields=columns)
+    elif mode == "myself":
+        policies = await service.get_car_insurance_policy_by_user_id(requesting_user.user_id, columns)
+    else:
+        policies = await service.filter_car_insurance_policies(field, value, limit, cursor, columns, filters)
 
+    if include_extras:
         policies_with_extras = await service.get_policy_extras(policies)
+    else:
+        policies_with_extras = [{"policy": policy} for policy in policies]
 
-    return JSONResponse(
+    return FastJSONResponse(
         content={
             "message": Messages.POLICY_READ_SUCCESS,
-            "policies": policies_with_extras
+            "policies": policies_with_extras,
+            "next_cursor": service.next_cursor
         },
-        status_code=HTTPStatus.OK
+        status_code=HTTPStatus.OK,
+        headers=etag_headers(etag)
+    )
+
+@router.get("/export_car_insurance_policies")
+@exception_handler
+async def export_car_insurance_policies(
+    format: str = "ndjson",
+    principal: Principal = Depends(verify_token),
+    db_pool: ConnectionPool = Depends(get_db_pool)
+):
+    if format not in EXPORT_MEDIA_TYPES:
+        raise ValueError(
+            APIResponse(
+                status=HTTPStatus.BAD_REQUEST,
+                message=Messages.INVALID_EXPORT_FORMAT,
+                data=None
+            )
+        )
+
+    # Authorise up front; once streaming starts the status code can no longer change
+    async with db_pool.connection_async() as db:
+        user_service = UserService(db.connection.cursor())
+        requesting_user = await user_service.resolve_principal(principal)
+        user_service.check_admin(requesting_user)
+
+    return StreamingResponse(
+        stream_policy_export(db_pool, requesting_user, format),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="car_insurance_policies.{format}"'}
     )
 
+async def stream_policy_export(db_pool: ConnectionPool, requesting_user, export_format: str):
+    """
+    Holds a pooled connection for the lifetime of the response body and releases it when
+    the export finishes or the client disconnects.
+    """
+    async with db_pool.connection_async() as db:
+        cursor = db.connection.cursor()
+        service = CarInsurancePolicyService(cursor, requesting_user, None, None)
+        try:
+            async for chunk in service.export_car_insurance_policies(export_format):
+                yield chunk
+        finally:
+            # Discard any unread results before the connection goes back to the pool
+            await run_blocking(cursor.close)
+
 @router.put("/update_car_insurance_policy")
 @exception_handler
 async def update_car_insurance_policy(
     updated_policy: CarInsurancePolicy,
     optional_extras: list[OptionalExtra] = None,
-    token_data: dict = Depends(verify_token)
+    principal: Principal = Depends(verify_token),
+    unit_of_work: UnitOfWork = Depends(get_unit_of_work, scope="function")
 ):
-    with DBConnect(SERVER, DATABASE, TRUSTED_CONNECTION, DB_USERNAME, DB_PASSWORD) as db:
-        cursor = db.connection.cursor()
-        user_service = UserService(cursor)
-        requesting_user = await user_service.get_user_by_id(token_data["user_id"])
-        can_update = user_service.check_update_permissions(requesting_user, updated_policy.user_id, throw_exception=False)
-        validate_required_fields({"updated_policy": updated_policy})
-        await updated_policy.validate_car_insurance_policy_values()
+    cursor = await unit_of_work.begin()
+    user_service = UserService(cursor)
+    requesting_user = await user_service.resolve_principal(principal)
+    can_update = user_service.check_update_permissions(requesting_user, updated_policy.user_id, throw_exception=False)
+    validate_required_fields({"updated_policy": updated_policy})
+    await updated_policy.validate_car_insurance_policy_values()
 
-        service = CarInsurancePolicyService(cursor, requesting_user, updated_policy, optional_extras, can_update)
-        await service.update_car_insurance_policy()
+    service = CarInsurancePolicyService(cursor, requesting_user, updated_policy, optional_extras, can_update)
+    await service.update_car_insurance_policy()
 
-    return JSONResponse(
+    return FastJSONResponse(
         content={
             "message": Messages.POLICY_UPDATED_SUCCESS,
-            "policy": updated_policy.model_dump(),
-            "optional_extras": [extra.model_dump() for extra in optional_extras] if optional_extras else None
+            "policy": updated_policy,
+            "optional_extras": optional_extras or None
         },
         status_code=HTTPStatus.OK
     )
@@ -128,20 +226,20 @@ async def update_car_insurance_policy(
 @exception_handler
 async def delete_car_insurance_policy(
     policy_id: int,
-    token_data: dict = Depends(verify_token)
+    principal: Principal = Depends(verify_token),
+    unit_of_work: UnitOfWork = Depends(get_unit_of_work, scope="function")
 ):
-    with DBConnect(SERVER, DATABASE, TRUSTED_CONNECTION, DB_USERNAME, DB_PASSWORD) as db:
-        cursor = db.connection.cursor()
-        user_service = UserService(cursor)
-        requesting_user = await user_service.get_user_by_id(token_data["user_id"])
-        user_service.check_admin(requesting_user)
-        policy = CarInsurancePolicy(ci_policy_id=policy_id, user_id=0, vrn="", make="", model="", policy_number="", start_date="", end_date="", coverage="")
-        service = CarInsurancePolicyService(cursor, requesting_user, policy, None)
+    cursor = await unit_of_work.begin()
+    user_service = UserService(cursor)
+    requesting_user = await user_service.resolve_principal(principal)
+    user_service.check_admin(requesting_user)
+    policy = CarInsurancePolicy(ci_policy_id=policy_id, user_id=0, vrn="", make="", model="", policy_number="", start_date="", end_date="", coverage="")
+    service = CarInsurancePolicyService(cursor, requesting_user, policy, None)
 
-        await service.check_car_insurance_policy_exists()
-        policy_id = await service.delete_car_insurance_policy()
+    await service.check_car_insurance_policy_exists()
+    policy_id = await service.delete_car_insurance_policy()
 
-    return JSONResponse(
+    return FastJSONResponse(
         content={
             "message": Messages.POLICY_DELETED_SUCCESS,
             "policy_id": policy_id
@@ -1,36 +1,38 @@
-from fastapi import APIRouter, Depends
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Depends, Request
 from http import HTTPStatus
 
 from app.models.optional_extra import OptionalExtra
+from app.models.principal import Principal
+from app.utils.response import FastJSONResponse
 from app.utils.debug import Debug
 from app.utils.messages import Messages
-from app.utils.db_connect import DBConnect
-from app.services.optional_extra_service import OptionalExtraService
+from app.utils.unit_of_work import UnitOfWork
+from app.services.optional_extra_service import OptionalExtraService, OPTIONAL_EXTRA_COLUMNS
+from app.utils.projection import parse_fields
+from app.utils.etag import resource_etag, etag_matches, etag_headers, not_modified
 from app.services.user_service import UserService
-from app.utils.common import validate_required_fields, exception_handler, verify_token
-from app.utils.config import (
-    SERVER, DATABASE, DB_USERNAME, DB_PASSWORD, TRUSTED_CONNECTION
-)
+from app.utils.common import validate_required_fields, exception_handler, verify_token, get_unit_of_work
 
 router = APIRouter()
 
+# Tables read_optional_extra responses are built from, for its ETag
+READ_OPTIONAL_EXTRA_TABLES = ("OptionalExtras",)
+
 @router.post("/create_optional_extra")
 @exception_handler
-async def create_optional_extra(optional_extra: OptionalExtra, token_data: dict = Depends(verify_token)):
-    with DBConnect(SERVER, DATABASE, TRUSTED_CONNECTION, DB_USERNAME, DB_PASSWORD) as db:
-        cursor = db.connection.cursor()
-        user_service = UserService(cursor)
-        requesting_user = await user_service.get_user_by_id(token_data["user_id"])
-        user_service.check_admin(requesting_user)
-        validate_required_fields({"optional_extra": optional_extra})
-        await optional_extra.validate_optional_extra_values()        
-        service = OptionalExtraService(cursor)
-        optional_extra = await service.create_optional_extra(optional_extra)
-    return JSONResponse(
+async def create_optional_extra(optional_extra: OptionalExtra, principal: Principal = Depends(verify_token), unit_of_work: UnitOfWork = Depends(get_unit_of_work, scope="function")):
+    cursor = await unit_of_work.begin()
+    user_service = UserService(cursor)
+    requesting_user = await user_service.resolve_principal(principal)
+    user_service.check_admin(requesting_user)
+    validate_required_fields({"optional_extra": optional_extra})
+    await optional_extra.validate_optional_extra_values()        
+    service = OptionalExtraService(cursor)
+    optional_extra = await service.create_optional_extra(optional_extra)
+    return FastJSONResponse(
         content={
             "message": Messages.OPTIONAL_EXTRA_CREATED_SUCCESS,
-            "optional_extra": optional_extra.model_dump()
+            "optional_extra": optional_extra
         },
         status_code=HTTPStatus.CREATED
     )
@@ -38,9 +40,14 @@ async def create_optional_extra(optional_extra: OptionalExtra, token_data: dict
 @router.get("/read_optional_extra")
 @exception_handler
 async def read_optional_extra(
+    request: Request,
     mode: str,
     extra_id: int = None,
-    token_data: dict = Depends(verify_token)
+    limit: int = None,
+    cursor: str = None,
+    fields: str = None,
+    principal: Principal = Depends(verify_token),
+    unit_of_work: UnitOfWork = Depends(get_unit_of_work, scope="function")
 ):
     required_fields = {
         "mode": mode,
@@ -48,62 +55,66 @@ async def read_optional_extra(
     if mode == "by_id":
         required_fields["extra_id"] = extra_id
     validate_required_fields(required_fields)
-    with DBConnect(SERVER, DATABASE, TRUSTED_CONNECTION, DB_USERNAME, DB_PASSWORD) as db:
-        cursor = db.connection.cursor()
-        service = OptionalExtraService(cursor)
+    if mode not in ("list_all", "by_id"):
+        raise ValueError("Invalid mode. Use 'list_all' or 'by_id'.")
+    columns = parse_fields(fields, OPTIONAL_EXTRA_COLUMNS, "extra_id")
+    db_cursor = await unit_of_work.begin()
+    service = OptionalExtraService(db_cursor)
+    etag = await resource_etag(request, service.db, READ_OPTIONAL_EXTRA_TABLES, principal.user_id)
+    if etag_matches(request, etag):
+        return not_modified(etag)
 
-        if mode == "list_all":
-            optional_extras = await service.list_all_optional_extras()
-        elif mode == "by_id":
-            optional_extras = await service.get_optional_extra_by_id(extra_id, format=True)
-        else:
-            raise ValueError("Invalid mode. Use 'list_all' or 'by_id'.")
+    if mode == "list_all":
+        optional_extras = await service.list_all_optional_extras(limit, cursor, columns)
+    else:
+        optional_extras = await service.get_optional_extra_by_id(extra_id, format=True, fields=columns)
 
-    return JSONResponse(
+    return FastJSONResponse(
         content={
             "message": Messages.OPTIONAL_EXTRA_READ_SUCCESS,
-            "optional_extras": optional_extras
+            "optional_extras": optional_extras,
+            "next_cursor": service.next_cursor
         },
-        status_code=HTTPStatus.OK
+        status_code=HTTPStatus.OK,
+        headers=etag_headers(etag)
     )
 
 @router.put("/update_optional_extra")
 @exception_handler
 async def update_optional_extra(
     updated_optional_extra: OptionalExtra,
-    token_data: dict = Depends(verify_token)
+    principal: Principal = Depends(verify_token),
+    unit_of_work: UnitOfWork = Depends(get_unit_of_work, scope="function")
 ):
-    with DBConnect(SERVER, DATABASE, TRUSTED_CONNECTION, DB_USERNAME, DB_PASSWORD) as db:
-        cursor = db.connection.cursor()
-        user_service = UserService(cursor)
-        requesting_user = await user_service.get_user_by_id(token_data["user_id"])
-        user_service.check_admin(requesting_user)
-        validate_required_fields({"updated_optional_extra": updated_optional_extra})
-        await updated_optional_extra.validate_optional_extra_values()
-        service = OptionalExtraService(cursor)
-        await service.update_optional_extra(updated_optional_extra)
+    cursor = await unit_of_work.begin()
+    user_service = UserService(cursor)
+    requesting_user = await user_service.resolve_principal(principal)
+    user_service.check_admin(requesting_user)
+    validate_required_fields({"updated_optional_extra": updated_optional_extra})
+    await updated_optional_extra.validate_optional_extra_values()
+    service = OptionalExtraService(cursor)
+    await service.update_optional_extra(updated_optional_extra)
 
-    return JSONResponse(
+    return FastJSONResponse(
         content={
             "message": Messages.OPTIONAL_EXTRA_UPDATED_SUCCESS,
-            "optional_extra": updated_optional_extra.model_dump()
+            "optional_extra": updated_optional_extra
         },
         status_code=HTTPStatus.OK
     )
 
 @router.delete("/delete_optional_extra")
 @exception_handler
-async def delete_optional_extra(extra_id: int, token_data: dict = Depends(verify_token)):
-    with DBConnect(SERVER, DATABASE, TRUSTED_CONNECTION, DB_USERNAME, DB_PASSWORD) as db:
-        cursor = db.connection.cursor()
-        user_service = UserService(cursor)
-        requesting_user = await user_service.get_user_by_id(token_data["user_id"])
-        user_service.check_admin(requesting_user) 
-        validate_required_fields({"extra_id": extra_id})               
-        service = OptionalExtraService(cursor)
-        await service.delete_optional_extra(extra_id)
+async def delete_optional_extra(extra_id: int, principal: Principal = Depends(verify_token), unit_of_work: UnitOfWork = Depends(get_unit_of_work, scope="function")):
+    cursor = await unit_of_work.begin()
+    user_service = UserService(cursor)
+    requesting_user = await user_service.resolve_principal(principal)
+    user_service.check_admin(requesting_user) 
+    validate_required_fields({"extra_id": extra_id})               
+    service = OptionalExtraService(cursor)
+    await service.delete_optional_extra(extra_id)
 
-    return JSONResponse(
+    return FastJSONResponse(
         content={
             "message": Messages.OPTIONAL_EXTRA_DELETED_SUCCESS,
             "extra_id": extra_id
@@ -1,23 +1,25 @@
-from fastapi import APIRouter, Depends
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Depends, Request
 from pydantic import BaseModel
 from http import HTTPStatus
 
 from app.models.user import User
-from app.models.car_insurance_policy import CarInsurancePolicy
-from app.utils.response import APIResponse
+from app.models.principal import Principal
+from app.utils.response import APIResponse, FastJSONResponse
 from app.utils.debug import Debug
 from app.utils.messages import Messages
-from app.utils.db_connect import DBConnect
-from app.services.user_service import UserService
-from app.services.car_insurance_policy_service import CarInsurancePolicyService
-from app.utils.common import validate_required_fields, exception_handler, verify_token
-from app.utils.config import (
-    SERVER, DATABASE, DB_USERNAME, DB_PASSWORD, TRUSTED_CONNECTION
-)
+from app.utils.unit_of_work import UnitOfWork
+from app.services.user_service import UserService, USER_COLUMNS
+from app.utils.projection import parse_fields
+from app.utils.etag import resource_etag, etag_matches, etag_headers, not_modified
+from app.utils.common import validate_required_fields, exception_handler, verify_token, get_unit_of_work
 
 router = APIRouter()
 
+# Tables read_user responses are built from, for its ETag
+READ_USER_TABLES = ("Users",)
+
+READ_USER_MODES = ("list_all", "filter", "by_id", "myself")
+
 class UpdateUserPasswordPayload(BaseModel):
     user_id: int
     existing_password: str
@@ -25,20 +27,19 @@ class UpdateUserPasswordPayload(BaseModel):
 
 @router.post("/create_user")
 @exception_handler
-async def create_user(user: User, token_data: dict = Depends(verify_token)):
-    Debug.log(f"Getting user details using user_id: {token_data['user_id']}")    
-    with DBConnect(SERVER, DATABASE, TRUSTED_CONNECTION, DB_USERNAME, DB_PASSWORD) as db:
-        cursor = db.connection.cursor()
-        service = UserService(cursor)
-        requesting_user = await service.get_user_by_id(token_data["user_id"])
-        service.check_admin(requesting_user)
-        validate_required_fields({"user": user})
-        user.validate_user_values()        
-        user = await service.create_user(user)
-    return JSONResponse(
+async def create_user(user: User, principal: Principal = Depends(verify_token), unit_of_work: UnitOfWork = Depends(get_unit_of_work, scope="function")):
+    Debug.log(f"Getting user details using user_id: {principal.user_id}")    
+    cursor = await unit_of_work.begin()
+    service = UserService(cursor)
+    requesting_user = await service.resolve_principal(principal)
+    service.check_admin(requesting_user)
+    validate_required_fields({"user": user})
+    user.validate_user_values()        
+    user = await service.create_user(user)
+    return FastJSONResponse(
         content={
             "message": Messages.USER_CREATED_SUCCESS,
-            "user": user.model_dump()
+            "user": user
         },
         status_code=HTTPStatus.CREATED
     )
@@ -46,11 +47,16 @@ async def create_user(user: User, token_data: dict = Depends(verify_token)):
 @router.get("/read_user")
 @exception_handler
 async def read_user(
+    request: Request,
     mode: str,
     field: str = None,
     value: str = None,
     user_id: int = None,
-    token_data: dict = Depends(verify_token)
+    limit: int = None,
+    cursor: str = None,
+    fields: str = None,
+    principal: Principal = Depends(verify_token),
+    unit_of_work: UnitOfWork = Depends(get_unit_of_work, scope="function")
 ):
     required_fields = {
         "mode": mode,
@@ -61,45 +67,54 @@ async def read_user(
     elif mode == "by_id":
         required_fields["user_id"] = user_id
     validate_required_fields(required_fields)
-    with DBConnect(SERVER, DATABASE, TRUSTED_CONNECTION, DB_USERNAME, DB_PASSWORD) as db:
-        cursor = db.connection.cursor()
-        service = UserService(cursor)
-        requesting_user = await service.get_user_by_id(token_data["user_id"])
-
-        if mode == "list_all":
-            users = await service.list_all_users(requesting_user)
-        elif mode == "filter":
-            users = await service.filter_users(requesting_user, field, value)
-        elif mode == "by_id":
-            users = await service.get_user_by_id(user_id, requesting_user, format=True)
-        elif mode == "myself":
-            users = await service.get_user_by_id(requesting_user.user_id, requesting_user, format=True)
-        else:
-            raise ValueError("Invalid mode. Use 'list_all', 'filter', 'by_id' or 'myself'.")
-    return JSONResponse(
+    if mode not in READ_USER_MODES:
+        raise ValueError("Invalid mode. Use 'list_all', 'filter', 'by_id' or 'myself'.")
+    columns = parse_fields(fields, USER_COLUMNS, "user_id")
+    db_cursor = await unit_of_work.begin()
+    service = UserService(db_cursor)
+    requesting_user = await service.resolve_principal(principal)
+    # Authorise before answering a conditional request, so a 304 never stands in for a 403
+    if mode in ("list_all", "filter"):
+        service.check_admin(requesting_user)
+    elif mode == "by_id":
+        service.check_read_permissions(requesting_user, user_id)
+    etag = await resource_etag(request, service.db, READ_USER_TABLES, requesting_user.user_id)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    if mode == "list_all":
+        users = await service.list_all_users(requesting_user, limit, cursor, columns)
+    elif mode == "filter":
+        users = await service.filter_users(requesting_user, field, value, limit, cursor, columns)
+    elif mode == "by_id":
+        users = await service.get_user_by_id(user_id, requesting_user, format=True, fields=columns)
+    else:
+        users = await service.get_user_by_id(requesting_user.user_id, requesting_user, format=True, fields=columns)
+    return FastJSONResponse(
         content={
             "message": Messages.USER_READ_SUCCESS,
-            "users": users
+            "users": users,
+            "next_cursor": service.next_cursor
         },
-        status_code=HTTPStatus.OK
+        status_code=HTTPStatus.OK,
+        headers=etag_headers(etag)
     )
 
 @router.put("/update_user")
 @exception_handler
-async def update_user(updated_user: User, token_data: dict = Depends(verify_token)):
-    with DBConnect(SERVER, DATABASE, TRUSTED_CONNECTION, DB_USERNAME, DB_PASSWORD) as db:
-        cursor = db.connection.cursor()
-        service = UserService(cursor)
-        requesting_user = await service.get_user_by_id(token_data["user_id"])
-        service.check_update_permissions(requesting_user, updated_user.user_id)
-        validate_required_fields({"updated_user": updated_user})
-        updated_user.validate_user_values()
-        updated_user.password = None        
-        await service.update_user(updated_user)
-    return JSONResponse(
+async def update_user(updated_user: User, principal: Principal = Depends(verify_token), unit_of_work: UnitOfWork = Depends(get_unit_of_work, scope="function")):
+    cursor = await unit_of_work.begin()
+    service = UserService(cursor)
+    requesting_user = await service.resolve_principal(principal)
+    service.check_update_permissions(requesting_user, updated_user.user_id)
+    validate_required_fields({"updated_user": updated_user})
+    updated_user.validate_user_values()
+    updated_user.password = None        
+    await service.update_user(updated_user)
+    return FastJSONResponse(
         content={
             "message": Messages.USER_UPDATED_SUCCESS,
-            "user": updated_user.model_dump()
+            "user": updated_user
         },
         status_code=HTTPStatus.OK
     )
@@ -108,58 +123,58 @@ async def update_user(updated_user: User, token_data: dict = Depends(verify_toke
 @exception_handler
 async def update_user_password(
     payload: UpdateUserPasswordPayload,
-    token_data: dict = Depends(verify_token)
+    principal: Principal = Depends(verify_token),
+    unit_of_work: UnitOfWork = Depends(get_unit_of_work, scope="function")
 ):
-    with DBConnect(SERVER, DATABASE, TRUSTED_CONNECTION, DB_USERNAME, DB_PASSWORD) as db:
-        cursor = db.connection.cursor()
-        service = UserService(cursor)
-        requesting_user = await service.get_user_by_id(token_data["user_id"])
-        service.check_update_permissions(requesting_user, payload.user_id)
-        validate_required_fields({
-            "user_id": payload.user_id,
-            "existing_password": payload.existing_password,
-            "new_password": payload.new_password
-        })
-
-        user = await service.get_user_by_id(payload.user_id, requesting_user, password=True)
-        user_new_password = User(
-            user_id=user.user_id,
-            username=user.username,
-            password=payload.new_password,
-            email=user.email,
-            is_admin=user.is_admin
-        )
-        user_new_password.validate_user_values()
-
-        if payload.existing_password == "":
-            if not requesting_user.is_admin:
-                raise ValueError(
-                    APIResponse(
-                        status=HTTPStatus.FORBIDDEN,
-                        message=Messages.USER_NO_PERMISSION,
-                        data=None
-                    )
+    cursor = await unit_of_work.begin()
+    service = UserService(cursor)
+    requesting_user = await service.resolve_principal(principal)
+    service.check_update_permissions(requesting_user, payload.user_id)
+    validate_required_fields({
+        "user_id": payload.user_id,
+        "existing_password": payload.existing_password,
+        "new_password": payload.new_password
+    })
+
+    user = await service.get_user_by_id(payload.user_id, requesting_user, password=True)
+    user_new_password = User(
+        user_id=user.user_id,
+        username=user.username,
+        password=payload.new_password,
+        email=user.email,
+        is_admin=user.is_admin
+    )
+    user_new_password.validate_user_values()
+
+    if payload.existing_password == "":
+        if not requesting_user.is_admin:
+            raise ValueError(
+                APIResponse(
+                    status=HTTPStatus.FORBIDDEN,
+                    message=Messages.USER_NO_PERMISSION,
+                    data=None
                 )
-        else:
-            if not service.verify_password(payload.existing_password, user.password):
-                raise ValueError(
-                    APIResponse(
-                        status=HTTPStatus.BAD_REQUEST,
-                        message=Messages.USER_INVALID_CREDENTIALS,
-                        data=None
-                    )
+            )
+    else:
+        if not service.verify_password(payload.existing_password, user.password):
+            raise ValueError(
+                APIResponse(
+                    status=HTTPStatus.BAD_REQUEST,
+                    message=Messages.USER_INVALID_CREDENTIALS,
+                    data=None
                 )
-            if payload.new_password == user.password:
-                raise ValueError(
-                    APIResponse(
-                        status=HTTPStatus.BAD_REQUEST,
-                        message=Messages.NO_CHANGE,
-                        data=None
-                    )
+            )
+        if payload.new_password == user.password:
+            raise ValueError(
+                APIResponse(
+                    status=HTTPStatus.BAD_REQUEST,
+                    message=Messages.NO_CHANGE,
+                    data=None
                 )
+            )
 
-        await service.update_user_password(payload.user_id, payload.new_password)
-    return JSONResponse(
+    await service.update_user_password(payload.user_id, payload.new_password)
+    return FastJSONResponse(
         content={
             "message": Messages.USER_PASSWORD_UPDATED_SUCCESS,
             "user_id": payload.user_id
@@ -169,24 +184,16 @@ async def update_user_password(
 
 @router.delete("/delete_user")
 @exception_handler
-async def delete_user(user_id: int, token_data: dict = Depends(verify_token)):
-    with DBConnect(SERVER, DATABASE, TRUSTED_CONNECTION, DB_USERNAME, DB_PASSWORD) as db:
-        cursor = db.connection.cursor()
-        service = UserService(cursor)
-        requesting_user = await service.get_user_by_id(token_data["user_id"])
-        service.check_admin(requesting_user)
-        validate_required_fields({"user_id": user_id})
-
-        # Find and delete all policies and their extras owned by the user before deleting the user
-        first_policy = CarInsurancePolicy(0, "", "", "", "", "", "", "")
-        policy_service = CarInsurancePolicyService(cursor, requesting_user, first_policy)
-        policies = policy_service.get_car_insurance_policy_by_user_id(user_id)
-        for policy in policies:
-            policy_service.policy = policy
-            await policy_service.delete_car_insurance_policy()
-
-        await service.delete_user(user_id)
-    return JSONResponse(
+async def delete_user(user_id: int, principal: Principal = Depends(verify_token), unit_of_work: UnitOfWork = Depends(get_unit_of_work, scope="function")):
+    cursor = await unit_of_work.begin()
+    service = UserService(cursor)
+    requesting_user = await service.resolve_principal(principal)
+    service.check_admin(requesting_user)
+    validate_required_fields({"user_id": user_id})
+
+    # Deletes the user's policies and their extras in the same transaction
+    await service.delete_user(user_id)
+    return FastJSONResponse(
         content={
             "message": Messages.USER_DELETED_SUCCESS,
             "user_id": user_id
@@ -196,18 +203,17 @@ async def delete_user(user_id: int, token_data: dict = Depends(verify_token)):
 
 @router.post("/register_user")
 @exception_handler
-async def register_user(user: User):
+async def register_user(user: User, unit_of_work: UnitOfWork = Depends(get_unit_of_work, scope="function")):
     Debug.log(f"Registering new user: {user.username}")
     validate_required_fields({"user": user})
     user.validate_user_values()
-    with DBConnect(SERVER, DATABASE, TRUSTED_CONNECTION, DB_USERNAME, DB_PASSWORD) as db:
-        cursor = db.connection.cursor()
-        service = UserService(cursor)
-        user = await service.create_user(user)
-    return JSONResponse(
+    cursor = await unit_of_work.begin()
+    service = UserService(cursor)
+    user = await service.create_user(user)
+    return FastJSONResponse(
         content={
             "message": Messages.USER_CREATED_SUCCESS,
-            "user": user.model_dump()
+            "user": user
         },
         status_code=HTTPStatus.CREATED
     )
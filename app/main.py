@@ -1,34 +1,85 @@
 from fastapi import FastAPI, Request
-from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse
+from fastapi.responses import HTMLResponse, RedirectResponse
 from fastapi.templating import Jinja2Templates
-from fastapi.staticfiles import StaticFiles
 from fastapi.exceptions import RequestValidationError
 from fastapi.exception_handlers import RequestValidationError
 
 from starlette.exceptions import HTTPException as StarletteHTTPException
 from dotenv import load_dotenv
+from contextlib import asynccontextmanager
 import os
 from http import HTTPStatus
 
 from .utils.debug import Debug
-from .utils.config import ENV
+from .utils.config import ENV, DB_MIGRATE_ON_STARTUP
 from .utils.messages import Messages
+from .utils.response import FastJSONResponse
+from .utils.compression import CompressionMiddleware
+from .utils.assets import AssetManifest, FingerprintedStaticFiles, STATIC_DIRECTORY, STATIC_URL
+from .utils.page_cache import PageCache
+from .utils.common import get_db_pool, close_db_pool
+from .utils.db_connect import DatabaseConnectionError
+from .utils.async_db import AsyncDatabase, run_blocking, shutdown_db_executor
+from .utils.table_versions import set_versions_table_exists
+from .migrations import run_migrations
+from .services.optional_extra_catalog import optional_extra_catalog
 
 from app.controllers.user_controller import router as user_router
 from app.controllers.optional_extra_controller import router as optional_extra_router
 from app.controllers.car_insurance_policy_controller import router as car_insurance_policy_router
 from app.controllers.auth_controller import router as auth_router
 
-app = FastAPI()
-
-# Mount static files
-app.mount("/app/static", StaticFiles(directory="app/static"), name="static")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Pre-render the pages so no request pays for rendering or compressing them
+    try:
+        page_cache.warm(PAGES)
+    except Exception as e:
+        Debug.log(f"Could not pre-render pages: {e}")
+    # Open the shared connection pool once; every router checks connections out of it
+    try:
+        get_db_pool().open()
+    except DatabaseConnectionError as e:
+        # Keep serving (e.g. /healthcheck); the pool retries on the first checkout
+        Debug.log(f"Could not warm up the connection pool: {e}")
+    else:
+        if DB_MIGRATE_ON_STARTUP:
+            try:
+                async with get_db_pool().connection_async() as db:
+                    applied = await run_blocking(run_migrations, db.connection)
+                Debug.log(f"Applied {len(applied)} schema migration(s)")
+                set_versions_table_exists(True)
+            except Exception as e:
+                Debug.log(f"Could not apply schema migrations: {e}")
+        # Load the optional extras catalog up front; it is loaded lazily if this fails
+        try:
+            async with get_db_pool().connection_async() as db:
+                await optional_extra_catalog.load(AsyncDatabase(db.connection.cursor()))
+        except Exception as e:
+            Debug.log(f"Could not load the optional extras catalog: {e}")
+    yield
+    close_db_pool()
+    shutdown_db_executor()
+
+app = FastAPI(lifespan=lifespan, default_response_class=FastJSONResponse)
+
+# Compress API and page responses for clients that accept brotli or gzip
+app.add_middleware(CompressionMiddleware)
+
+# Mount static files, served from their build-time .br/.gz copies where available
+app.mount(STATIC_URL, FingerprintedStaticFiles(directory=STATIC_DIRECTORY), name="static")
 
 # Set Debug.enabled based on environment
 Debug.enabled = ENV != "prod"
 
-# Set up templates
+# Set up templates; static_url() resolves asset names to their fingerprinted copies
 templates = Jinja2Templates(directory="app/templates")
+assets = AssetManifest(check_sources=ENV != "prod")
+templates.env.globals["static_url"] = assets.url
+
+# The pages don't depend on the request, so each is rendered once (again on edits in development)
+PAGES = ("index.html", "dashboard.html", "admin-dashboard.html", "profile.html")
+page_cache = PageCache(templates, assets, check_sources=ENV != "prod")
 
 # Load environment variables from .env file
 load_dotenv()
@@ -42,7 +93,7 @@ ALGORITHM = "HS256"  # JWT signing algorithm
 
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
-    return JSONResponse(
+    return FastJSONResponse(
         status_code=HTTPStatus.BAD_REQUEST,
         content={
             "message": Messages.INVALID_REQUEST_DATA,
@@ -57,14 +108,14 @@ async def custom_http_exception_handler(request: Request, exc: StarletteHTTPExce
         if "text/html" in accept:
             return RedirectResponse(url="/")
     # fallback to default behavior
-    return JSONResponse(
+    return FastJSONResponse(
         status_code=exc.status_code,
         content={"detail": exc.detail},
     )
 
 @app.get("/healthcheck")
 async def healthcheck():
-    return JSONResponse(
+    return FastJSONResponse(
         content={
             "message": Messages.API_IS_RUNNNG
         },
@@ -78,16 +129,16 @@ app.include_router(car_insurance_policy_router)
 
 @app.get("/", response_class=HTMLResponse)
 async def root(request: Request):
-    return templates.TemplateResponse(request, "index.html", {"request": request})
+    return page_cache.response(request, "index.html")
 
 @app.get("/dashboard", response_class=HTMLResponse)
 async def dashboard(request: Request):
-    return templates.TemplateResponse(request, "dashboard.html", {"request": request})
+    return page_cache.response(request, "dashboard.html")
 
 @app.get("/admin_dashboard", response_class=HTMLResponse)
 async def admin_dashboard(request: Request):
-    return templates.TemplateResponse(request, "admin-dashboard.html", {"request": request})
+    return page_cache.response(request, "admin-dashboard.html")
 
 @app.get("/profile", response_class=HTMLResponse)
 async def profile(request: Request):
-    return templates.TemplateResponse(request, "profile.html", {"request": request})
\ No newline at end of file
+    return page_cache.response(request, "profile.html")
\ No newline at end of file
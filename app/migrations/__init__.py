@@ -0,0 +1,10 @@
+from app.migrations.migrator import Migration, MigrationError, Migrator
+from app.migrations.versions import MIGRATIONS
+
+def run_migrations(connection) -> list[Migration]:
+    """
+    Brings the database behind `connection` up to the latest schema version.
+
+    :return: The migrations applied by this call.
+    """
+    return Migrator(connection, MIGRATIONS).apply()
@@ -0,0 +1,36 @@
+import argparse
+import sys
+
+from app.migrations import MIGRATIONS, MigrationError, Migrator
+from app.utils.config import SERVER, DATABASE, TRUSTED_CONNECTION, DB_USERNAME, DB_PASSWORD
+from app.utils.db_connect import DBConnect, DatabaseConnectionError
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m app.migrations", description="Apply database schema migrations.")
+    parser.add_argument("--status", action="store_true", help="list pending migrations without applying them")
+    args = parser.parse_args(argv)
+
+    try:
+        with DBConnect(SERVER, DATABASE, TRUSTED_CONNECTION, DB_USERNAME, DB_PASSWORD) as db:
+            migrator = Migrator(db.connection, MIGRATIONS)
+            migrator.ensure_version_table()
+            if args.status:
+                pending = migrator.pending()
+                for migration in pending:
+                    print(f"pending  {migration.version:04d} {migration.name}")
+                print(f"{len(pending)} pending migration(s)")
+                return 0
+            applied = migrator.apply()
+            for migration in applied:
+                print(f"applied  {migration.version:04d} {migration.name}")
+            print(f"{len(applied)} migration(s) applied")
+            return 0
+    except (DatabaseConnectionError, MigrationError) as e:
+        print(str(e), file=sys.stderr)
+        return 1
+    except Exception as e:
+        print(f"Migration run failed: {e}", file=sys.stderr)
+        return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+from app.utils.debug import Debug
+
+VERSION_TABLE = "SchemaVersion"
+
+# Serialises concurrent runs, e.g. several workers migrating at startup
+MIGRATION_LOCK = "app_schema_migrations"
+MIGRATION_LOCK_TIMEOUT_MS = 60000
+
+class MigrationError(Exception):
+    def __init__(self, message: str):
+        super().__init__(message)
+
+class Migration:
+    def __init__(self, version: int, name: str, statements: list[str]):
+        """
+        One versioned schema change. Its statements run in a single transaction together with
+        the row recording it in SchemaVersion, so a migration is either fully applied or not
+        at all.
+
+        :param version: Unique, increasing version number.
+        :param name: Short description stored alongside the version.
+        :param statements: T-SQL statements executed in order (no GO separators).
+        """
+        self.version = version
+        self.name = name
+        self.statements = statements
+
+class Migrator:
+    def __init__(self, connection, migrations: list[Migration]):
+        """
+        Applies pending migrations to the database behind a pyodbc connection.
+
+        :param connection: An open pyodbc connection with autocommit disabled.
+        :param migrations: Every known migration; they are applied in version order.
+        """
+        versions = [migration.version for migration in migrations]
+        if len(set(versions)) != len(versions):
+            raise MigrationError("Duplicate migration versions")
+        self.connection = connection
+        self.migrations = sorted(migrations, key=lambda migration: migration.version)
+
+    def ensure_version_table(self):
+        cursor = self.connection.cursor()
+        cursor.execute(f"""
+            IF NOT EXISTS (SELECT * FROM sys.objects WHERE object_id = OBJECT_ID(N'{VERSION_TABLE}') AND type = N'U')
+            BEGIN
+                CREATE TABLE {VERSION_TABLE} (
+                    version INT PRIMARY KEY,
+                    name NVARCHAR(100) NOT NULL,
+                    applied_at DATETIME2 NOT NULL DEFAULT SYSUTCDATETIME()
+                );
+            END
+        """)
+        self.connection.commit()
+
+    def applied_versions(self) -> set:
+        cursor = self.connection.cursor()
+        cursor.execute(f"SELECT version FROM {VERSION_TABLE}")
+        return {row[0] for row in cursor.fetchall()}
+
+    def pending(self) -> list[Migration]:
+        applied = self.applied_versions()
+        return [migration for migration in self.migrations if migration.version not in applied]
+
+    def apply(self) -> list[Migration]:
+        """
+        Applies every pending migration in version order, holding an application lock so only
+        one process migrates at a time.
+
+        :return: The migrations that were applied by this call.
+        :raises MigrationError: If a migration fails; it is rolled back and later ones are skipped.
+        """
+        self.ensure_version_table()
+        self._lock()
+        try:
+            applied = []
+            for migration in self.pending():
+                self._apply_one(migration)
+                applied.append(migration)
+            return applied
+        finally:
+            self._unlock()
+
+    def _apply_one(self, migration: Migration):
+        Debug.log(f"Applying migration {migration.version}: {migration.name}")
+        cursor = self.connection.cursor()
+        try:
+            for statement in migration.statements:
+                cursor.execute(statement)
+            cursor.execute(f"INSERT INTO {VERSION_TABLE} (version, name) VALUES (?, ?)", (migration.version, migration.name))
+            self.connection.commit()
+        except Exception as e:
+            self.connection.rollback()
+            raise MigrationError(f"Migration {migration.version} ({migration.name}) failed: {e}")
+
+    def _lock(self):
+        cursor = self.connection.cursor()
+        cursor.execute(
+            """
+            DECLARE @result INT;
+            EXEC @result = sp_getapplock @Resource = ?, @LockMode = 'Exclusive', @LockOwner = 'Session', @LockTimeout = ?;
+            SELECT @result;
+            """,
+            (MIGRATION_LOCK, MIGRATION_LOCK_TIMEOUT_MS)
+        )
+        if cursor.fetchone()[0] < 0:
+            raise MigrationError("Timed out waiting for another process to finish migrating")
+
+    def _unlock(self):
+        cursor = self.connection.cursor()
+        cursor.execute("EXEC sp_releaseapplock @Resource = ?, @LockOwner = 'Session'", (MIGRATION_LOCK,))
+        self.connection.commit()
@@ -0,0 +1,112 @@
+from app.migrations.migrator import Migration
+from app.utils.table_versions import VERSIONS_TABLE, VERSIONED_TABLES
+
+def create_table(table: str, definition: str) -> str:
+    return f"""
+        IF NOT EXISTS (SELECT * FROM sys.objects WHERE object_id = OBJECT_ID(N'{table}') AND type = N'U')
+        BEGIN
+            CREATE TABLE {table} ({definition});
+        END
+    """
+
+def create_index(name: str, table: str, columns: list[str], include: list[str] = None) -> str:
+    """
+    Creates a nonclustered index unless the table already has an index led by the same
+    column, e.g. the one backing a UNIQUE or PRIMARY KEY constraint.
+    """
+    include_clause = f" INCLUDE ({', '.join(include)})" if include else ""
+    return f"""
+        IF NOT EXISTS (
+            SELECT 1 FROM sys.index_columns
+            WHERE object_id = OBJECT_ID(N'{table}') AND key_ordinal = 1
+                AND COL_NAME(object_id, column_id) = N'{columns[0]}'
+        )
+        BEGIN
+            CREATE NONCLUSTERED INDEX {name} ON {table} ({', '.join(columns)}){include_clause};
+        END
+    """
+
+# Policy columns besides the clustered key, so single-column policy lookups are covered
+POLICY_INCLUDE = ["user_id", "vrn", "make", "model", "policy_number", "start_date", "end_date", "coverage"]
+
+def policy_index(column: str) -> str:
+    return create_index(
+        f"IX_CarInsurancePolicy_{column}",
+        "CarInsurancePolicy",
+        [column],
+        [other for other in POLICY_INCLUDE if other != column]
+    )
+
+def seed_table_versions(tables) -> str:
+    """
+    Adds a change counter row for each table. Counters start from the current time in
+    milliseconds rather than 0, so a recreated database never reissues old ETags.
+    """
+    values = ", ".join(f"(N'{table}')" for table in tables)
+    return f"""
+        INSERT INTO {VERSIONS_TABLE} (table_name, version)
+        SELECT t.table_name, DATEDIFF_BIG(MILLISECOND, '2000-01-01', SYSUTCDATETIME())
+        FROM (VALUES {values}) AS t(table_name)
+        WHERE NOT EXISTS (SELECT 1 FROM {VERSIONS_TABLE} v WHERE v.table_name = t.table_name);
+    """
+
+MIGRATIONS = [
+    # Matches the original setup script, so existing databases adopt it without changes
+    Migration(1, "create_tables", [
+        create_table("Users", """
+            user_id INT PRIMARY KEY IDENTITY(1,1),
+            username NVARCHAR(50) NOT NULL UNIQUE,
+            password NVARCHAR(255) NOT NULL,
+            email NVARCHAR(100) NOT NULL UNIQUE,
+            is_admin BIT NOT NULL
+        """),
+        create_table("CarInsurancePolicy", """
+            ci_policy_id INT PRIMARY KEY IDENTITY(1,1),
+            user_id INT NOT NULL,
+            vrn NVARCHAR(20) NOT NULL,
+            make NVARCHAR(50) NOT NULL,
+            model NVARCHAR(50) NOT NULL,
+            policy_number NVARCHAR(50) NOT NULL UNIQUE,
+            start_date DATE NOT NULL,
+            end_date DATE NOT NULL,
+            coverage NVARCHAR(255) NOT NULL,
+            FOREIGN KEY (user_id) REFERENCES Users(user_id)
+        """),
+        create_table("OptionalExtras", """
+            extra_id INT PRIMARY KEY IDENTITY(1,1),
+            name NVARCHAR(50) NOT NULL UNIQUE,
+            code NVARCHAR(20) NOT NULL UNIQUE,
+            price DECIMAL(10,2) NOT NULL
+        """),
+        create_table("CarInsurancePolicyOptionalExtras", """
+            ci_policy_id INT NOT NULL,
+            extra_id INT NOT NULL,
+            FOREIGN KEY (ci_policy_id) REFERENCES CarInsurancePolicy(ci_policy_id),
+            FOREIGN KEY (extra_id) REFERENCES OptionalExtras(extra_id),
+            PRIMARY KEY (ci_policy_id, extra_id)
+        """),
+    ]),
+    # Indexes for the services' WHERE clauses. Users.username/email, policy_number and the join
+    # table's ci_policy_id are normally already led by their UNIQUE/PRIMARY KEY indexes, in
+    # which case create_index leaves them alone.
+    Migration(2, "add_lookup_indexes", [
+        policy_index("user_id"),
+        policy_index("policy_number"),
+        policy_index("vrn"),
+        create_index("IX_CarInsurancePolicyOptionalExtras_ci_policy_id", "CarInsurancePolicyOptionalExtras", ["ci_policy_id", "extra_id"]),
+        create_index("IX_CarInsurancePolicyOptionalExtras_extra_id", "CarInsurancePolicyOptionalExtras", ["extra_id", "ci_policy_id"]),
+    ]),
+    # Range predicates accepted by the policy filter engine
+    Migration(3, "add_policy_date_indexes", [
+        policy_index("start_date"),
+        policy_index("end_date"),
+    ]),
+    # Per-table change counters behind the read endpoints' ETags
+    Migration(4, "add_table_versions", [
+        create_table(VERSIONS_TABLE, """
+            table_name NVARCHAR(128) PRIMARY KEY,
+            version BIGINT NOT NULL
+        """),
+        seed_table_versions(VERSIONED_TABLES),
+    ]),
+]
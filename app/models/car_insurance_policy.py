@@ -1,11 +1,13 @@
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, TypeAdapter, field_validator
+from datetime import date
 from typing import Optional
 from http import HTTPStatus
 import re
 
 from app.utils.response import APIResponse
 from app.utils.messages import Messages
-from app.utils.field_formatting import capitalise_first
+from app.utils.field_formatting import capitalise_first, date_to_string
+from app.models.optional_extra import OptionalExtra
 
 class CarInsurancePolicy(BaseModel):
     ci_policy_id: Optional[int] = Field(None, alias='ci_policy_id')
@@ -20,17 +22,16 @@ class CarInsurancePolicy(BaseModel):
 
     model_config = ConfigDict(from_attributes=True)
 
-    def __init__(self, user_id: int, vrn: str, make: str, model: str, policy_number: str, start_date: str, end_date: str, coverage: str, ci_policy_id: Optional[int] = None):
-        super().__init__(user_id=user_id, vrn=vrn, make=make, model=model, policy_number=policy_number, start_date=start_date, end_date=end_date, coverage=coverage, ci_policy_id=ci_policy_id)
-        self.ci_policy_id = ci_policy_id
-        self.user_id = user_id
-        self.vrn = vrn.upper()
-        self.make = make
-        self.model = model
-        self.policy_number = policy_number
-        self.start_date = start_date
-        self.end_date = end_date
-        self.coverage = coverage
+    @field_validator("vrn", mode="before")
+    @classmethod
+    def upper_case_vrn(cls, vrn):
+        return vrn.upper() if isinstance(vrn, str) else vrn
+
+    @field_validator("start_date", "end_date", mode="before")
+    @classmethod
+    def format_date(cls, value):
+        # DATE columns arrive as dates; requests already send YYYY-MM-DD strings
+        return date_to_string(value) if isinstance(value, date) else value
 
     async def validate_car_insurance_policy_values(self):
         self._validate_required_fields()
@@ -91,4 +92,14 @@ class CarInsurancePolicy(BaseModel):
         if not re.match(r"^\d{4}-\d{2}-\d{2}$", self.end_date):
             self._raise_validation_error("end date", "must be in YYYY-MM-DD format.")
         if self.start_date > self.end_date:
-            self._raise_validation_error("start date", "must be before end date.")
\ No newline at end of file
+            self._raise_validation_error("start date", "must be before end date.")
+
+class CarInsurancePolicyBatchItem(BaseModel):
+    """
+    One entry of a /create_car_insurance_policies request.
+    """
+    policy: CarInsurancePolicy
+    optional_extras: Optional[list[OptionalExtra]] = None
+
+# Validates a whole page of result rows in one pydantic-core call
+CAR_INSURANCE_POLICY_LIST = TypeAdapter(list[CarInsurancePolicy])
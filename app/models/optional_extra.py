@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, TypeAdapter
 from typing import Optional
 from http import HTTPStatus
 
@@ -13,13 +13,6 @@ class OptionalExtra(BaseModel):
 
     model_config = ConfigDict(from_attributes=True)
 
-    def __init__(self, name: str, code: str, price: float, extra_id: Optional[int] = None):
-        super().__init__(name=name, code=code, price=price, extra_id=extra_id)
-        self.extra_id = extra_id
-        self.name = name
-        self.code = code
-        self.price = price
-
     async def validate_optional_extra_values(self):
         validation_errors = []
         error_field = None
@@ -71,4 +64,7 @@ class OptionalExtra(BaseModel):
         if len(self.code) > 10:
             validation_errors.append("must not be longer than 10 characters.")
         elif not self.code.isalnum():
-            validation_errors.append("must be alphanumeric.")
\ No newline at end of file
+            validation_errors.append("must be alphanumeric.")
+
+# Validates a whole page of result rows in one pydantic-core call; DECIMAL prices become floats
+OPTIONAL_EXTRA_LIST = TypeAdapter(list[OptionalExtra])
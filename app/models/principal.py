@@ -0,0 +1,20 @@
+from pydantic import BaseModel
+from typing import Optional
+
+class Principal(BaseModel):
+    """
+    The authenticated caller as asserted by a verified access token. It carries the same
+    user_id and is_admin attributes the services read from a User, so it can be passed to
+    them directly.
+
+    is_admin is None for tokens issued without role claims; those callers are resolved from
+    the database by UserService.resolve_principal.
+    """
+    user_id: int
+    username: Optional[str] = None
+    is_admin: Optional[bool] = None
+    issued_at: Optional[int] = None
+
+    @property
+    def has_role_claims(self) -> bool:
+        return self.is_admin is not None
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, TypeAdapter
 
 from typing import Optional
 from http import HTTPStatus
@@ -18,9 +18,6 @@ class User(BaseModel):
 
     model_config = ConfigDict(from_attributes=True) 
 
-    def __init__(self, **data):
-        super().__init__(**data)
-    
     def validate_user_values(self):
         Debug.log("Validating user values")
         validation_errors = []
@@ -82,4 +79,7 @@ class User(BaseModel):
             if not isinstance(self.is_admin, (bool, int)) or self.is_admin not in [True, False, 1, 0]:
                 validation_errors.append("must be a boolean value (True/False or 1/0)")
             else:
-                self.is_admin = bool(self.is_admin)
\ No newline at end of file
+                self.is_admin = bool(self.is_admin)
+
+# Validates a whole page of result rows in one pydantic-core call
+USER_LIST = TypeAdapter(list[User])
@@ -1,19 +1,45 @@
 from http import HTTPStatus
-
-from app.models.optional_extra import OptionalExtra
-from app.utils.statements import SelectStatementExecutor, InsertStatementExecutor, DeleteStatementExecutor, UpdateStatementExecutor
+from datetime import date
+import csv
+import io
+from collections.abc import Mapping
+
+from app.models.optional_extra import OPTIONAL_EXTRA_LIST, OptionalExtra
+from app.utils.async_db import AsyncDatabase
+from app.utils.unit_of_work import touch_tables
+from app.utils.pagination import KeysetPage
+from app.utils.projection import project, select_list
+from app.utils.filters import build_where, model_filter_fields, parse_filter
 from app.utils.debug import Debug
-from app.models.car_insurance_policy import CarInsurancePolicy
+from app.models.car_insurance_policy import CAR_INSURANCE_POLICY_LIST, CarInsurancePolicy, CarInsurancePolicyBatchItem
 from app.models.user import User
 from app.utils.response import APIResponse
-from app.utils.field_formatting import dates_to_string
 from app.utils.messages import Messages
+from app.utils.config import EXPORT_BATCH_SIZE, MAX_POLICY_BATCH_SIZE
 from app.services.user_service import UserService
-from app.services.optional_extra_service import OptionalExtraService
+from app.services.optional_extra_catalog import optional_extra_catalog
+
+# SQL Server accepts at most 2100 parameters per statement
+POLICY_EXTRAS_BATCH_SIZE = 1000
+
+POLICY_COLUMNS = list(CarInsurancePolicy.model_fields)
+
+# Whitelisted filter columns, typed as stored (the model keeps dates as strings)
+POLICY_FILTER_FIELDS = model_filter_fields(
+    CarInsurancePolicy,
+    types={"start_date": date, "end_date": date},
+    ranged=("start_date", "end_date")
+)
+
+POLICY_INSERT_COLUMNS = ["user_id", "vrn", "make", "model", "policy_number", "start_date", "end_date", "coverage"]
+
+# Rows per multi-row policy INSERT, keeping each statement under the parameter limit
+POLICY_INSERT_BATCH_SIZE = 2000 // len(POLICY_INSERT_COLUMNS)
 
 class CarInsurancePolicyService:
     def __init__(self, cursor, user: User, policy: CarInsurancePolicy, optional_extras: list[OptionalExtra] = None, can_update: bool = False):
         self.cursor = cursor
+        self.db = AsyncDatabase(cursor)
         self.user = user
         self.user_service = UserService(self.cursor)
         self.policy = policy
@@ -21,33 +47,35 @@ class CarInsurancePolicyService:
         self.current_policy = None
         self.optional_extras = optional_extras or []
         self.current_optional_extras = None
+        self.next_cursor = None
+        # Extras already read alongside a policy, keyed by ci_policy_id
+        self.fetched_policy_extras = {}
 
     async def verify_optional_extras(self, extra_ids):
         if not extra_ids:
             return set()
 
         # Fetch all fields for the provided extra IDs
-        db_extras = self._fetch_optional_extras_from_db(extra_ids)
+        db_extras = await self._fetch_optional_extras_from_db(extra_ids)
 
         # Validate provided optional extras against database results
         valid_extra_ids = self._validate_provided_extras(db_extras)
 
         return valid_extra_ids
 
-    def _fetch_optional_extras_from_db(self, extra_ids):
+    async def _fetch_optional_extras_from_db(self, extra_ids):
         """
-        Fetch optional extras from the database for the given IDs.
+        Fetch optional extras for the given IDs from the in-memory catalog.
         """
-        sql = f"SELECT * FROM OptionalExtras WHERE extra_id IN ({','.join(['?'] * len(extra_ids))})"
         Debug.log(f"Fetching optional extras with IDs: {extra_ids}")
-        return [OptionalExtra(**row) for row in SelectStatementExecutor(self.cursor).execute_select(sql, tuple(extra_ids))]
+        return await optional_extra_catalog.get_many(self.db, list(extra_ids))
 
-    def _validate_provided_extras(self, db_extras):
+    def _validate_provided_extras(self, db_extras, optional_extras=None):
         """
         Validate the provided optional extras against the database results.
         """
         valid_extra_ids = set()
-        for provided_extra in self.optional_extras:
+        for provided_extra in (self.optional_extras if optional_extras is None else optional_extras):
             if any(
                 provided_extra.extra_id == db_extra.extra_id and
                 provided_extra.name == db_extra.name and
@@ -66,7 +94,9 @@ class CarInsurancePolicyService:
             VALUES (?, ?)
         """
         parameters = [(policy_id, extra_id) for extra_id in extra_ids]
-        InsertStatementExecutor(self.cursor).execute_insert_many(sql_add_extras, parameters)
+        await self.db.insert_many(sql_add_extras, parameters)
+        touch_tables("CarInsurancePolicyOptionalExtras")
+        self.fetched_policy_extras.pop(policy_id, None)
 
     async def remove_optional_extras(self, policy_id, extra_ids):
         sql_remove_extras = """
@@ -74,7 +104,9 @@ class CarInsurancePolicyService:
             WHERE ci_policy_id = ? AND extra_id = ?
         """
         parameters = [(policy_id, extra_id) for extra_id in extra_ids]
-        DeleteStatementExecutor(self.cursor).execute_delete_many(sql_remove_extras, parameters)
+        await self.db.delete_many(sql_remove_extras, parameters)
+        touch_tables("CarInsurancePolicyOptionalExtras")
+        self.fetched_policy_extras.pop(policy_id, None)
 
     async def create_car_insurance_policy(self):
         Debug.log(f"Creating car insurance policy with parameters: {self.policy}")
@@ -93,7 +125,8 @@ class CarInsurancePolicyService:
             self.policy.end_date,
             self.policy.coverage
         )
-        self.policy.ci_policy_id = InsertStatementExecutor(self.cursor).execute_insert(sql_create_policy, parameters, False)
+        self.policy.ci_policy_id = await self.db.insert(sql_create_policy, parameters)
+        touch_tables("CarInsurancePolicy")
         
         # Add optional extras if provided
         if self.optional_extras:
@@ -101,11 +134,161 @@ class CarInsurancePolicyService:
             await self.compare_valid_optional_extras(extra_ids)            
             await self.add_optional_extras(self.policy.ci_policy_id, [extra.extra_id for extra in self.optional_extras])
 
-        # commit the transaction
-        self.cursor.commit()
         Debug.log(f"Car insurance policy created with ID: {self.policy.ci_policy_id}")
         return self.policy.ci_policy_id
     
+    async def create_car_insurance_policies(self, items: list[CarInsurancePolicyBatchItem]):
+        """
+        Creates a batch of policies. Every item is validated in memory first; items that fail
+        are reported with their own status and message and the rest are written with one
+        multi-row INSERT per POLICY_INSERT_BATCH_SIZE policies and a single bulk insert of all
+        their optional extras. If the database rejects a chunk's INSERT, only that chunk's
+        items are reported with the error; the statement is rolled back on its own and the
+        other chunks are still written.
+
+        :param items: The policies to create, each with its optional extras.
+        :return: One result per item, in request order, with `index`, `status` and either
+            `policy` and `optional_extras` or `message`.
+        """
+        if not items or len(items) > MAX_POLICY_BATCH_SIZE:
+            raise ValueError(
+                APIResponse(
+                    status=HTTPStatus.BAD_REQUEST,
+                    message=Messages.POLICY_BATCH_SIZE_INVALID.format(MAX_POLICY_BATCH_SIZE),
+                    data=None
+                )
+            )
+
+        results = [None] * len(items)
+
+        def reject(index, status, message):
+            results[index] = {
+                "index": index,
+                "status": status,
+                "policy_number": items[index].policy.policy_number,
+                "message": message
+            }
+
+        def reject_error(index, e):
+            error = e.args[0] if e.args and isinstance(e.args[0], APIResponse) else None
+            reject(index, error.status if error else HTTPStatus.BAD_REQUEST, error.message if error else str(e))
+
+        # Field validation and permissions, entirely in memory
+        pending = []
+        for index, item in enumerate(items):
+            if not self.user.is_admin and item.policy.user_id != self.user.user_id:
+                reject(index, HTTPStatus.FORBIDDEN, Messages.USER_NO_PERMISSION)
+                continue
+            try:
+                await item.policy.validate_car_insurance_policy_values()
+            except ValueError as e:
+                reject_error(index, e)
+                continue
+            pending.append(index)
+
+        # Optional extras, checked against the in-memory catalog
+        catalog_extras = await optional_extra_catalog.get_many(
+            self.db, [extra.extra_id for index in pending for extra in items[index].optional_extras or []]
+        )
+        for index in pending:
+            optional_extras = items[index].optional_extras or []
+            invalid_ids = {extra.extra_id for extra in optional_extras} - self._validate_provided_extras(catalog_extras, optional_extras)
+            if invalid_ids:
+                reject(index, HTTPStatus.BAD_REQUEST, Messages.OPTIONAL_EXTRAS_NOT_FOUND.format(", ".join(map(str, invalid_ids))))
+        pending = [index for index in pending if results[index] is None]
+
+        # Policy numbers must be unique within the batch and against existing policies. The
+        # column's collation is case-insensitive, so "P1" and "p1" are the same number.
+        seen_numbers = set()
+        for index in pending:
+            policy_number = items[index].policy.policy_number.casefold()
+            if policy_number in seen_numbers:
+                reject(index, HTTPStatus.CONFLICT, Messages.DUPLICATION_ERROR)
+            seen_numbers.add(policy_number)
+        pending = [index for index in pending if results[index] is None]
+
+        existing_numbers = await self._select_existing(
+            "SELECT policy_number FROM CarInsurancePolicy WHERE policy_number IN ({})",
+            "policy_number",
+            [items[index].policy.policy_number for index in pending]
+        )
+        existing_numbers = {policy_number.casefold() for policy_number in existing_numbers}
+        for index in pending:
+            if items[index].policy.policy_number.casefold() in existing_numbers:
+                reject(index, HTTPStatus.CONFLICT, Messages.DUPLICATION_ERROR)
+        pending = [index for index in pending if results[index] is None]
+
+        if self.user.is_admin:
+            existing_users = await self._select_existing(
+                "SELECT user_id FROM Users WHERE user_id IN ({})",
+                "user_id",
+                list({items[index].policy.user_id for index in pending})
+            )
+            for index in pending:
+                if items[index].policy.user_id not in existing_users:
+                    reject(index, HTTPStatus.NOT_FOUND, Messages.USER_NOT_FOUND)
+            pending = [index for index in pending if results[index] is None]
+
+        # Insert the remaining policies and map the generated IDs back by policy_number
+        policy_ids = {}
+        for start in range(0, len(pending), POLICY_INSERT_BATCH_SIZE):
+            chunk_indexes = pending[start:start + POLICY_INSERT_BATCH_SIZE]
+            chunk = [items[index].policy for index in chunk_indexes]
+            row_placeholder = "(" + ", ".join("?" for _ in POLICY_INSERT_COLUMNS) + ")"
+            sql_create_policies = f"""
+                INSERT INTO CarInsurancePolicy ({', '.join(POLICY_INSERT_COLUMNS)})
+                OUTPUT INSERTED.ci_policy_id, INSERTED.policy_number
+                VALUES {', '.join(row_placeholder for _ in chunk)}
+            """
+            parameters = tuple(getattr(policy, column) for policy in chunk for column in POLICY_INSERT_COLUMNS)
+            try:
+                rows = await self.db.insert_returning(sql_create_policies, parameters)
+            except ValueError as e:
+                for index in chunk_indexes:
+                    reject_error(index, e)
+                continue
+            policy_ids.update((row["policy_number"].casefold(), row["ci_policy_id"]) for row in rows)
+            touch_tables("CarInsurancePolicy")
+        pending = [index for index in pending if results[index] is None]
+
+        extras_parameters = []
+        for index in pending:
+            policy = items[index].policy
+            policy.ci_policy_id = policy_ids[policy.policy_number.casefold()]
+            extra_ids = dict.fromkeys(extra.extra_id for extra in items[index].optional_extras or [])
+            extras_parameters.extend((policy.ci_policy_id, extra_id) for extra_id in extra_ids)
+            results[index] = {
+                "index": index,
+                "status": HTTPStatus.CREATED,
+                "policy": policy,
+                "optional_extras": items[index].optional_extras or None
+            }
+
+        if extras_parameters:
+            sql_add_extras = """
+                INSERT INTO CarInsurancePolicyOptionalExtras (ci_policy_id, extra_id)
+                VALUES (?, ?)
+            """
+            await self.db.insert_many(sql_add_extras, extras_parameters)
+            touch_tables("CarInsurancePolicyOptionalExtras")
+
+        Debug.log(f"Created {len(pending)} of {len(items)} car insurance policies")
+        return results
+
+    async def _select_existing(self, sql, column, values):
+        """
+        Returns which of `values` are present in `column`, reading in chunks of
+        POLICY_EXTRAS_BATCH_SIZE to stay under the statement parameter limit.
+
+        :param sql: A SELECT with a single "{}" placeholder for the IN list.
+        """
+        found = set()
+        for start in range(0, len(values), POLICY_EXTRAS_BATCH_SIZE):
+            chunk = values[start:start + POLICY_EXTRAS_BATCH_SIZE]
+            rows = await self.db.select(sql.format(", ".join("?" for _ in chunk)), tuple(chunk))
+            found.update(row[column] for row in rows)
+        return found
+
     async def update_car_insurance_policy(self):
         # Check if the policy exists
         await self.check_car_insurance_policy_exists()
@@ -120,19 +303,12 @@ class CarInsurancePolicyService:
         # Update the car insurance policy
         await self.perform_update()
 
-        # Commit the transaction
-        self.cursor.commit()
         Debug.log(f"Car insurance policy updated with ID: {self.policy.ci_policy_id}")
 
     async def check_car_insurance_policy_exists(self):
-        policy = await self.get_car_insurance_policy_by_id(self.policy.ci_policy_id, format=False)
-        dates_to_string(policy[0])
-        self.current_policy = CarInsurancePolicy(**policy[0])
-
-        # set current optional extras
-        sql_get_extras = "SELECT oe.* FROM CarInsurancePolicyOptionalExtras cipoe JOIN OptionalExtras oe ON cipoe.extra_id = oe.extra_id WHERE cipoe.ci_policy_id = ?"
-        result = SelectStatementExecutor(self.cursor).execute_select(sql_get_extras, (self.policy.ci_policy_id))
-        self.current_optional_extras = [OptionalExtra(**row) for row in result]
+        policy, optional_extras = await self.fetch_authorised_policy(self.policy.ci_policy_id)
+        self.current_policy = CarInsurancePolicy.model_validate(policy)
+        self.current_optional_extras = optional_extras
         return self.current_policy
     
     async def check_user_update_permissions(self):
@@ -184,7 +360,8 @@ class CarInsurancePolicyService:
                 self.policy.ci_policy_id
             )
             Debug.log(f"Updating car insurance policy with parameters: {parameters}")
-            UpdateStatementExecutor(self.cursor).execute_update(sql_update_policy, parameters)
+            await self.db.update(sql_update_policy, parameters)
+            touch_tables("CarInsurancePolicy")
 
         if optional_extras_changed:
             await self.update_optional_extras()
@@ -195,7 +372,7 @@ class CarInsurancePolicyService:
 
         if self.optional_extras is not None:
             # Get current optional extras for the policy
-            current_extras = SelectStatementExecutor(self.cursor).execute_select(
+            current_extras = await self.db.select(
                 "SELECT extra_id FROM CarInsurancePolicyOptionalExtras WHERE ci_policy_id = ?", 
                 (self.policy.ci_policy_id)
             )
@@ -222,7 +399,6 @@ class CarInsurancePolicyService:
             invalid_ids = set(extra_ids) - valid_extra_ids
             if invalid_ids:
                 Debug.log(f"Invalid optional extra ID(s): {invalid_ids}")
-                self.cursor.rollback()
                 raise ValueError(
                     APIResponse(
                         status=HTTPStatus.BAD_REQUEST,
@@ -241,27 +417,83 @@ class CarInsurancePolicyService:
         # Check if the policy has any optional extras before deleting
         # This is optional, but it can help in debugging
         # It also ensures that we are not trying to delete something that doesn't exist
-        sql_check_extras = "SELECT oe.* FROM CarInsurancePolicyOptionalExtras cipoe JOIN OptionalExtras oe ON cipoe.extra_id = oe.extra_id WHERE cipoe.ci_policy_id = ?"
-        optional_extras = SelectStatementExecutor(self.cursor).execute_select(sql_check_extras, (self.policy.ci_policy_id))
-        self.optional_extras = [OptionalExtra(**row) for row in optional_extras]
+        if self.current_optional_extras is not None:
+            # Already read by check_car_insurance_policy_exists
+            self.optional_extras = self.current_optional_extras
+        else:
+            sql_check_extras = "SELECT oe.extra_id, oe.name, oe.code, oe.price FROM CarInsurancePolicyOptionalExtras cipoe JOIN OptionalExtras oe ON cipoe.extra_id = oe.extra_id WHERE cipoe.ci_policy_id = ?"
+            optional_extras = await self.db.select(sql_check_extras, (self.policy.ci_policy_id))
+            self.optional_extras = OPTIONAL_EXTRA_LIST.validate_python(optional_extras)
 
-        if optional_extras:
+        if self.optional_extras:
             await self.remove_optional_extras(self.policy.ci_policy_id, [extra.extra_id for extra in self.optional_extras])
 
         # Delete the car insurance policy
         sql_delete_policy = "DELETE FROM CarInsurancePolicy WHERE ci_policy_id = ?"
-        DeleteStatementExecutor(self.cursor).execute_delete(sql_delete_policy, (self.policy.ci_policy_id))
+        await self.db.delete(sql_delete_policy, (self.policy.ci_policy_id))
+        touch_tables("CarInsurancePolicy")
 
         Debug.log(f"Car insurance policy deleted with ID: {self.policy.ci_policy_id}")
         return self.policy.ci_policy_id
 
-    async def list_all_car_insurance_policies(self):
+    async def list_all_car_insurance_policies(self, limit: int = None, cursor: str = None, fields: list = None):
+        """
+        Lists one page of policies ordered by ci_policy_id. The token for the following page is
+        left in self.next_cursor (None on the last page).
+
+        :param fields: Optional sparse fieldset; only these columns are selected and returned.
+        """
         self.user_service.check_admin(self.user)
-        policies = SelectStatementExecutor(self.cursor).execute_select("SELECT * FROM CarInsurancePolicy")
-        return self.format_car_insurance_policies(policies)
+        page = KeysetPage("ci_policy_id", limit, cursor)
+        policies = page.trim(await self.db.select(*page.build_query(select_list(fields or POLICY_COLUMNS), "CarInsurancePolicy")))
+        self.next_cursor = page.next_cursor
+        return self.format_car_insurance_policies(policies, fields)
 
-    async def get_car_insurance_policy_by_id(self, policy_id, format: bool = False):
-        if not self.user.is_admin and not await self.user_service.check_user_owns_policy(self.user, policy_id):
+    async def check_read_permissions(self, mode: str, policy_id: int = None):
+        """
+        Runs the authorisation checks of a read mode without reading the policies, so a
+        conditional read is only answered with 304 when the caller may see the data.
+        Non-admins get 403 for policies they do not own, as fetch_authorised_policy does.
+        """
+        if mode in ("list_all", "filter"):
+            self.user_service.check_admin(self.user)
+        elif mode == "by_id" and not self.user.is_admin:
+            owned = await self.db.select(
+                "SELECT 1 AS is_owner WHERE EXISTS (SELECT 1 FROM CarInsurancePolicy WHERE ci_policy_id = ? AND user_id = ?)",
+                (policy_id, self.user.user_id)
+            )
+            if not owned:
+                raise ValueError(
+                    APIResponse(
+                        status=HTTPStatus.FORBIDDEN,
+                        message=Messages.USER_NO_PERMISSION,
+                        data=None
+                    )
+                )
+        return True
+
+    async def fetch_authorised_policy(self, policy_id):
+        """
+        Reads a policy, whether the requesting user owns it and its optional extras in a single
+        query. Non-admins get 403 for policies they do not own (including missing ones);
+        admins get 404 for missing policies.
+
+        :param policy_id: The ID of the policy to read.
+        :return: (policy row as a dict, list of OptionalExtra)
+        """
+        sql = f"""
+            SELECT {', '.join('p.' + column for column in POLICY_COLUMNS)},
+                CASE WHEN p.user_id = ? THEN 1 ELSE 0 END AS is_owner,
+                oe.extra_id, oe.name, oe.code, oe.price
+            FROM CarInsurancePolicy p
+            LEFT JOIN CarInsurancePolicyOptionalExtras cipoe ON cipoe.ci_policy_id = p.ci_policy_id
+            LEFT JOIN OptionalExtras oe ON oe.extra_id = cipoe.extra_id
+            WHERE p.ci_policy_id = ?
+            ORDER BY oe.extra_id
+        """
+        rows = await self.db.select(sql, (self.user.user_id, policy_id))
+
+        if not self.user.is_admin and not (rows and rows[0]["is_owner"]):
             raise ValueError(
                 APIResponse(
                     status=HTTPStatus.FORBIDDEN,
@@ -269,9 +501,7 @@ class CarInsurancePolicyService:
                     data=None
                 )
             )
-        
-        result = SelectStatementExecutor(self.cursor).execute_select("SELECT * FROM CarInsurancePolicy WHERE ci_policy_id = ?", (policy_id))
-        if not result:
+        if not rows:
             raise ValueError(
                 APIResponse(
                     status=HTTPStatus.NOT_FOUND,
@@ -279,11 +509,20 @@ class CarInsurancePolicyService:
                     data=None
                 )
             )
+
+        policy = {column: rows[0][column] for column in POLICY_COLUMNS}
+        optional_extras = OPTIONAL_EXTRA_LIST.validate_python([row for row in rows if row["extra_id"] is not None])
+        self.fetched_policy_extras[policy_id] = optional_extras
+        return policy, optional_extras
+
+    async def get_car_insurance_policy_by_id(self, policy_id, format: bool = False, fields: list = None):
+        policy, _ = await self.fetch_authorised_policy(policy_id)
+        result = [policy]
         if format:
-            result = self.format_car_insurance_policies(result)
+            result = self.format_car_insurance_policies(result, fields)
         return result
 
-    def get_car_insurance_policy_by_user_id(self, user_id):
+    async def get_car_insurance_policy_by_user_id(self, user_id, fields: list = None):
         if not self.user.is_admin and user_id != self.user.user_id:
             raise ValueError(
                 APIResponse(
@@ -293,52 +532,103 @@ class CarInsurancePolicyService:
                 )
             )
         
-        policies = SelectStatementExecutor(self.cursor).execute_select("SELECT * FROM CarInsurancePolicy WHERE user_id = ?", (user_id))
-        return self.format_car_insurance_policies(policies)
+        policies = await self.db.select(f"SELECT {select_list(fields or POLICY_COLUMNS)} FROM CarInsurancePolicy WHERE user_id = ?", (user_id))
+        return self.format_car_insurance_policies(policies, fields)
+
+    async def filter_car_insurance_policies(self, field, value, limit: int = None, cursor: str = None, fields: list = None, filters: list[str] = None):
+        """
+        Lists one page of policies matching every given predicate.
 
-    async def filter_car_insurance_policies(self, field, value):
+        :param field: Optional column for a simple equality predicate, paired with `value`.
+        :param value: The value `field` must equal.
+        :param filters: Further "field:operator:value" predicates, e.g. "start_date:gte:2025-01-01"
+            or "user_id:in:1,2". Dates accept lt/lte/gt/gte; every field accepts eq and in.
+        """
         self.user_service.check_admin(self.user)
-        sql = f"SELECT * FROM CarInsurancePolicy WHERE {field} = ?"
-        policies = SelectStatementExecutor(self.cursor).execute_select(sql, (value))
-        return self.format_car_insurance_policies(policies)
+        predicates = [(field, "eq", value)] if field is not None else []
+        predicates.extend(parse_filter(expression) for expression in filters or [])
+        where, params = build_where(POLICY_FILTER_FIELDS, predicates)
+        page = KeysetPage("ci_policy_id", limit, cursor)
+        policies = page.trim(await self.db.select(*page.build_query(select_list(fields or POLICY_COLUMNS), "CarInsurancePolicy", where, params)))
+        self.next_cursor = page.next_cursor
+        return self.format_car_insurance_policies(policies, fields)
     
     async def get_policy_extras(self, policies: list[CarInsurancePolicy]):
-        policies_with_extras = []
-        for policy in policies:
-            optional_extras = SelectStatementExecutor(self.cursor).execute_select(
-                """
-                SELECT oe.extra_id, oe.name, oe.code, oe.price
-                FROM CarInsurancePolicyOptionalExtras cipoe
-                JOIN OptionalExtras oe ON cipoe.extra_id = oe.extra_id
-                WHERE cipoe.ci_policy_id = ?
+        """
+        Attach optional extras to a page of policies. The join table is read with one query per
+        chunk of policy IDs; the extras themselves come from the in-memory catalog.
+
+        :param policies: CarInsurancePolicy models, or sparse fieldset rows holding ci_policy_id.
+        :return: {"policy", "optional_extras"} per policy, holding the given policy and
+            catalog models as they are.
+        """
+        policy_keys = [
+            policy["ci_policy_id"] if isinstance(policy, Mapping) else policy.ci_policy_id
+            for policy in policies
+        ]
+        policy_ids = [
+            policy_id for policy_id in dict.fromkeys(policy_keys)
+            if policy_id not in self.fetched_policy_extras
+        ]
+        extras_by_policy = {policy_id: [] for policy_id in policy_ids}
+
+        for start in range(0, len(policy_ids), POLICY_EXTRAS_BATCH_SIZE):
+            chunk = policy_ids[start:start + POLICY_EXTRAS_BATCH_SIZE]
+            rows = await self.db.select(
+                f"""
+                SELECT ci_policy_id, extra_id
+                FROM CarInsurancePolicyOptionalExtras
+                WHERE ci_policy_id IN ({','.join(['?'] * len(chunk))})
                 """,
-                (policy.ci_policy_id)
+                tuple(chunk)
             )
-            extra_service = OptionalExtraService(self.cursor)
-            optional_extras = extra_service.format_optional_extras(optional_extras)
-
-            policies_with_extras.append({
-                "policy": policy.model_dump(),
-                "optional_extras": optional_extras
-            })
-
-        return policies_with_extras        
-
-    def format_car_insurance_policies(self, policies):
-        formatted_policies = []
-        for policy in policies:
-            dates_to_string(policy)  # Ensure date fields are formatted
-            formatted_policies.append(
-                CarInsurancePolicy(
-                    ci_policy_id=policy["ci_policy_id"],
-                    user_id=policy["user_id"],
-                    vrn=policy["vrn"],
-                    make=policy["make"],
-                    model=policy["model"],
-                    policy_number=policy["policy_number"],
-                    start_date=policy["start_date"],
-                    end_date=policy["end_date"],
-                    coverage=policy["coverage"]
+            for row in rows:
+                extras_by_policy[row["ci_policy_id"]].append(row["extra_id"])
+
+        linked_extra_ids = {extra_id for extra_ids in extras_by_policy.values() for extra_id in extra_ids}
+        catalog = {
+            extra.extra_id: extra
+            for extra in await optional_extra_catalog.get_many(self.db, sorted(linked_extra_ids))
+        }
+        return [
+            {
+                "policy": policy,
+                "optional_extras": (
+                    self.fetched_policy_extras[policy_id]
+                    if policy_id in self.fetched_policy_extras
+                    else [catalog[extra_id] for extra_id in sorted(extras_by_policy[policy_id]) if extra_id in catalog]
                 )
-            )
-        return formatted_policies
\ No newline at end of file
+            }
+            for policy, policy_id in zip(policies, policy_keys)
+        ]
+
+    async def export_car_insurance_policies(self, export_format: str, batch_size: int = EXPORT_BATCH_SIZE):
+        """
+        Streams every policy as NDJSON lines or CSV rows, yielding one chunk of text per batch
+        fetched from the cursor so memory use stays flat regardless of table size.
+        Permission checks are the caller's responsibility, since they must happen before the
+        response starts.
+
+        :param export_format: "ndjson" or "csv".
+        :param batch_size: Rows fetched from the database per round trip.
+        """
+        columns = list(CarInsurancePolicy.model_fields)
+        if export_format == "csv":
+            yield ",".join(columns) + "\r\n"
+
+        sql = f"SELECT {', '.join(columns)} FROM CarInsurancePolicy ORDER BY ci_policy_id"
+        async for rows in self.db.iter_select(sql, batch_size=batch_size):
+            policies = self.format_car_insurance_policies(rows)
+            if export_format == "csv":
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+                writer.writerows([getattr(policy, column) for column in columns] for policy in policies)
+                yield buffer.getvalue()
+            else:
+                yield "".join(policy.model_dump_json() + "\n" for policy in policies)
+
+    def format_car_insurance_policies(self, policies, fields: list = None):
+        if fields:
+            # Date columns are serialised by the response class
+            return [project(policy, fields) for policy in policies]
+        return CAR_INSURANCE_POLICY_LIST.validate_python(policies)
\ No newline at end of file
@@ -0,0 +1,122 @@
+import time
+
+from app.models.optional_extra import OPTIONAL_EXTRA_LIST, OptionalExtra
+from app.utils.debug import Debug
+from app.utils.config import OPTIONAL_EXTRAS_CATALOG_MISS_RELOAD_INTERVAL, OPTIONAL_EXTRAS_CATALOG_TTL
+from app.utils.table_versions import observe_table_versions, read_table_versions
+
+CATALOG_TABLE = "OptionalExtras"
+
+class OptionalExtraCatalog:
+    def __init__(self, ttl: float = OPTIONAL_EXTRAS_CATALOG_TTL, miss_reload_interval: float = OPTIONAL_EXTRAS_CATALOG_MISS_RELOAD_INTERVAL):
+        """
+        Process-wide, in-memory copy of the OptionalExtras table keyed by extra_id.
+
+        The table is small and read on every policy create, update and read, so it is loaded
+        once (at startup or on first use) and kept current by the optional extra write paths.
+        A full reload happens after `ttl` seconds, or as soon as any read of the table versions
+        (e.g. for an ETag) sees a newer OptionalExtras version than the one loaded, to pick up
+        writes made by other processes. Looking up an unknown extra_id checks the version first.
+
+        :param ttl: Seconds before the catalog is reloaded from the database.
+        :param miss_reload_interval: Minimum seconds between reloads caused by unknown
+            extra_ids when the table has no change counter to compare.
+        """
+        self.ttl = ttl
+        self.miss_reload_interval = miss_reload_interval
+        self._extras = {}
+        self._loaded_at = None
+        # The OptionalExtras change counter when the catalog was loaded, and the newest one seen since
+        self._version = None
+        self._latest_version = None
+        self._miss_reloaded_at = None
+
+    @property
+    def is_loaded(self):
+        if self._loaded_at is None or time.monotonic() - self._loaded_at >= self.ttl:
+            return False
+        return self._version is None or self._latest_version is None or self._latest_version <= self._version
+
+    def observe_versions(self, versions: dict):
+        """
+        Notes the OptionalExtras version from a read of the table versions, so a newer one
+        makes the next lookup reload.
+        """
+        version = versions.get(CATALOG_TABLE)
+        if version is not None and (self._latest_version is None or version > self._latest_version):
+            self._latest_version = version
+
+    async def load(self, db):
+        """
+        Replaces the catalog with the current contents of OptionalExtras.
+
+        :param db: An AsyncDatabase to read through.
+        """
+        # Read before the rows, so a write committed in between can only make the catalog reload again
+        versions = await read_table_versions(db, (CATALOG_TABLE,))
+        rows = await db.select("SELECT extra_id, name, code, price FROM OptionalExtras")
+        self._extras = {
+            optional_extra.extra_id: optional_extra
+            for optional_extra in OPTIONAL_EXTRA_LIST.validate_python(rows)
+        }
+        self._loaded_at = time.monotonic()
+        self._version = versions.get(CATALOG_TABLE)
+        Debug.log(f"Optional extras catalog loaded with {len(self._extras)} extra(s)")
+
+    async def all(self, db):
+        """
+        Returns every optional extra ordered by extra_id.
+        """
+        if not self.is_loaded:
+            await self.load(db)
+        return [self._extras[extra_id] for extra_id in sorted(self._extras)]
+
+    async def get_many(self, db, extra_ids):
+        """
+        Returns the optional extras for the given IDs, skipping any that do not exist.
+        """
+        if not extra_ids:
+            return []
+        if not self.is_loaded:
+            await self.load(db)
+        elif any(extra_id not in self._extras for extra_id in extra_ids) and await self._changed_since_load(db):
+            await self.load(db)
+        return [self._extras[extra_id] for extra_id in dict.fromkeys(extra_ids) if extra_id in self._extras]
+
+    async def _changed_since_load(self, db) -> bool:
+        """
+        Decides whether an unknown extra_id is worth a reload: only when the OptionalExtras
+        version has moved on since the load or, without a version to compare, at most once
+        per `miss_reload_interval`, so requests naming made-up IDs cannot reload on every call.
+        """
+        if self._version is not None:
+            version = (await read_table_versions(db, (CATALOG_TABLE,))).get(CATALOG_TABLE)
+            if version is not None:
+                return version > self._version
+        now = time.monotonic()
+        if self._miss_reloaded_at is not None and now - self._miss_reloaded_at < self.miss_reload_interval:
+            return False
+        self._miss_reloaded_at = now
+        return True
+
+    def put(self, optional_extra: OptionalExtra):
+        """
+        Records a created or updated optional extra. A catalog that has not been loaded yet
+        is left empty so the next read loads the whole table.
+        """
+        if self._loaded_at is not None:
+            self._extras = {**self._extras, optional_extra.extra_id: optional_extra.model_copy()}
+
+    def remove(self, extra_id: int):
+        if self._loaded_at is not None:
+            self._extras = {key: value for key, value in self._extras.items() if key != extra_id}
+
+    def clear(self):
+        self._extras = {}
+        self._loaded_at = None
+        self._version = None
+        self._latest_version = None
+        self._miss_reloaded_at = None
+
+optional_extra_catalog = OptionalExtraCatalog()
+observe_table_versions(optional_extra_catalog.observe_versions)
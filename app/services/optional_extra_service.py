@@ -1,10 +1,16 @@
 from http import HTTPStatus
 
-from app.utils.statements import InsertStatementExecutor, UpdateStatementExecutor, DeleteStatementExecutor, SelectStatementExecutor
+from app.utils.async_db import AsyncDatabase
+from app.utils.pagination import KeysetPage
+from app.utils.projection import project, select_list
+from app.services.optional_extra_catalog import optional_extra_catalog
+from app.utils.unit_of_work import after_commit, touch_tables
 from app.utils.response import APIResponse
-from app.models.optional_extra import OptionalExtra
+from app.models.optional_extra import OPTIONAL_EXTRA_LIST, OptionalExtra
 from app.utils.messages import Messages
 
+OPTIONAL_EXTRA_COLUMNS = list(OptionalExtra.model_fields)
+
 class OptionalExtraService:
     def __init__(self, cursor):
         """
@@ -13,6 +19,8 @@ class OptionalExtraService:
         :param cursor: A database cursor object for executing queries.
         """
         self.cursor = cursor
+        self.db = AsyncDatabase(cursor)
+        self.next_cursor = None
 
     async def create_optional_extra(self, optional_extra: OptionalExtra):
         """
@@ -21,13 +29,14 @@ class OptionalExtraService:
         :param optional_extra: The OptionalExtra object containing the details to insert.
         :return: The created optional extra with its ID.
         """
-        executor = InsertStatementExecutor(self.cursor)
         sql = """
             INSERT INTO OptionalExtras (name, code, price)
             OUTPUT INSERTED.extra_id
             VALUES (?, ?, ?)
         """
-        optional_extra.extra_id = executor.execute_insert(sql, (optional_extra.name, optional_extra.code, optional_extra.price))
+        optional_extra.extra_id = await self.db.insert(sql, (optional_extra.name, optional_extra.code, optional_extra.price))
+        touch_tables("OptionalExtras")
+        after_commit(lambda: optional_extra_catalog.put(optional_extra))
         return optional_extra
 
     async def update_optional_extra(self, updated_optional_extra: OptionalExtra):
@@ -49,7 +58,7 @@ class OptionalExtraService:
             )
 
         # Check if there are changes
-        existing_optional_extra = OptionalExtra(**existing_optional_extra[0])
+        existing_optional_extra = OptionalExtra.model_validate(existing_optional_extra[0])
         if existing_optional_extra == updated_optional_extra:
             raise ValueError(
                 APIResponse(
@@ -60,13 +69,14 @@ class OptionalExtraService:
             )
 
         # Update the optional extra
-        executor = UpdateStatementExecutor(self.cursor)
         sql = """
             UPDATE OptionalExtras
             SET name = ?, code = ?, price = ?
             WHERE extra_id = ?
         """
-        executor.execute_update(sql, (updated_optional_extra.name, updated_optional_extra.code, updated_optional_extra.price, updated_optional_extra.extra_id))
+        await self.db.update(sql, (updated_optional_extra.name, updated_optional_extra.code, updated_optional_extra.price, updated_optional_extra.extra_id))
+        touch_tables("OptionalExtras")
+        after_commit(lambda: optional_extra_catalog.put(updated_optional_extra))
 
     async def delete_optional_extra(self, extra_id: int):
         """
@@ -87,33 +97,51 @@ class OptionalExtraService:
             )
 
         # Check for related records in CarInsurancePolicyOptionalExtras
-        select_executor = SelectStatementExecutor(self.cursor)
-        related_records = select_executor.execute_select(
-            "SELECT * FROM CarInsurancePolicyOptionalExtras WHERE extra_id = ?", (extra_id,)
+        related_records = await self.db.select(
+            "SELECT 1 AS linked WHERE EXISTS (SELECT 1 FROM CarInsurancePolicyOptionalExtras WHERE extra_id = ?)", (extra_id,)
         )
         if related_records:
             # Delete related joining records first
-            delete_join_executor = DeleteStatementExecutor(self.cursor)
-            delete_join_executor.execute_delete(
+            await self.db.delete(
                 "DELETE FROM CarInsurancePolicyOptionalExtras WHERE extra_id = ?", (extra_id,)
             )
+            touch_tables("CarInsurancePolicyOptionalExtras")
 
         # Delete the optional extra
-        executor = DeleteStatementExecutor(self.cursor)
         sql = "DELETE FROM OptionalExtras WHERE extra_id = ?"
-        executor.execute_delete(sql, (extra_id))
+        await self.db.delete(sql, (extra_id))
+        touch_tables("OptionalExtras")
+        after_commit(lambda: optional_extra_catalog.remove(extra_id))
 
-    async def list_all_optional_extras(self):
-        optional_extras = SelectStatementExecutor(self.cursor).execute_select("SELECT * FROM OptionalExtras")
-        self.error_not_found(optional_extras)
-        return self.format_optional_extras(optional_extras)
+    async def list_all_optional_extras(self, limit: int = None, cursor: str = None, fields: list = None):
+        """
+        Lists one page of optional extras ordered by extra_id, served from the in-memory
+        catalog. The token for the following page is left in self.next_cursor (None on the
+        last page).
 
-    async def get_optional_extra_by_id(self, extra_id, format: bool = False):
-        optional_extra = SelectStatementExecutor(self.cursor).execute_select("SELECT * FROM OptionalExtras WHERE extra_id = ?", (extra_id))
+        :param fields: Optional sparse fieldset; only these fields are returned.
+        """
+        page = KeysetPage("extra_id", limit, cursor)
+        optional_extras = [
+            extra
+            for extra in await optional_extra_catalog.all(self.db)
+            if page.after is None or extra.extra_id > page.after
+        ]
+        optional_extras = page.trim(optional_extras[:page.limit + 1])
+        self.next_cursor = page.next_cursor
+        self.error_not_found(optional_extras)
+        if fields:
+            return [{field: getattr(extra, field) for field in fields} for extra in optional_extras]
+        # The catalog's models are serialised as they are
+        return optional_extras
+
+    async def get_optional_extra_by_id(self, extra_id, format: bool = False, fields: list = None):
+        columns = fields if format and fields else OPTIONAL_EXTRA_COLUMNS
+        optional_extra = await self.db.select(f"SELECT {select_list(columns)} FROM OptionalExtras WHERE extra_id = ?", (extra_id))
         
         self.error_not_found(optional_extra)
         if format:
-            optional_extra = self.format_optional_extras(optional_extra)
+            optional_extra = self.format_optional_extras(optional_extra, fields)
 
         return optional_extra
     
@@ -127,13 +155,15 @@ class OptionalExtraService:
                 )
             )
 
-    def format_optional_extras(self, optional_extras):
-        return [
-            OptionalExtra(
-                extra_id=extra["extra_id"],
-                name=extra["name"],
-                code=extra["code"],
-                price=float(extra["price"])
-            ).model_dump()
-            for extra in optional_extras
-        ]
\ No newline at end of file
+    def format_optional_extras(self, optional_extras, fields: list = None):
+        """
+        Shapes optional extra rows for a response, with price as a float. Full rows become
+        OptionalExtras, validated as one list.
+        """
+        if fields:
+            projected = [project(extra, fields) for extra in optional_extras]
+            if "price" in fields:
+                for extra in projected:
+                    extra["price"] = float(extra["price"])
+            return projected
+        return OPTIONAL_EXTRA_LIST.validate_python(optional_extras)
\ No newline at end of file
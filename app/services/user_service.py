@@ -1,10 +1,19 @@
 from http import HTTPStatus
-from app.utils.statements import InsertStatementExecutor, UpdateStatementExecutor, DeleteStatementExecutor, SelectStatementExecutor
+from app.utils.async_db import AsyncDatabase
+from app.utils.pagination import KeysetPage
+from app.utils.projection import select_list
+from app.utils.cache import user_cache
+from app.utils.auth import token_revocations
+from app.utils.unit_of_work import after_commit, touch_tables
 from app.utils.response import APIResponse
-from app.models.user import User
+from app.models.user import USER_LIST, User
+from app.models.principal import Principal
 from app.utils.debug import Debug  # Import the Debug class
 from app.utils.messages import Messages  # Import the Messages class
 
+# Columns readable through the API; password is only selected when explicitly needed
+USER_COLUMNS = ["user_id", "username", "email", "is_admin"]
+
 class UserService:
     def __init__(self, cursor):
         """
@@ -13,35 +22,61 @@ class UserService:
         :param cursor: A database cursor object for executing queries.
         """
         self.cursor = cursor
+        self.db = AsyncDatabase(cursor)
+        self.next_cursor = None
 
-    async def get_user_by_id(self, user_id: int, requesting_user: User = None, password: bool = False, format: bool = False):
-        if requesting_user and not requesting_user.is_admin and requesting_user.user_id != user_id:
-            raise ValueError(
-                APIResponse(
-                    status=HTTPStatus.FORBIDDEN,
-                    message=Messages.USER_NO_PERMISSION,
-                    data=None
-                )
-            )
+    async def get_user_by_id(self, user_id: int, requesting_user: User = None, password: bool = False, format: bool = False, fields: list = None):
+        if requesting_user:
+            self.check_read_permissions(requesting_user, user_id)
 
-        executor = SelectStatementExecutor(self.cursor)
-        sql = "SELECT * FROM Users WHERE user_id = ?"
-        user_data = executor.execute_select(sql, (user_id))
+        if format:
+            columns = fields or USER_COLUMNS
+        else:
+            columns = (USER_COLUMNS + ["password"]) if password else USER_COLUMNS
+        sql = f"SELECT {select_list(columns)} FROM Users WHERE user_id = ?"
+        user_data = await self.db.select(sql, (user_id))
         self.error_not_found(user_data)
+
+        if format:
+            return self.format_users(user_data, fields)
         # Convert the first row to a User object
         user = User(**user_data[0])
         # If password is not requested, set it to None
         if not password:
             user.password = None
-
-        if format:
-            user = self.format_users([user_data[0]])
         return user
 
+    async def get_requesting_user(self, user_id: int):
+        """
+        Returns the authenticated user making the request, served from the in-process user
+        cache when possible so most requests need no Users lookup.
+
+        :param user_id: The user_id claim from the verified access token.
+        :return: The User, without its password.
+        """
+        user = user_cache.get(user_id)
+        if user is None:
+            user = await self.get_user_by_id(user_id)
+            user_cache.set(user_id, user)
+        return user.model_copy()
+
+    async def resolve_principal(self, principal: Principal) -> Principal:
+        """
+        Returns the caller to authorise a request as. Signed role claims are used as they are,
+        without touching the database, unless the token predates a revocation recorded by
+        update_user or delete_user. Tokens without claims (issued before they were added)
+        and revoked ones fall back to the cached user lookup.
+
+        :param principal: The principal returned by verify_token.
+        """
+        if principal.has_role_claims and not token_revocations.is_revoked(principal.user_id, principal.issued_at):
+            return principal
+        user = await self.get_requesting_user(principal.user_id)
+        return Principal(user_id=user.user_id, username=user.username, is_admin=user.is_admin, issued_at=principal.issued_at)
+
     async def authenticate_user(self, username: str, password: str):
-        executor = SelectStatementExecutor(self.cursor)
-        sql = "SELECT * FROM Users WHERE username = ? AND password = ?"
-        user_data = executor.execute_select(sql, (username, password))
+        sql = f"SELECT {select_list(USER_COLUMNS)} FROM Users WHERE username = ? AND password = ?"
+        user_data = await self.db.select(sql, (username, password))
         if not user_data:
             Debug.log("Invalid credentials")
             raise ValueError(
@@ -62,13 +97,13 @@ class UserService:
         :param user: The User object containing the details to insert.
         :return: The created user with its ID.
         """
-        executor = InsertStatementExecutor(self.cursor)
         sql = """
             INSERT INTO Users (username, password, email, is_admin)
             OUTPUT INSERTED.user_id
             VALUES (?, ?, ?, ?)
         """
-        user.user_id = executor.execute_insert(sql, (user.username, user.password, user.email, user.is_admin))
+        user.user_id = await self.db.insert(sql, (user.username, user.password, user.email, user.is_admin))
+        touch_tables("Users")
         user.password = None  # Do not expose the password in the response
         return user
 
@@ -107,13 +142,14 @@ class UserService:
             )
 
         # Update the user
-        executor = UpdateStatementExecutor(self.cursor)
         sql = """
             UPDATE Users
             SET username = ?, email = ?, is_admin = ?
             WHERE user_id = ?
         """
-        executor.execute_update(sql, (updated_user.username, updated_user.email, updated_user.is_admin, updated_user.user_id))
+        await self.db.update(sql, (updated_user.username, updated_user.email, updated_user.is_admin, updated_user.user_id))
+        touch_tables("Users")
+        after_commit(lambda: self._forget_user(updated_user.user_id))
 
     async def update_user_password(self, user_id: int, new_password: str):
         """
@@ -135,13 +171,15 @@ class UserService:
             )
 
         # Update the user's password
-        executor = UpdateStatementExecutor(self.cursor)
         sql = "UPDATE Users SET password = ? WHERE user_id = ?"
-        executor.execute_update(sql, (new_password, user_id))
+        await self.db.update(sql, (new_password, user_id))
+        touch_tables("Users")
+        after_commit(lambda: user_cache.invalidate(user_id))
 
     async def delete_user(self, user_id: int):
         """
-        Deletes a user from the database.
+        Deletes a user together with their policies and the policies' optional extras, as one
+        transaction of set-based deletes.
 
         :param user_id: The ID of the user to delete.
         """
@@ -157,10 +195,23 @@ class UserService:
                 )
             )
 
-        # Delete the user
-        executor = DeleteStatementExecutor(self.cursor)
-        sql = "DELETE FROM Users WHERE user_id = ?"
-        executor.execute_delete(sql, (user_id))
+        # Delete the user's policy extras, policies and the user itself, children first
+        await self.db.delete(
+            """
+            DELETE FROM CarInsurancePolicyOptionalExtras
+            WHERE ci_policy_id IN (SELECT ci_policy_id FROM CarInsurancePolicy WHERE user_id = ?)
+            """,
+            (user_id,), require_rows=False
+        )
+        await self.db.delete("DELETE FROM CarInsurancePolicy WHERE user_id = ?", (user_id,), require_rows=False)
+        await self.db.delete("DELETE FROM Users WHERE user_id = ?", (user_id,))
+        touch_tables("CarInsurancePolicyOptionalExtras", "CarInsurancePolicy", "Users")
+        after_commit(lambda: self._forget_user(user_id))
+
+    def _forget_user(self, user_id: int):
+        # Drop the cached copy and stop trusting role claims in tokens issued so far
+        user_cache.invalidate(user_id)
+        token_revocations.revoke(user_id)
 
     def check_admin(self, user: User):
         if not user.is_admin:
@@ -173,6 +224,20 @@ class UserService:
             )
         return True
     
+    def check_read_permissions(self, user: User, target_user_id):
+        """
+        Only admins may read other users.
+        """
+        if not user.is_admin and user.user_id != target_user_id:
+            raise ValueError(
+                APIResponse(
+                    status=HTTPStatus.FORBIDDEN,
+                    message=Messages.USER_NO_PERMISSION,
+                    data=None
+                )
+            )
+        return True
+
     def check_update_permissions(self, user: User, target_user_id, throw_exception=True):
         if not user.is_admin and user.user_id != target_user_id:
             if throw_exception:
@@ -188,11 +253,6 @@ class UserService:
                 return False
         return True
     
-    async def check_user_owns_policy(self, user: User, policy_id):
-        sql = "SELECT * FROM CarInsurancePolicy WHERE user_id = ? AND ci_policy_id = ?"
-        result = SelectStatementExecutor(self.cursor).execute_select(sql, (user.user_id, policy_id))
-        return len(result) > 0
-    
     def verify_password(self, existing_password: str, provided_password: str):
         """
         Verifies if the provided password matches the existing password.
@@ -203,13 +263,21 @@ class UserService:
         """
         return existing_password == provided_password
     
-    async def list_all_users(self, requesting_user):
+    async def list_all_users(self, requesting_user, limit: int = None, cursor: str = None, fields: list = None):
+        """
+        Lists one page of users ordered by user_id. The token for the following page is left
+        in self.next_cursor (None on the last page).
+
+        :param fields: Optional sparse fieldset; only these columns are selected and returned.
+        """
         self.check_admin(requesting_user)
-        users = SelectStatementExecutor(self.cursor).execute_select("SELECT * FROM Users")
+        page = KeysetPage("user_id", limit, cursor)
+        users = page.trim(await self.db.select(*page.build_query(select_list(fields or USER_COLUMNS), "Users")))
+        self.next_cursor = page.next_cursor
         self.error_not_found(users)
-        return self.format_users(users)
+        return self.format_users(users, fields)
 
-    async def filter_users(self, requesting_user, field, value):
+    async def filter_users(self, requesting_user, field, value, limit: int = None, cursor: str = None, fields: list = None):
         self.check_admin(requesting_user)
 
         # Validate if the field exists in the Users table
@@ -222,10 +290,12 @@ class UserService:
                     data=None
                 )
             )
-        users = SelectStatementExecutor(self.cursor).execute_select(f"SELECT * FROM Users WHERE {field} = ?", (value))
+        page = KeysetPage("user_id", limit, cursor)
+        users = page.trim(await self.db.select(*page.build_query(select_list(fields or USER_COLUMNS), "Users", f"{field} = ?", (value,))))
+        self.next_cursor = page.next_cursor
         self.error_not_found(users)
 
-        return self.format_users(users)
+        return self.format_users(users, fields)
 
     def error_not_found(self, users):
         if not users:
@@ -237,14 +307,13 @@ class UserService:
                 )
             )
 
-    def format_users(self, users):
-        return [
-            User(
-                user_id=user["user_id"],
-                username=user["username"],
-                password=None,  # Password is not exposed
-                email=user["email"],
-                is_admin=user["is_admin"]
-            ).model_dump()
-            for user in users
-        ]    
\ No newline at end of file
+    def format_users(self, users, fields: list = None):
+        """
+        Shapes user rows for a response. Sparse fieldset rows already hold exactly the
+        selected columns and are returned as they are; full rows become Users,
+        validated as one list.
+        """
+        if fields:
+            return users
+        # Password is not exposed
+        return USER_LIST.validate_python([{**user, "password": None} for user in users])    
\ No newline at end of file
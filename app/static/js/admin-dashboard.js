@@ -1502,7 +1502,7 @@ async function adminApiRequest({ url, method = 'GET', headers = {}, body = null
 }
 
 async function getAllUsers() {
-    const response = await adminApiRequest({ url: '/read_user?mode=list_all' });
+    const response = await window.fetchAllPages('/read_user?mode=list_all', 'users');
     if (response && response.success && response.data && Array.isArray(response.data.users)) {
         return response.data.users;
     }
@@ -1510,21 +1510,21 @@ async function getAllUsers() {
 }
 
 async function getUserWithFilter(field, value) {
-    const response = await adminApiRequest({ url: `/read_user?mode=filter&field=${field}&value=${value}` });
+    const response = await window.fetchAllPages(`/read_user?mode=filter&field=${field}&value=${value}`, 'users');
     if (response && response.success && response.data && Array.isArray(response.data.users)) {
         return response.data.users;
     }
 }
 
 async function getAllCarInsurancePolicies() {
-    const response = await adminApiRequest({ url: '/read_car_insurance_policy?mode=list_all' });
+    const response = await window.fetchAllPages('/read_car_insurance_policy?mode=list_all', 'policies');
     if (response && response.success && response.data && Array.isArray(response.data.policies)) {
         return response.data.policies;
     }
 }
 
 async function getCarInsuranceWithFilter(field, value) {
-    const response = await adminApiRequest({ url: `/read_car_insurance_policy?mode=filter&field=${field}&value=${value}` });
+    const response = await window.fetchAllPages(`/read_car_insurance_policy?mode=filter&field=${field}&value=${value}`, 'policies');
     if (response && response.success && response.data && Array.isArray(response.data.policies)) {
         return response.data.policies;
     }
@@ -239,27 +239,11 @@ async function getUserByMyself() {
 
 // Add this function to main.js
 async function fetchAllOptionalExtras() {
-    const accessToken = localStorage.getItem('access_token');
-    const response = await fetch('/read_optional_extra?mode=list_all', {
-        headers: {
-            'Authorization': `Bearer ${accessToken}`
-        }
-    });
-    if (response.ok) {
-        const data = await response.json();
-        return data.optional_extras || [];
-    } else if (response.status === 401) {
-        // if the token is expired refresh the token
-        const refreshToken = localStorage.getItem('refresh_token');
-        if (refreshToken) {
-            const refreshResponse = await window.refreshToken();
-            if (refreshResponse) {
-                const data = await fetchAllOptionalExtras();
-                return data;
-            }
-        }
-        console.error('Error fetching optional extras:', response.statusText);
+    const response = await fetchAllPages('/read_optional_extra?mode=list_all', 'optional_extras');
+    if (response.success) {
+        return response.data.optional_extras;
     }
+    console.error('Error fetching optional extras:', response.message);
     return null;
 }
 
@@ -344,6 +328,23 @@ async function handleApiResponse({ url, method = 'GET', headers = {}, body = nul
     return { success: false, status: response.status, message: 'Unknown error' };
 }
 
+// List endpoints are paginated; follow next_cursor until every page of `key` is collected
+async function fetchAllPages(url, key) {
+    const separator = url.includes('?') ? '&' : '?';
+    let items = [];
+    let cursor = null;
+    do {
+        const pageUrl = cursor ? `${url}${separator}cursor=${encodeURIComponent(cursor)}` : url;
+        const response = await handleApiResponse({ url: pageUrl });
+        if (!response.success) {
+            return response;
+        }
+        items = items.concat(response.data[key] || []);
+        cursor = response.data.next_cursor;
+    } while (cursor);
+    return { success: true, data: { [key]: items } };
+}
+
 // Refactored API functions for CRUD operations
 async function createCarInsurancePolicy(data) {
     return await handleApiResponse({
@@ -605,4 +606,5 @@ window.createEndDate = createEndDate;
 window.dateToDatabaseFormat = dateToDatabaseFormat;
 window.extractApiErrorMessage = extractApiErrorMessage;
 window.handleApiResponse = handleApiResponse;
+window.fetchAllPages = fetchAllPages;
 window.showSessionExpiredPopup = showSessionExpiredPopup;
\ No newline at end of file
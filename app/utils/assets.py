@@ -0,0 +1,134 @@
+import hashlib
+import json
+import os
+
+import rcssmin
+import rjsmin
+
+from app.utils.compression import PrecompressedStaticFiles
+
+STATIC_URL = "/app/static"
+STATIC_DIRECTORY = "app/static"
+
+# Where the build writes fingerprinted copies and their manifest, relative to STATIC_DIRECTORY
+FINGERPRINT_DIRECTORY = "dist"
+MANIFEST_NAME = "manifest.json"
+
+# Source folders the build minifies and fingerprints
+FINGERPRINTED_FOLDERS = ("js", "css")
+
+# A fingerprinted file's name changes with its content, so it can be cached for good
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+HASH_LENGTH = 10
+
+def minify(name: str, text: str) -> str:
+    """
+    Minifies JavaScript with rjsmin and CSS with rcssmin; other files are returned as is.
+    """
+    if name.endswith(".js"):
+        return rjsmin.jsmin(text)
+    if name.endswith(".css"):
+        return rcssmin.cssmin(text)
+    return text
+
+def fingerprinted_name(name: str, content: bytes) -> str:
+    """
+    Inserts a hash of `content` before the suffix, e.g. js/main.js -> js/main.3f2a9c1b0d.js.
+    """
+    stem, suffix = os.path.splitext(name)
+    return f"{stem}.{hashlib.sha256(content).hexdigest()[:HASH_LENGTH]}{suffix}"
+
+def fingerprint_assets(directory: str = STATIC_DIRECTORY) -> dict:
+    """
+    Build step: writes a minified, content-hashed copy of every file in FINGERPRINTED_FOLDERS
+    under `directory`/dist and the manifest that maps each logical name to its copy.
+    Copies from earlier builds are removed.
+
+    :return: The manifest, e.g. {"js/main.js": "dist/js/main.3f2a9c1b0d.js"}.
+    """
+    output = os.path.join(directory, FINGERPRINT_DIRECTORY)
+    if os.path.isdir(output):
+        for root, _, files in os.walk(output):
+            for name in files:
+                os.remove(os.path.join(root, name))
+
+    manifest = {}
+    for folder in FINGERPRINTED_FOLDERS:
+        for root, _, files in os.walk(os.path.join(directory, folder)):
+            for file_name in sorted(files):
+                source = os.path.join(root, file_name)
+                name = os.path.relpath(source, directory).replace(os.sep, "/")
+                with open(source, encoding="utf-8") as handle:
+                    content = minify(name, handle.read()).encode("utf-8")
+                target = f"{FINGERPRINT_DIRECTORY}/{fingerprinted_name(name, content)}"
+                os.makedirs(os.path.dirname(os.path.join(directory, target)), exist_ok=True)
+                with open(os.path.join(directory, target), "wb") as handle:
+                    handle.write(content)
+                manifest[name] = target
+
+    os.makedirs(output, exist_ok=True)
+    with open(os.path.join(output, MANIFEST_NAME), "w", encoding="utf-8") as handle:
+        json.dump(manifest, handle, indent=2, sort_keys=True)
+    return manifest
+
+class AssetManifest:
+    def __init__(self, directory: str = STATIC_DIRECTORY, url_prefix: str = STATIC_URL, check_sources: bool = False):
+        """
+        Resolves logical static file names, e.g. "js/main.js", to the fingerprinted copies
+        listed in the build manifest. Names missing from the manifest, or every name if there
+        is no manifest, resolve to the file itself.
+
+        :param check_sources: Re-read the manifest when it changes and ignore copies older
+            than their source file, so edits show up in development without a rebuild.
+        """
+        self.directory = directory
+        self.url_prefix = url_prefix
+        self.check_sources = check_sources
+        self.path = os.path.join(directory, FINGERPRINT_DIRECTORY, MANIFEST_NAME)
+        self._entries = None
+        self._mtime = None
+
+    def entries(self) -> dict:
+        if self._entries is None or self.check_sources:
+            try:
+                mtime = os.stat(self.path).st_mtime
+            except OSError:
+                self._entries, self._mtime = {}, None
+                return self._entries
+            if mtime != self._mtime:
+                with open(self.path, encoding="utf-8") as handle:
+                    self._entries = json.load(handle)
+                self._mtime = mtime
+        return self._entries
+
+    def resolve(self, name: str) -> str:
+        """
+        :return: The path to serve for `name`, relative to the static directory.
+        """
+        name = name.lstrip("/")
+        target = self.entries().get(name)
+        if target is None:
+            return name
+        if self.check_sources:
+            try:
+                if os.stat(os.path.join(self.directory, name)).st_mtime > self._mtime:
+                    return name
+            except OSError:
+                pass
+        return target
+
+    def url(self, name: str) -> str:
+        return f"{self.url_prefix}/{self.resolve(name)}"
+
+class FingerprintedStaticFiles(PrecompressedStaticFiles):
+    """
+    Static files whose fingerprinted copies are marked immutable, so browsers never
+    revalidate them. Other files keep the default validators.
+    """
+
+    async def get_response(self, path: str, scope):
+        response = await super().get_response(path, scope)
+        if path.replace(os.sep, "/").startswith(f"{FINGERPRINT_DIRECTORY}/") and response.status_code in (200, 206, 304):
+            response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+        return response
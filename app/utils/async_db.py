@@ -0,0 +1,93 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from itertools import islice
+
+from .debug import Debug
+from app.utils.config import DB_THREAD_POOL_SIZE
+from app.utils.statements import SelectStatementExecutor, InsertStatementExecutor, UpdateStatementExecutor, DeleteStatementExecutor
+
+# Utility: Dedicated thread pool for blocking database calls
+
+_db_executor = None
+_db_executor_lock = threading.Lock()
+
+def get_db_executor() -> ThreadPoolExecutor:
+    """
+    Returns the bounded thread pool that runs blocking pyodbc calls, creating it on first use.
+    It is sized to the connection pool so every checked-out connection can have a worker.
+    """
+    global _db_executor
+    if _db_executor is None:
+        with _db_executor_lock:
+            if _db_executor is None:
+                _db_executor = ThreadPoolExecutor(max_workers=DB_THREAD_POOL_SIZE, thread_name_prefix="db")
+                Debug.log(f"Database thread pool started with {DB_THREAD_POOL_SIZE} worker(s)")
+    return _db_executor
+
+def shutdown_db_executor():
+    """
+    Waits for in-flight database calls and stops the thread pool.
+    """
+    global _db_executor
+    with _db_executor_lock:
+        if _db_executor is not None:
+            _db_executor.shutdown(wait=True)
+            _db_executor = None
+
+async def run_blocking(func, *args, **kwargs):
+    """
+    Runs a blocking callable on the database thread pool so the event loop keeps serving
+    other requests while it waits.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_db_executor(), partial(func, *args, **kwargs))
+
+class AsyncDatabase:
+    def __init__(self, cursor):
+        """
+        Awaitable facade over the statement executors for a single cursor.
+
+        Calls for one cursor are awaited one after another, so the underlying connection is
+        never used by two threads at the same time.
+
+        :param cursor: A database cursor object for executing queries.
+        """
+        self.cursor = cursor
+
+    async def select(self, query, params=None):
+        return await run_blocking(SelectStatementExecutor(self.cursor).execute_select, query, params)
+
+    async def iter_select(self, query, params=None, batch_size=500):
+        """
+        Async counterpart of SelectStatementExecutor.iter_select. Yields lists of up to
+        `batch_size` rows, one thread pool hop per batch rather than per row.
+        """
+        rows = SelectStatementExecutor(self.cursor).iter_select(query, params, batch_size)
+        try:
+            while True:
+                batch = await run_blocking(lambda: list(islice(rows, batch_size)))
+                if not batch:
+                    break
+                yield batch
+        finally:
+            await run_blocking(rows.close)
+
+    async def insert(self, query, params=None, **kwargs):
+        return await run_blocking(InsertStatementExecutor(self.cursor).execute_insert, query, params, **kwargs)
+
+    async def insert_returning(self, query, params=None):
+        return await run_blocking(InsertStatementExecutor(self.cursor).execute_insert_returning, query, params)
+
+    async def insert_many(self, query, params=None):
+        return await run_blocking(InsertStatementExecutor(self.cursor).execute_insert_many, query, params)
+
+    async def update(self, query, params=None, **kwargs):
+        return await run_blocking(UpdateStatementExecutor(self.cursor).execute_update, query, params, **kwargs)
+
+    async def delete(self, query, params=None, **kwargs):
+        return await run_blocking(DeleteStatementExecutor(self.cursor).execute_delete, query, params, **kwargs)
+
+    async def delete_many(self, query, params=None, **kwargs):
+        return await run_blocking(DeleteStatementExecutor(self.cursor).execute_delete_many, query, params, **kwargs)
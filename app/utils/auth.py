@@ -1,7 +1,10 @@
 from fastapi.security import OAuth2PasswordBearer
 from fastapi import Request, HTTPException
 from http import HTTPStatus
+import threading
+import time
 from .messages import Messages
+from .config import ACCESS_TOKEN_EXPIRY_MINS
 
 class CustomOAuth2PasswordBearer(OAuth2PasswordBearer):
     async def __call__(self, request: Request) -> str:
@@ -14,3 +17,45 @@ class CustomOAuth2PasswordBearer(OAuth2PasswordBearer):
         return await super().__call__(request)
 
 oauth2_scheme = CustomOAuth2PasswordBearer(tokenUrl="token")
+
+class TokenRevocations:
+    def __init__(self, retention: float):
+        """
+        Records when a user's role claims stopped being trustworthy, e.g. because they were
+        demoted or deleted. Access tokens issued at or before that moment are treated as if
+        they carried no claims, so the caller is looked up in the database again.
+
+        Entries only need to outlive the access tokens issued before them, so they are
+        dropped after `retention` seconds. The registry is per process; other workers rely
+        on the short access token lifetime.
+
+        :param retention: Seconds a revocation is kept, at least the access token lifetime.
+        """
+        self.retention = retention
+        self._revoked_at = {}
+        self._lock = threading.Lock()
+
+    def revoke(self, user_id: int):
+        now = time.time()
+        with self._lock:
+            self._revoked_at = {
+                key: revoked_at for key, revoked_at in self._revoked_at.items()
+                if now - revoked_at < self.retention
+            }
+            self._revoked_at[user_id] = now
+
+    def is_revoked(self, user_id: int, issued_at: int = None) -> bool:
+        """
+        Whether claims issued at `issued_at` (epoch seconds) for `user_id` were revoked.
+        Tokens without an issue time cannot be checked and count as revoked.
+        """
+        revoked_at = self._revoked_at.get(user_id)
+        if revoked_at is None or time.time() - revoked_at >= self.retention:
+            return False
+        return issued_at is None or issued_at <= revoked_at
+
+    def clear(self):
+        with self._lock:
+            self._revoked_at = {}
+
+token_revocations = TokenRevocations(ACCESS_TOKEN_EXPIRY_MINS * 60)
@@ -0,0 +1,67 @@
+import threading
+import time
+from collections import OrderedDict
+
+from app.utils.config import USER_CACHE_MAX_SIZE, USER_CACHE_TTL, TOKEN_CACHE_MAX_SIZE, TOKEN_CACHE_TTL
+
+class TTLCache:
+    def __init__(self, max_size: int, ttl: float):
+        """
+        Thread-safe in-process cache whose entries expire `ttl` seconds after being stored.
+        Once `max_size` entries are held, the least recently used one is evicted.
+
+        :param max_size: Maximum number of entries kept.
+        :param ttl: Lifetime of an entry in seconds.
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Returns the cached value for `key`, or None if it is missing or has expired.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl: float = None):
+        """
+        Stores `value` for `ttl` seconds, capped at the cache's own ttl.
+        """
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if self.max_size <= 0 or ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+# Authenticated users keyed by user_id. Entries are dropped explicitly whenever UserService
+# changes or deletes a user; the TTL bounds staleness from writes made by other processes.
+user_cache = TTLCache(USER_CACHE_MAX_SIZE, USER_CACHE_TTL)
+
+# Verified access token claims keyed by a digest of the token. Each entry expires no later
+# than the token's own exp claim.
+token_cache = TTLCache(TOKEN_CACHE_MAX_SIZE, TOKEN_CACHE_TTL)
@@ -1,6 +1,9 @@
 from fastapi import HTTPException, Depends
 from http import HTTPStatus
 from functools import wraps
+import threading
+import hashlib
+import time
 import jwt
 import os
 
@@ -8,7 +11,14 @@ from app.utils.response import APIResponse
 from .debug import Debug
 from app.utils.messages import Messages
 from app.utils.auth import oauth2_scheme
-from app.utils.config import ALGORITHM
+from app.models.principal import Principal
+from app.utils.cache import token_cache
+from app.utils.config import (
+    ALGORITHM, SERVER, DATABASE, DB_USERNAME, DB_PASSWORD, TRUSTED_CONNECTION,
+    DB_POOL_MIN_SIZE, DB_POOL_MAX_SIZE, DB_POOL_TIMEOUT, DB_POOL_IDLE_TIMEOUT, DB_POOL_PRE_PING
+)
+from app.utils.db_connect import ConnectionPool
+from app.utils.unit_of_work import UnitOfWork, transaction
 from .messages import Messages
 from app.utils.debug import Debug
 
@@ -60,8 +70,21 @@ def exception_handler(func):
 
 # Utility: Verify token
 
-def verify_token(token: str = Depends(oauth2_scheme)):
-    SECRET_KEY = os.getenv("SECRET_KEY")
+SECRET_KEY = os.getenv("SECRET_KEY")
+
+def verify_token(token: str = Depends(oauth2_scheme)) -> Principal:
+    """
+    Verifies the bearer access token and returns the caller it identifies. Role claims are
+    carried over as signed; UserService.resolve_principal decides whether they can be trusted.
+
+    Successfully verified tokens are cached by digest until their exp, so repeat requests
+    with the same token skip decoding and signature verification. Failures are never cached.
+    """
+    token_digest = hashlib.sha256(token.encode()).digest()
+    principal = token_cache.get(token_digest)
+    if principal is not None:
+        return principal
+
     try:
         decoded_token = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         Debug.log(f"Token verified for user_id: {decoded_token['user_id']}")
@@ -81,4 +104,57 @@ def verify_token(token: str = Depends(oauth2_scheme)):
             status_code=HTTPStatus.INTERNAL_SERVER_ERROR,
             detail=Messages.TOKEN_VERIFICATION_FAILED
         )
-    return decoded_token
+    principal = Principal(
+        user_id=decoded_token["user_id"],
+        username=decoded_token.get("username"),
+        is_admin=decoded_token.get("is_admin"),
+        issued_at=decoded_token.get("iat")
+    )
+    if "exp" in decoded_token:
+        token_cache.set(token_digest, principal, ttl=decoded_token["exp"] - time.time())
+    return principal
+
+
+# Utility: Shared database connection pool
+
+_db_pool = None
+_db_pool_lock = threading.Lock()
+
+def get_db_pool() -> ConnectionPool:
+    """
+    Returns the process-wide connection pool shared by all routers, creating it on first use.
+    The app lifespan opens it at startup and closes it at shutdown.
+    """
+    global _db_pool
+    if _db_pool is None:
+        with _db_pool_lock:
+            if _db_pool is None:
+                _db_pool = ConnectionPool(
+                    SERVER, DATABASE, TRUSTED_CONNECTION, DB_USERNAME, DB_PASSWORD,
+                    min_size=DB_POOL_MIN_SIZE,
+                    max_size=DB_POOL_MAX_SIZE,
+                    timeout=DB_POOL_TIMEOUT,
+                    idle_timeout=DB_POOL_IDLE_TIMEOUT,
+                    pre_ping=DB_POOL_PRE_PING
+                )
+    return _db_pool
+
+async def get_unit_of_work(db_pool: ConnectionPool = Depends(get_db_pool)) -> UnitOfWork:
+    """
+    Request-scoped unit of work: one pooled connection and cursor for the whole request,
+    committed once after the handler returns and rolled back if it raises.
+    Declare it with Depends(get_unit_of_work, scope="function") so the commit happens before
+    the response is sent.
+    """
+    async with transaction(db_pool) as unit_of_work:
+        yield unit_of_work
+
+def close_db_pool():
+    """
+    Closes the shared connection pool, if one was created.
+    """
+    global _db_pool
+    with _db_pool_lock:
+        if _db_pool is not None:
+            _db_pool.close()
+            _db_pool = None
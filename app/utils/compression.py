@@ -0,0 +1,274 @@
+import gzip
+import os
+import stat
+import zlib
+from mimetypes import guess_type
+
+import anyio.to_thread
+import brotli
+from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import FileResponse
+from starlette.staticfiles import NotModifiedResponse
+
+from app.utils.config import COMPRESSION_MINIMUM_SIZE, COMPRESSION_GZIP_LEVEL, COMPRESSION_BROTLI_QUALITY
+
+# Content codings we produce, most preferred first, and the suffix of their precompressed files
+ENCODINGS = ("br", "gzip")
+PRECOMPRESSED_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+# Text assets worth precompressing at build time; images and fonts are already compressed
+PRECOMPRESSIBLE_SUFFIXES = (".css", ".js", ".html", ".svg", ".json", ".txt", ".map")
+
+# Bodies this large are compressed in a worker thread so the event loop is not blocked
+THREAD_MINIMUM_SIZE = 128 * 1024
+
+def negotiate_encoding(accept_encoding: str, available: tuple = ENCODINGS):
+    """
+    Picks the content coding to respond with from an Accept-Encoding header. Higher q-values
+    win; ties go to the earlier entry of `available`. A q-value of 0 refuses a coding, and
+    "*" stands for every coding not listed.
+
+    :return: The chosen coding, or None to send the body as is.
+    """
+    weights = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        weight = 1.0
+        params = params.strip().lower()
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[coding] = weight
+
+    best, best_weight = None, 0.0
+    for coding in available:
+        weight = weights.get(coding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = coding, weight
+    return best
+
+# Media types that are already compressed, or must reach the client unbuffered
+EXCLUDED_MEDIA_TYPES = (
+    "application/gzip", "application/x-gzip", "application/zip", "application/grpc",
+    "audio/*", "video/*", "font/woff", "font/woff2",
+    "image/avif", "image/gif", "image/jpeg", "image/png", "image/webp",
+    "text/event-stream",
+)
+
+class GzipEncoder:
+    content_encoding = "gzip"
+
+    def __init__(self, level: int = COMPRESSION_GZIP_LEVEL):
+        self.level = level
+        self._compressor = None
+
+    def compress(self, body: bytes, more_body: bool) -> bytes:
+        if self._compressor is None:
+            self._compressor = zlib.compressobj(self.level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        if more_body:
+            return self._compressor.compress(body) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+        return self._compressor.compress(body) + self._compressor.flush()
+
+class BrotliEncoder:
+    content_encoding = "br"
+
+    def __init__(self, quality: int = COMPRESSION_BROTLI_QUALITY):
+        self.quality = quality
+        self._compressor = None
+
+    def compress(self, body: bytes, more_body: bool) -> bytes:
+        if self._compressor is None:
+            self._compressor = brotli.Compressor(quality=self.quality, mode=brotli.MODE_TEXT)
+        if more_body:
+            return self._compressor.process(body) + self._compressor.flush()
+        return self._compressor.process(body) + self._compressor.finish()
+
+def is_excluded_media_type(content_type: str) -> bool:
+    media_type = content_type.partition(";")[0].strip().lower()
+    return media_type in EXCLUDED_MEDIA_TYPES or media_type.partition("/")[0] + "/*" in EXCLUDED_MEDIA_TYPES
+
+class CompressingSend:
+    def __init__(self, send, encoder, minimum_size: int):
+        """
+        Wraps an ASGI `send` for one response. The start message is held back until the
+        first body chunk shows whether the response is worth compressing, then the headers
+        are adjusted to match the body that is actually sent.
+
+        :param encoder: A GzipEncoder or BrotliEncoder, or None to only add Vary.
+        """
+        self.send = send
+        self.encoder = encoder
+        self.minimum_size = minimum_size
+        self.start_message = None
+        self.passthrough = False
+        self.compressing = False
+
+    async def __call__(self, message):
+        message_type = message["type"]
+        if message_type == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            self.passthrough = (
+                "content-encoding" in headers
+                or message["status"] == 206
+                or is_excluded_media_type(headers.get("content-type", ""))
+            )
+            if self.passthrough:
+                await self.send(message)
+            else:
+                self.start_message = message
+        elif message_type == "http.response.body" and not self.passthrough:
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if self.start_message is not None:
+                await self._start(message, body, more_body)
+            elif self.compressing:
+                message["body"] = await self._compress(body, more_body)
+            await self.send(message)
+        elif message_type == "http.response.pathsend" and self.start_message is not None:
+            # Files sent by path go out as they are
+            start_message, self.start_message = self.start_message, None
+            await self.send(start_message)
+            await self.send(message)
+        else:
+            await self.send(message)
+
+    async def _start(self, message, body: bytes, more_body: bool):
+        start_message, self.start_message = self.start_message, None
+        if len(body) < self.minimum_size and not more_body:
+            await self.send(start_message)
+            return
+
+        headers = MutableHeaders(raw=start_message["headers"])
+        headers.add_vary_header("Accept-Encoding")
+        if self.encoder is not None:
+            self.compressing = True
+            message["body"] = await self._compress(body, more_body)
+            headers["Content-Encoding"] = self.encoder.content_encoding
+            if more_body or start_message.get("trailers", False):
+                del headers["Content-Length"]
+            else:
+                headers["Content-Length"] = str(len(message["body"]))
+            # A strong ETag names exact bytes, which compression changes, so it becomes weak;
+            # If-None-Match is compared weakly, so revalidation keeps working
+            etag = headers.get("etag")
+            if etag and not etag.startswith("W/"):
+                headers["ETag"] = "W/" + etag
+        await self.send(start_message)
+
+    async def _compress(self, body: bytes, more_body: bool) -> bytes:
+        if len(body) >= THREAD_MINIMUM_SIZE:
+            return await anyio.to_thread.run_sync(self.encoder.compress, body, more_body)
+        return self.encoder.compress(body, more_body)
+
+class CompressionMiddleware:
+    def __init__(self, app, minimum_size: int = COMPRESSION_MINIMUM_SIZE, gzip_level: int = COMPRESSION_GZIP_LEVEL, brotli_quality: int = COMPRESSION_BROTLI_QUALITY):
+        """
+        Compresses responses with brotli or gzip, whichever the client prefers. Bodies under
+        `minimum_size` bytes, responses that already carry a Content-Encoding (e.g.
+        precompressed static files) and already compressed media types are sent as they are.
+        """
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding == "br":
+            encoder = BrotliEncoder(self.brotli_quality)
+        elif encoding == "gzip":
+            encoder = GzipEncoder(self.gzip_level)
+        else:
+            encoder = None
+
+        await self.app(scope, receive, CompressingSend(send, encoder, self.minimum_size))
+
+class PrecompressedStaticFiles(StaticFiles):
+    """
+    StaticFiles that serves a file's .br or .gz sibling, written at build time by
+    `python -m app.build_static`, to clients that accept that coding. Siblings older than
+    their source file are ignored, so edits in development are never hidden by a stale copy.
+    """
+
+    def precompressed_siblings(self, full_path, stat_result) -> dict:
+        """
+        :return: (path, stat result) of each up-to-date precompressed copy, by coding.
+        """
+        siblings = {}
+        for encoding, suffix in PRECOMPRESSED_SUFFIXES.items():
+            path = f"{full_path}{suffix}"
+            try:
+                sibling_stat = os.stat(path)
+            except OSError:
+                continue
+            if stat.S_ISREG(sibling_stat.st_mode) and sibling_stat.st_mtime >= stat_result.st_mtime:
+                siblings[encoding] = (path, sibling_stat)
+        return siblings
+
+    def file_response(self, full_path, stat_result, scope, status_code: int = 200):
+        siblings = self.precompressed_siblings(full_path, stat_result)
+        if not siblings:
+            return super().file_response(full_path, stat_result, scope, status_code)
+
+        request_headers = Headers(scope=scope)
+        headers = {"Vary": "Accept-Encoding"}
+        media_type = guess_type(str(full_path))[0] or "text/plain"
+        encoding = negotiate_encoding(request_headers.get("accept-encoding", ""), tuple(siblings))
+        if encoding is not None:
+            full_path, stat_result = siblings[encoding]
+            headers["Content-Encoding"] = encoding
+
+        response = FileResponse(full_path, status_code=status_code, stat_result=stat_result, media_type=media_type, headers=headers)
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
+
+def precompress_file(path: str, minimum_size: int = COMPRESSION_MINIMUM_SIZE) -> list[str]:
+    """
+    Writes `path`.br and `path`.gz at the highest compression levels, keeping only copies
+    smaller than the original. gzip's header timestamp is zeroed so rebuilds are identical.
+
+    :return: The files written.
+    """
+    with open(path, "rb") as source:
+        data = source.read()
+    if len(data) < minimum_size:
+        return []
+
+    written = []
+    for encoding, compressed in (
+        ("br", brotli.compress(data, quality=11, mode=brotli.MODE_TEXT)),
+        ("gzip", gzip.compress(data, compresslevel=9, mtime=0)),
+    ):
+        target = path + PRECOMPRESSED_SUFFIXES[encoding]
+        if len(compressed) >= len(data):
+            if os.path.exists(target):
+                os.remove(target)
+            continue
+        with open(target, "wb") as output:
+            output.write(compressed)
+        written.append(target)
+    return written
+
+def precompress_directory(directory: str, minimum_size: int = COMPRESSION_MINIMUM_SIZE) -> list[str]:
+    """
+    Precompresses every text asset under `directory`.
+
+    :return: The files written.
+    """
+    written = []
+    for root, _, files in os.walk(directory):
+        for name in sorted(files):
+            if name.endswith(PRECOMPRESSIBLE_SUFFIXES):
+                written.extend(precompress_file(os.path.join(root, name), minimum_size))
+    return written
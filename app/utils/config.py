@@ -20,4 +20,49 @@ else:
 
 ACCESS_TOKEN_EXPIRY_MINS = 1
 REFRESH_TOKEN_EXPIRY_HOURS = 1
-ALGORITHM = "HS256"
\ No newline at end of file
+ALGORITHM = "HS256"
+
+# Connection pool settings
+DB_POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", 1))
+DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", 10))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))
+DB_POOL_IDLE_TIMEOUT = float(os.getenv("DB_POOL_IDLE_TIMEOUT", 300))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+
+# Worker threads for blocking database calls, sized to the connection pool by default
+DB_THREAD_POOL_SIZE = int(os.getenv("DB_THREAD_POOL_SIZE", DB_POOL_MAX_SIZE))
+
+# Keyset pagination for list/filter read modes
+DEFAULT_PAGE_LIMIT = int(os.getenv("DEFAULT_PAGE_LIMIT", 100))
+MAX_PAGE_LIMIT = int(os.getenv("MAX_PAGE_LIMIT", 1000))
+
+# Rows pulled from the driver per fetchmany call when streaming exports
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", 500))
+
+# In-process cache of authenticated users (seconds / entries, 0 disables)
+USER_CACHE_TTL = int(os.getenv("USER_CACHE_TTL", 60))
+USER_CACHE_MAX_SIZE = int(os.getenv("USER_CACHE_MAX_SIZE", 1024))
+
+# In-process cache of verified access tokens (max seconds / entries, 0 disables)
+TOKEN_CACHE_TTL = int(os.getenv("TOKEN_CACHE_TTL", 300))
+TOKEN_CACHE_MAX_SIZE = int(os.getenv("TOKEN_CACHE_MAX_SIZE", 4096))
+
+# Seconds before the in-memory optional extras catalog is reloaded from the database
+OPTIONAL_EXTRAS_CATALOG_TTL = int(os.getenv("OPTIONAL_EXTRAS_CATALOG_TTL", 300))
+
+# Minimum seconds between catalog reloads caused by unknown extra_ids when the table has no change counter
+OPTIONAL_EXTRAS_CATALOG_MISS_RELOAD_INTERVAL = float(os.getenv("OPTIONAL_EXTRAS_CATALOG_MISS_RELOAD_INTERVAL", 5))
+
+# Rows at or above which executemany binds parameter arrays (pyodbc fast_executemany), 0 disables
+BULK_EXECUTEMANY_THRESHOLD = int(os.getenv("BULK_EXECUTEMANY_THRESHOLD", 10))
+
+# Maximum number of policies accepted by one /create_car_insurance_policies request
+MAX_POLICY_BATCH_SIZE = int(os.getenv("MAX_POLICY_BATCH_SIZE", 500))
+
+# Apply pending schema migrations (app/migrations) when the app starts
+DB_MIGRATE_ON_STARTUP = os.getenv("DB_MIGRATE_ON_STARTUP", "true").lower() == "true"
+
+# Response compression: smallest body worth compressing (bytes) and per-request compression levels
+COMPRESSION_MINIMUM_SIZE = int(os.getenv("COMPRESSION_MINIMUM_SIZE", 1024))
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", 6))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", 4))
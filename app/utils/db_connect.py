@@ -1,6 +1,12 @@
+import asyncio
 import pyodbc
 import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, asynccontextmanager
 from .debug import Debug
+from .async_db import run_blocking
 
 # Custom exception for database connection errors
 class DatabaseConnectionError(Exception):
@@ -58,4 +64,322 @@ class DBConnect:
         except pyodbc.Error as e:
             error_message = f"Error closing the database connection: {e}"
             Debug.log(error_message)
-            raise DatabaseConnectionError(error_message)
\ No newline at end of file
+            raise DatabaseConnectionError(error_message)
+
+# Raised when no pooled connection becomes available within the checkout timeout
+class PoolTimeoutError(DatabaseConnectionError):
+    pass
+
+class ConnectionPool:
+    def __init__(
+        self,
+        server: str,
+        database: str,
+        trusted_connection: bool = True,
+        username: str = None,
+        password: str = None,
+        min_size: int = 1,
+        max_size: int = 10,
+        timeout: float = 30,
+        idle_timeout: float = 300,
+        pre_ping: bool = True,
+        ping_interval: float = 30
+    ):
+        """
+        Keeps a bounded set of open DBConnect instances that are checked out per request
+        instead of opening a new ODBC connection every time.
+
+        :param min_size: Connections opened up front and never evicted for idleness.
+        :param max_size: Upper bound on open connections (idle + checked out).
+        :param timeout: Seconds to wait for a free connection before raising PoolTimeoutError.
+        :param idle_timeout: Seconds an idle connection above min_size is kept before being closed.
+        :param pre_ping: Validate a connection with SELECT 1 before handing it out.
+        :param ping_interval: Only pre-ping connections that have been idle at least this many seconds.
+        """
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError("Pool sizes must satisfy 0 <= min_size <= max_size and max_size >= 1")
+        self.server = server
+        self.database = database
+        self.trusted_connection = trusted_connection
+        self.username = username
+        self.password = password
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout
+        self.pre_ping = pre_ping
+        self.ping_interval = ping_interval
+
+        self._idle = deque()  # (DBConnect, last_released) pairs, most recently used on the right
+        self._size = 0
+        self._closed = False
+        self._condition = threading.Condition()
+        # Async checkouts wait here, on the event loop, rather than in a database worker
+        self._async_slots = None
+        self._async_slots_loop = None
+        self._stats = {
+            "connections_created": 0,
+            "connections_closed": 0,
+            "checkouts": 0,
+            "checkout_timeouts": 0,
+            "ping_failures": 0,
+            "idle_evictions": 0,
+            "total_wait_seconds": 0.0,
+        }
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def open(self):
+        """
+        Opens min_size connections so the first requests do not pay the handshake.
+        """
+        with self._condition:
+            self._closed = False
+            while self._size < self.min_size:
+                self._size += 1
+                try:
+                    db = self._create_connection()
+                except Exception:
+                    self._size -= 1
+                    raise
+                self._idle.append((db, time.monotonic()))
+        Debug.log(f"Connection pool opened with {self.min_size} connection(s) to {self.database} on {self.server}.")
+
+    def acquire(self) -> DBConnect:
+        """
+        Checks out a connection, waiting up to `timeout` seconds if the pool is exhausted.
+
+        :return: A connected DBConnect instance that must be given back with release().
+        :raises PoolTimeoutError: If no connection became available in time.
+        """
+        started = time.monotonic()
+        deadline = started + self.timeout
+        evicted = []
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise DatabaseConnectionError("Connection pool is closed.")
+                evicted.extend(self._evict_idle())
+                if self._idle:
+                    db, last_released = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    # Reserve the slot, then connect outside the lock
+                    self._size += 1
+                    db, last_released = None, None
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._stats["checkout_timeouts"] += 1
+                    raise PoolTimeoutError(
+                        f"Timed out after {self.timeout}s waiting for a connection to {self.database} on {self.server}."
+                    )
+                self._condition.wait(remaining)
+
+        for stale in evicted:
+            self._close_connection(stale)
+
+        try:
+            if db is None:
+                db = self._create_connection()
+            elif self.pre_ping and time.monotonic() - last_released >= self.ping_interval and not self._ping(db):
+                self._close_connection(db)
+                db = self._create_connection()
+        except Exception:
+            with self._condition:
+                self._size -= 1
+                self._condition.notify()
+            raise
+
+        with self._condition:
+            self._stats["checkouts"] += 1
+            self._stats["total_wait_seconds"] += time.monotonic() - started
+        return db
+
+    def release(self, db: DBConnect, discard: bool = False):
+        """
+        Returns a connection to the pool. Any open transaction is rolled back first so the
+        next borrower starts clean; connections that fail the rollback are discarded.
+
+        :param db: The DBConnect instance obtained from acquire().
+        :param discard: Close the connection instead of returning it to the pool.
+        """
+        if not discard:
+            try:
+                db.connection.rollback()
+            except Exception as e:
+                Debug.log(f"Discarding pooled connection after failed rollback: {e}")
+                discard = True
+
+        with self._condition:
+            if discard or self._closed:
+                self._size -= 1
+            else:
+                self._idle.append((db, time.monotonic()))
+            self._condition.notify()
+
+        if discard or self._closed:
+            self._close_connection(db)
+
+    @contextmanager
+    def connection(self):
+        """
+        Checks out a connection for the duration of a with-block.
+
+        Usage:
+            with pool.connection() as db:
+                cursor = db.connection.cursor()
+        """
+        db = self.acquire()
+        try:
+            yield db
+        except pyodbc.Error:
+            # The connection itself may be broken, do not hand it to anyone else
+            self.release(db, discard=True)
+            raise
+        except BaseException:
+            self.release(db)
+            raise
+        else:
+            self.release(db)
+
+    async def acquire_async(self) -> DBConnect:
+        """
+        Async variant of acquire() for request handlers. A request first waits on the event
+        loop for one of max_size slots and only then runs the checkout (which may open or
+        pre-ping a connection) on the database thread pool. A request waiting for a
+        connection therefore never holds a worker that connection holders need to run their
+        queries and release().
+
+        :return: A connected DBConnect instance that must be given back with release_async().
+        :raises PoolTimeoutError: If no slot became available within `timeout` seconds.
+        """
+        slots = self._get_async_slots()
+        try:
+            await asyncio.wait_for(slots.acquire(), self.timeout)
+        except asyncio.TimeoutError:
+            with self._condition:
+                self._stats["checkout_timeouts"] += 1
+            raise PoolTimeoutError(
+                f"Timed out after {self.timeout}s waiting for a connection to {self.database} on {self.server}."
+            )
+        try:
+            return await run_blocking(self.acquire)
+        except BaseException:
+            slots.release()
+            raise
+
+    async def release_async(self, db: DBConnect, discard: bool = False):
+        """
+        Async variant of release() for connections obtained from acquire_async().
+        """
+        try:
+            await run_blocking(self.release, db, discard)
+        finally:
+            self._get_async_slots().release()
+
+    @asynccontextmanager
+    async def connection_async(self):
+        """
+        Async variant of connection() for use inside request handlers, built on
+        acquire_async() and release_async().
+
+        Usage:
+            async with pool.connection_async() as db:
+                cursor = db.connection.cursor()
+        """
+        db = await self.acquire_async()
+        try:
+            yield db
+        except pyodbc.Error:
+            await self.release_async(db, True)
+            raise
+        except BaseException:
+            await self.release_async(db)
+            raise
+        else:
+            await self.release_async(db)
+
+    def close(self):
+        """
+        Closes all idle connections. Connections still checked out are closed when released.
+        """
+        with self._condition:
+            self._closed = True
+            idle = [db for db, _ in self._idle]
+            self._idle.clear()
+            self._size -= len(idle)
+            self._condition.notify_all()
+        for db in idle:
+            self._close_connection(db)
+        Debug.log(f"Connection pool closed. Stats: {self.stats()}")
+
+    def stats(self) -> dict:
+        """
+        Returns a snapshot of the pool counters and current occupancy.
+        """
+        with self._condition:
+            snapshot = dict(self._stats)
+            snapshot.update({
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": self._size - len(self._idle),
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+            })
+        return snapshot
+
+    def _get_async_slots(self) -> asyncio.Semaphore:
+        # asyncio primitives belong to one event loop, so a new loop (e.g. per test) gets its own
+        loop = asyncio.get_running_loop()
+        if self._async_slots_loop is not loop:
+            self._async_slots = asyncio.Semaphore(self.max_size)
+            self._async_slots_loop = loop
+        return self._async_slots
+
+    def _create_connection(self) -> DBConnect:
+        db = DBConnect(self.server, self.database, self.trusted_connection, self.username, self.password)
+        db.connect()
+        with self._condition:
+            self._stats["connections_created"] += 1
+        return db
+
+    def _close_connection(self, db: DBConnect):
+        try:
+            db.close()
+        except DatabaseConnectionError:
+            pass
+        with self._condition:
+            self._stats["connections_closed"] += 1
+
+    def _ping(self, db: DBConnect) -> bool:
+        try:
+            cursor = db.connection.cursor()
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+            cursor.close()
+            return True
+        except Exception as e:
+            Debug.log(f"Pooled connection failed pre-ping: {e}")
+            with self._condition:
+                self._stats["ping_failures"] += 1
+            return False
+
+    def _evict_idle(self):
+        # Called with the lock held. The oldest idle connections sit on the left;
+        # the caller closes the returned connections once the lock is released.
+        evicted = []
+        if self.idle_timeout is None:
+            return evicted
+        now = time.monotonic()
+        while self._idle and self._size > self.min_size and now - self._idle[0][1] >= self.idle_timeout:
+            db, _ = self._idle.popleft()
+            self._size -= 1
+            self._stats["idle_evictions"] += 1
+            evicted.append(db)
+        return evicted
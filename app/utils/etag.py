@@ -0,0 +1,52 @@
+import hashlib
+from http import HTTPStatus
+
+from fastapi import Request, Response
+
+from app.utils.table_versions import read_table_versions
+
+# Responses are per caller, so only the browser may keep them and it must revalidate each time
+CONDITIONAL_HEADERS = {
+    "Cache-Control": "private, no-cache",
+    "Vary": "Authorization"
+}
+
+async def resource_etag(request: Request, db, tables, user_id: int) -> str:
+    """
+    Builds a strong ETag for a read from the change counters of the tables it depends on,
+    the caller and the request's query parameters. The counters are read before the data,
+    so a write committed in between can only make the ETag older than the body, never newer.
+
+    :param db: The request's AsyncDatabase.
+    :param tables: Every table the response is built from.
+    :return: The quoted ETag, or None if a table has no change counter yet.
+    """
+    versions = await read_table_versions(db, tables)
+    if any(table not in versions for table in tables):
+        return None
+    key = repr((
+        request.url.path,
+        sorted(request.query_params.multi_items()),
+        user_id,
+        sorted(versions.items())
+    ))
+    return '"' + hashlib.sha256(key.encode()).hexdigest()[:32] + '"'
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """
+    Checks If-None-Match against `etag` using the weak comparison HTTP requires for it.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if etag is None or not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(candidate.strip().removeprefix("W/") == etag for candidate in if_none_match.split(","))
+
+def etag_headers(etag: str) -> dict:
+    if etag is None:
+        return {}
+    return {"ETag": etag, **CONDITIONAL_HEADERS}
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=HTTPStatus.NOT_MODIFIED, headers=etag_headers(etag))
@@ -0,0 +1,124 @@
+from datetime import date
+from http import HTTPStatus
+from types import UnionType
+from typing import Union, get_args, get_origin
+
+from app.utils.response import APIResponse
+from app.utils.messages import Messages
+
+# SQL for each supported operator; every predicate keeps the bare column on the left so it
+# can use an index seek
+OPERATORS = {
+    "eq": "=",
+    "lt": "<",
+    "lte": "<=",
+    "gt": ">",
+    "gte": ">=",
+    "in": "IN"
+}
+
+EQUALITY_OPERATORS = ("eq", "in")
+RANGE_OPERATORS = ("eq", "in", "lt", "lte", "gt", "gte")
+
+# Keeps a single filtered read well under SQL Server's 2100 parameter limit
+MAX_FILTER_VALUES = 1000
+
+def _raise_bad_request(message):
+    raise ValueError(
+        APIResponse(
+            status=HTTPStatus.BAD_REQUEST,
+            message=message,
+            data=None
+        )
+    )
+
+class FilterField:
+    def __init__(self, column: str, value_type: type, operators: tuple = EQUALITY_OPERATORS):
+        """
+        A column that may be filtered on, with the type its values are bound as.
+
+        :param column: The column name, used verbatim in SQL (never taken from the request).
+        :param value_type: int, float, bool, str or date.
+        :param operators: The operator names accepted for this column.
+        """
+        self.column = column
+        self.value_type = value_type
+        self.operators = operators
+
+    def coerce(self, raw: str):
+        """
+        Converts a query string value to the column's type so it is bound with a matching
+        parameter type instead of relying on an implicit conversion in the database.
+        """
+        try:
+            if self.value_type is date:
+                return date.fromisoformat(raw)
+            if self.value_type is bool:
+                if raw.lower() not in ("true", "false", "1", "0"):
+                    raise ValueError(raw)
+                return raw.lower() in ("true", "1")
+            return self.value_type(raw)
+        except (TypeError, ValueError):
+            _raise_bad_request(Messages.INVALID_FILTER_VALUE.format(self.column))
+
+def model_filter_fields(model, types: dict = None, ranged: tuple = ()) -> dict:
+    """
+    Builds the filterable fields of a Pydantic model from its annotations.
+
+    :param model: The model class whose fields mirror the table's columns.
+    :param types: Overrides for columns whose database type differs from the model's, e.g. dates.
+    :param ranged: Fields that also accept lt/lte/gt/gte.
+    :return: FilterField per field name.
+    """
+    types = types or {}
+    fields = {}
+    for name, info in model.model_fields.items():
+        value_type = types.get(name, info.annotation)
+        if get_origin(value_type) in (Union, UnionType):
+            value_type = next(arg for arg in get_args(value_type) if arg is not type(None))
+        fields[name] = FilterField(name, value_type, RANGE_OPERATORS if name in ranged else EQUALITY_OPERATORS)
+    return fields
+
+def parse_filter(expression: str) -> tuple:
+    """
+    Parses a `filter` query parameter of the form "field:operator:value", e.g.
+    "start_date:gte:2025-01-01" or "user_id:in:1,2,3".
+
+    :return: (field, operator, raw value)
+    """
+    parts = expression.split(":", 2)
+    if len(parts) != 3 or not all(parts):
+        _raise_bad_request(Messages.INVALID_FILTER.format(expression))
+    return tuple(parts)
+
+def build_where(fields: dict, predicates: list) -> tuple:
+    """
+    Turns (field, operator, raw value) predicates into a parameterised WHERE clause, ANDed
+    together. Field names and operators are checked against `fields` and OPERATORS; values
+    are coerced to the column type and bound as parameters.
+
+    :return: (where sql, params)
+    """
+    if not predicates:
+        _raise_bad_request(Messages.INVALID_FILTER.format(""))
+
+    clauses = []
+    params = []
+    for name, operator, raw in predicates:
+        field = fields.get(name)
+        if field is None:
+            _raise_bad_request(Messages.INVALID_FIELD.format(name))
+        if operator not in field.operators:
+            _raise_bad_request(Messages.INVALID_FILTER_OPERATOR.format(operator, name))
+
+        if operator == "in":
+            values = [field.coerce(value) for value in dict.fromkeys(raw.split(","))]
+            clauses.append(f"{field.column} IN ({', '.join('?' for _ in values)})")
+            params.extend(values)
+        else:
+            clauses.append(f"{field.column} {OPERATORS[operator]} ?")
+            params.append(field.coerce(raw))
+
+    if len(params) > MAX_FILTER_VALUES:
+        _raise_bad_request(Messages.TOO_MANY_FILTER_VALUES.format(MAX_FILTER_VALUES))
+    return " AND ".join(clauses), tuple(params)
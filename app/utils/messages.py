@@ -10,6 +10,13 @@ class Messages:
     API_IS_RUNNNG = "API is running"
     INVALID_REQUEST_DATA = "Invalid request data"
     AUTHORIZATION_HEADER_MISSING = "Authorization header missing or invalid"
+    INVALID_CURSOR = "Invalid pagination cursor"
+    INVALID_PAGE_LIMIT = "Limit must be between 1 and {}"
+    INVALID_EXPORT_FORMAT = "Invalid export format. Use 'ndjson' or 'csv'."
+    INVALID_FILTER = "Invalid filter '{}'. Use field:operator:value"
+    INVALID_FILTER_OPERATOR = "Operator '{}' is not supported for field '{}'"
+    INVALID_FILTER_VALUE = "Invalid value for field '{}'"
+    TOO_MANY_FILTER_VALUES = "A filter may contain at most {} values"
 
     # Token-related messages
     REFRESH_TOKEN_EXPIRED = "Refresh token has expired"
@@ -47,6 +54,8 @@ class Messages:
     POLICY_READ_SUCCESS = "Policy(s) retrieved successfully"
     POLICY_UPDATED_SUCCESS = "Policy updated successfully"
     POLICY_DELETED_SUCCESS = "Policy deleted successfully"
+    POLICIES_CREATED_SUCCESS = "{} of {} policies created successfully"
+    POLICY_BATCH_SIZE_INVALID = "A batch must contain between 1 and {} policies"
 
     # Database-related messages
     DB_ERROR = "An error occurred while interacting with the database"
@@ -0,0 +1,127 @@
+import gzip
+import hashlib
+import time
+from email.utils import formatdate, parsedate_to_datetime
+from http import HTTPStatus
+
+import brotli
+from fastapi import Request, Response
+from jinja2 import meta
+
+from app.utils.compression import negotiate_encoding
+from app.utils.etag import etag_matches
+
+# Pages embed fingerprinted asset URLs, so browsers must revalidate them before reuse
+PAGE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "Vary": "Accept-Encoding"
+}
+
+class RenderedPage:
+    def __init__(self, body: bytes, last_modified: float, templates: list, asset_urls: dict):
+        """
+        A template rendered once, with a br and gzip copy so serving it compresses nothing.
+
+        :param last_modified: When it was rendered. Not the templates' modification time,
+            since a rebuild can change the asset URLs a page embeds without touching them.
+        :param templates: The jinja2 Templates it depends on, to detect edits.
+        :param asset_urls: static_url() results used while rendering, by asset name.
+        """
+        self.templates = templates
+        self.asset_urls = asset_urls
+        self.last_modified = formatdate(last_modified, usegmt=True)
+        self.last_modified_at = int(last_modified)
+        digest = hashlib.sha256(body).hexdigest()[:32]
+        # Each coding is a different representation, so each gets its own strong ETag
+        self.variants = {
+            None: (body, f'"{digest}"'),
+            "br": (brotli.compress(body, quality=11, mode=brotli.MODE_TEXT), f'"{digest}-br"'),
+            "gzip": (gzip.compress(body, compresslevel=9, mtime=0), f'"{digest}-gz"'),
+        }
+
+class PageCache:
+    def __init__(self, templates, assets=None, check_sources: bool = False):
+        """
+        Caches the rendered output of templates that do not depend on the request.
+
+        :param templates: The app's Jinja2Templates.
+        :param assets: The AssetManifest behind the templates' static_url global, if any.
+        :param check_sources: Re-render a page when one of its templates, or an asset URL it
+            embeds, has changed since it was rendered. For development.
+        """
+        self.env = templates.env
+        self.assets = assets
+        self.check_sources = check_sources
+        self._pages = {}
+
+    def warm(self, names):
+        """
+        Renders every page in `names` up front, e.g. at startup.
+        """
+        for name in names:
+            self._pages[name] = self._render(name)
+
+    def clear(self):
+        self._pages.clear()
+
+    def get(self, name: str) -> RenderedPage:
+        page = self._pages.get(name)
+        if page is None or (self.check_sources and self._is_stale(page)):
+            page = self._pages[name] = self._render(name)
+        return page
+
+    def response(self, request: Request, name: str) -> Response:
+        """
+        Serves a cached page in the coding the client prefers, or a 304 when its
+        If-None-Match or If-Modified-Since still holds.
+        """
+        page = self.get(name)
+        encoding = negotiate_encoding(request.headers.get("accept-encoding", ""))
+        body, etag = page.variants[encoding]
+        headers = {"ETag": etag, "Last-Modified": page.last_modified, **PAGE_HEADERS}
+        if self._not_modified(request, page, etag):
+            return Response(status_code=HTTPStatus.NOT_MODIFIED, headers=headers)
+        if encoding is not None:
+            headers["Content-Encoding"] = encoding
+        return Response(body, media_type="text/html", headers=headers)
+
+    def _not_modified(self, request: Request, page: RenderedPage, etag: str) -> bool:
+        if request.headers.get("if-none-match"):
+            return etag_matches(request, etag)
+        if_modified_since = request.headers.get("if-modified-since")
+        if not if_modified_since:
+            return False
+        try:
+            return page.last_modified_at <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+
+    def _render(self, name: str) -> RenderedPage:
+        context = {}
+        asset_urls = {}
+        if self.assets is not None:
+            def static_url(asset: str) -> str:
+                asset_urls[asset] = self.assets.url(asset)
+                return asset_urls[asset]
+            context["static_url"] = static_url
+
+        body = self.env.get_template(name).render(context).encode("utf-8")
+        templates = [self.env.get_template(template) for template in self._dependencies(name)]
+        return RenderedPage(body, time.time(), templates, asset_urls)
+
+    def _dependencies(self, name: str) -> list:
+        """
+        :return: `name` and every template it extends or includes, recursively.
+        """
+        found = [name]
+        for current in found:
+            source = self.env.loader.get_source(self.env, current)[0]
+            for referenced in meta.find_referenced_templates(self.env.parse(source)):
+                if referenced is not None and referenced not in found:
+                    found.append(referenced)
+        return found
+
+    def _is_stale(self, page: RenderedPage) -> bool:
+        if not all(template.is_up_to_date for template in page.templates):
+            return True
+        return any(self.assets.url(asset) != url for asset, url in page.asset_urls.items())
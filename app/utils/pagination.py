@@ -0,0 +1,103 @@
+from collections.abc import Mapping
+from http import HTTPStatus
+import base64
+import binascii
+import json
+
+from app.utils.response import APIResponse
+from app.utils.messages import Messages
+from app.utils.config import DEFAULT_PAGE_LIMIT, MAX_PAGE_LIMIT
+
+def encode_cursor(last_key) -> str:
+    """
+    Encodes the key of the last row on a page into an opaque, URL-safe token.
+    """
+    payload = json.dumps({"after": last_key}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+def decode_cursor(cursor: str):
+    """
+    Decodes a token produced by encode_cursor back into the key it was built from.
+
+    :raises ValueError: With a 400 APIResponse if the token has been tampered with.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        last_key = payload["after"]
+        if not isinstance(last_key, int) or isinstance(last_key, bool):
+            raise TypeError(last_key)
+        return last_key
+    except (binascii.Error, ValueError, TypeError, KeyError, UnicodeDecodeError):
+        raise ValueError(
+            APIResponse(
+                status=HTTPStatus.BAD_REQUEST,
+                message=Messages.INVALID_CURSOR,
+                data=None
+            )
+        )
+
+class KeysetPage:
+    def __init__(self, key: str, limit: int = None, cursor: str = None):
+        """
+        Describes one page of a keyset (seek) paginated read ordered by a unique integer key.
+        Every page is fetched with `WHERE key > last_key ORDER BY key`, so deep pages cost
+        the same index seek as the first one.
+
+        :param key: The primary key column used for ordering and seeking.
+        :param limit: Maximum rows on the page, defaults to DEFAULT_PAGE_LIMIT.
+        :param cursor: The next_cursor token returned with the previous page, if any.
+        """
+        if limit is None:
+            limit = DEFAULT_PAGE_LIMIT
+        if limit < 1 or limit > MAX_PAGE_LIMIT:
+            raise ValueError(
+                APIResponse(
+                    status=HTTPStatus.BAD_REQUEST,
+                    message=Messages.INVALID_PAGE_LIMIT.format(MAX_PAGE_LIMIT),
+                    data=None
+                )
+            )
+        self.key = key
+        self.limit = limit
+        self.after = decode_cursor(cursor) if cursor else None
+        self.next_cursor = None
+
+    def build_query(self, columns: str, table: str, where: str = None, params: tuple = ()):
+        """
+        Builds the SELECT for this page. One extra row is requested to detect a following page.
+
+        :param columns: The projection, e.g. "*" or "user_id, username".
+        :param table: The table (or joined source) to read from.
+        :param where: Optional additional predicate, combined with the keyset predicate.
+        :param params: Parameters for the additional predicate.
+        :return: (sql, params) ready for execution.
+        """
+        predicates = []
+        query_params = [self.limit + 1]
+        if where:
+            predicates.append(f"({where})")
+            query_params.extend(params)
+        if self.after is not None:
+            predicates.append(f"{self.key} > ?")
+            query_params.append(self.after)
+
+        sql = f"SELECT TOP (?) {columns} FROM {table}"
+        if predicates:
+            sql += " WHERE " + " AND ".join(predicates)
+        sql += f" ORDER BY {self.key}"
+        return sql, tuple(query_params)
+
+    def trim(self, rows: list) -> list:
+        """
+        Drops the look-ahead row and records next_cursor when another page exists.
+
+        :param rows: Result rows, or models carrying the key as an attribute.
+        """
+        if len(rows) > self.limit:
+            rows = rows[:self.limit]
+            last = rows[-1]
+            self.next_cursor = encode_cursor(last[self.key] if isinstance(last, Mapping) else getattr(last, self.key))
+        else:
+            self.next_cursor = None
+        return rows
@@ -0,0 +1,40 @@
+from http import HTTPStatus
+
+from app.utils.response import APIResponse
+from app.utils.messages import Messages
+
+def parse_fields(fields: str, allowed: list, key: str):
+    """
+    Parses a `fields=` sparse fieldset query parameter, e.g. "username,email".
+
+    :param fields: The comma separated field names, or None to return every field.
+    :param allowed: The fields that may be requested.
+    :param key: The identifying field, always included first.
+    :return: The requested fields in order without duplicates, or None if none were given.
+    :raises ValueError: With a 400 APIResponse naming the first unknown field.
+    """
+    if fields is None:
+        return None
+    requested = [field.strip() for field in fields.split(",") if field.strip()]
+    for field in requested:
+        if field not in allowed:
+            raise ValueError(
+                APIResponse(
+                    status=HTTPStatus.BAD_REQUEST,
+                    message=Messages.INVALID_FIELD.format(field),
+                    data=None
+                )
+            )
+    return list(dict.fromkeys([key, *requested]))
+
+def select_list(fields: list, prefix: str = "") -> str:
+    """
+    Renders a column list for a SELECT, optionally qualified with a table alias.
+    """
+    return ", ".join(prefix + field for field in fields)
+
+def project(row, fields: list) -> dict:
+    """
+    Returns a plain dict holding only `fields` from a result row.
+    """
+    return {field: row[field] for field in fields}
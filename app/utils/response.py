@@ -1,7 +1,27 @@
+from collections.abc import Mapping
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
+from pydantic_core import to_json
 from typing import Any, Optional
 
 class APIResponse(BaseModel):
     status: int
     message: Optional[str] = None  # Optional message for additional context
-    data: Optional[Any] = None  # Flexible field for any additional data
\ No newline at end of file
+    data: Optional[Any] = None  # Flexible field for any additional data
+
+def _serialise_unknown(value):
+    # Result rows are Mappings rather than dicts; exceptions can appear in validation error contexts
+    if isinstance(value, Mapping):
+        return dict(value)
+    if isinstance(value, BaseException):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse rendered by pydantic-core's serializer straight to bytes. Models, result
+    rows, dates and enums in the content are serialised in that single pass, so handlers
+    and services can return them without dumping to dicts first.
+    """
+    def render(self, content: Any) -> bytes:
+        return to_json(content, fallback=_serialise_unknown, inf_nan_mode="null")
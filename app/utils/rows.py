@@ -0,0 +1,41 @@
+from collections.abc import Mapping
+
+def column_index(description) -> dict:
+    """
+    Maps each column name of a result set to its position. Built once per result set from
+    cursor.description and shared by every Row read from it.
+    """
+    return {column[0]: position for position, column in enumerate(description)}
+
+class Row(Mapping):
+    """
+    A read-only view of one result row with dict-style access by column name.
+
+    The values stay in the sequence returned by the driver and the name-to-position map is
+    shared across the whole result set, so a row costs one small object instead of a full
+    dict. Rows compare equal to dicts with the same items and unpack with `**row`.
+    """
+    __slots__ = ("_index", "_values")
+
+    def __init__(self, index: dict, values):
+        """
+        :param index: Column name to position map from column_index().
+        :param values: The row's values, in column order.
+        """
+        self._index = index
+        self._values = values
+
+    def __getitem__(self, key):
+        return self._values[self._index[key]]
+
+    def __contains__(self, key):
+        return key in self._index
+
+    def __iter__(self):
+        return iter(self._index)
+
+    def __len__(self):
+        return len(self._index)
+
+    def __repr__(self):
+        return f"Row({dict(self)!r})"
@@ -4,6 +4,30 @@ from app.utils.messages import Messages
 from http import HTTPStatus
 
 from .error_constants import TYPE_CONVERSION_ERROR, UNIQUE_KEY_CONSTRAINT
+from app.utils.config import BULK_EXECUTEMANY_THRESHOLD
+from app.utils.rows import Row, column_index
+
+def _executemany(cursor, query, params):
+    """
+    Runs `query` once per parameter set. At or above BULK_EXECUTEMANY_THRESHOLD rows the
+    driver's fast_executemany mode is enabled, which binds all rows as a parameter array and
+    sends them in a single round trip instead of one per row.
+
+    :param cursor: The database cursor to execute on.
+    :param query: The parameterised SQL statement.
+    :param params: List of tuples of parameters, one per row.
+    """
+    bulk = 0 < BULK_EXECUTEMANY_THRESHOLD <= len(params)
+    if not bulk:
+        cursor.executemany(query, params)
+        return
+
+    previous = getattr(cursor, "fast_executemany", False)
+    cursor.fast_executemany = True
+    try:
+        cursor.executemany(query, params)
+    finally:
+        cursor.fast_executemany = previous
 
 class SelectStatementExecutor:
     def __init__(self, cursor):
@@ -20,7 +44,7 @@ class SelectStatementExecutor:
 
         :param query: The SQL SELECT query as a string.
         :param params: Optional dictionary or tuple of parameters for the query.
-        :return: List of rows as dictionaries.
+        :return: List of Row mappings, one per result row.
         """
         try:
             Debug.log(f"Executing SQL: {query} with parameters: {params}")
@@ -31,34 +55,68 @@ class SelectStatementExecutor:
             result = self.cursor.fetchall()
         
         except Exception as e:
-            Debug.log(f"Database error during select: {str(e)}")
-            self.cursor.connection.rollback()
-            if TYPE_CONVERSION_ERROR in str(e):
-                raise ValueError(
-                    APIResponse(
-                        status=HTTPStatus.BAD_REQUEST,
-                        message=Messages.INVALID_TYPE,
-                        data=None
-                    )
+            self._raise_select_error(e)
+        
+        index = column_index(self.cursor.description)
+        return [Row(index, row) for row in result]
+
+    def iter_select(self, query, params=None, batch_size=500):
+        """
+        Executes a SELECT statement and yields the rows one at a time, pulling them from the
+        driver in batches of `batch_size` with fetchmany so the full result set is never held
+        in memory.
+
+        :param query: The SQL SELECT query as a string.
+        :param params: Optional dictionary or tuple of parameters for the query.
+        :param batch_size: Number of rows to fetch from the driver per round trip.
+        :return: Generator of Row mappings.
+        """
+        try:
+            Debug.log(f"Executing SQL: {query} with parameters: {params}")
+            if params:
+                self.cursor.execute(query, params)
+            else:
+                self.cursor.execute(query)
+            index = column_index(self.cursor.description)
+        except Exception as e:
+            self._raise_select_error(e)
+
+        while True:
+            try:
+                rows = self.cursor.fetchmany(batch_size)
+            except Exception as e:
+                self._raise_select_error(e)
+            if not rows:
+                break
+            for row in rows:
+                yield Row(index, row)
+
+    def _raise_select_error(self, e):
+        Debug.log(f"Database error during select: {str(e)}")
+        if TYPE_CONVERSION_ERROR in str(e):
+            raise ValueError(
+                APIResponse(
+                    status=HTTPStatus.BAD_REQUEST,
+                    message=Messages.INVALID_TYPE,
+                    data=None
                 )
-            elif UNIQUE_KEY_CONSTRAINT in str(e):
-                raise ValueError(
-                    APIResponse(
-                        status=HTTPStatus.CONFLICT,
-                        message=Messages.DUPLICATION_ERROR,
-                        data=None
-                    )
+            )
+        elif UNIQUE_KEY_CONSTRAINT in str(e):
+            raise ValueError(
+                APIResponse(
+                    status=HTTPStatus.CONFLICT,
+                    message=Messages.DUPLICATION_ERROR,
+                    data=None
                 )
-            else:
-                raise ValueError(
-                    APIResponse(
-                        status=HTTPStatus.INTERNAL_SERVER_ERROR,
-                        message=Messages.DB_ERROR,
-                        data=None
-                    )
+            )
+        else:
+            raise ValueError(
+                APIResponse(
+                    status=HTTPStatus.INTERNAL_SERVER_ERROR,
+                    message=Messages.DB_ERROR,
+                    data=None
                 )
-        
-        return [dict(zip([column[0] for column in self.cursor.description], row)) for row in result]
+            )
         
 class InsertStatementExecutor:
     def __init__(self, cursor):
@@ -69,7 +127,7 @@ class InsertStatementExecutor:
         """
         self.cursor = cursor
 
-    def execute_insert(self, query, params=None, commit=True):
+    def execute_insert(self, query, params=None):
         """
         Executes an INSERT statement.
 
@@ -85,11 +143,7 @@ class InsertStatementExecutor:
 
             record_id = self.cursor.fetchone()[0]
             Debug.log(f"Inserted record with ID: {record_id}")
-
-            if commit:
-                self.cursor.connection.commit()
         except Exception as e:
-            self.cursor.connection.rollback()
             Debug.log(f"Database error during insert: {str(e)}")
             if UNIQUE_KEY_CONSTRAINT in str(e):
                 raise ValueError(
@@ -117,6 +171,53 @@ class InsertStatementExecutor:
             
         return record_id
         
+    def execute_insert_returning(self, query, params=None):
+        """
+        Executes a multi-row INSERT ... OUTPUT INSERTED... statement and returns every row
+        produced by the OUTPUT clause.
+
+        :param query: The SQL INSERT query as a string.
+        :param params: Optional tuple of parameters for the query.
+        :return: List of Row mappings, one per output row.
+        """
+        try:
+            Debug.log(f"Executing SQL: {query} with parameters: {params}")
+            if params:
+                self.cursor.execute(query, params)
+            else:
+                self.cursor.execute(query)
+
+            index = column_index(self.cursor.description)
+            rows = [Row(index, row) for row in self.cursor.fetchall()]
+            Debug.log(f"Inserted {len(rows)} record(s)")
+        except Exception as e:
+            Debug.log(f"Database error during insert returning: {str(e)}")
+            if UNIQUE_KEY_CONSTRAINT in str(e):
+                raise ValueError(
+                    APIResponse(
+                        status=HTTPStatus.CONFLICT,
+                        message=Messages.DUPLICATION_ERROR,
+                        data=None
+                    )
+                )
+            elif TYPE_CONVERSION_ERROR in str(e):
+                raise ValueError(
+                    APIResponse(
+                        status=HTTPStatus.BAD_REQUEST,
+                        message=Messages.INVALID_TYPE,
+                        data=None
+                    )
+                )
+            raise ValueError(
+                APIResponse(
+                    status=HTTPStatus.INTERNAL_SERVER_ERROR,
+                    message=Messages.DB_ERROR,
+                    data=None
+                )
+            )
+
+        return rows
+
     def execute_insert_many(self, query, params=None):
         """
         Executes an INSERT statement for multiple records.
@@ -127,14 +228,13 @@ class InsertStatementExecutor:
         try:
             Debug.log(f"Executing SQL: {query} with parameters: {params}")
             if params:
-                self.cursor.executemany(query, params)
+                _executemany(self.cursor, query, params)
             else:
                 self.cursor.execute(query)
 
             inserted_count = self.cursor.rowcount if self.cursor.rowcount != -1 else len(params)
             Debug.log(f"Inserted {inserted_count} record(s)")
         except Exception as e:
-            self.cursor.connection.rollback()
             Debug.log(f"Database error during insert many: {str(e)}")
             if UNIQUE_KEY_CONSTRAINT in str(e):
                 raise ValueError(
@@ -169,7 +269,7 @@ class UpdateStatementExecutor:
         """
         self.cursor = cursor
 
-    def execute_update(self, query, params=None, commit=True):
+    def execute_update(self, query, params=None):
         """
         Executes an UPDATE statement.
 
@@ -185,12 +285,9 @@ class UpdateStatementExecutor:
 
             if self.cursor.rowcount == 0:
                 raise ValueError(Messages.RECORD_NOT_FOUND)
-            if commit:
-                self.cursor.connection.commit()
             Debug.log(f"Updated {self.cursor.rowcount} record(s)")
 
         except Exception as e:
-            self.cursor.connection.rollback()
             Debug.log(f"Database error during update: {str(e)}")
             if UNIQUE_KEY_CONSTRAINT in str(e):
                 raise ValueError(
@@ -233,12 +330,13 @@ class DeleteStatementExecutor:
         """
         self.cursor = cursor
 
-    def execute_delete(self, query, params=None, commit=True):
+    def execute_delete(self, query, params=None, require_rows=True):
         """
         Executes a DELETE statement.
 
         :param query: The SQL DELETE query as a string.
         :param params: Optional dictionary or tuple of parameters for the query.
+        :param require_rows: Raise RECORD_NOT_FOUND when nothing was deleted.
         """
         try:
             Debug.log(f"Executing SQL: {query} with parameters: {params}")
@@ -247,15 +345,12 @@ class DeleteStatementExecutor:
             else:
                 self.cursor.execute(query)
             
-            if self.cursor.rowcount == 0:
+            if require_rows and self.cursor.rowcount == 0:
                 raise ValueError(Messages.RECORD_NOT_FOUND)
             
-            if commit:
-                self.cursor.connection.commit()
             Debug.log(f"Deleted {self.cursor.rowcount} record(s)")
 
         except Exception as e:
-            self.cursor.connection.rollback()
             Debug.log(f"Database error during delete: {str(e)}")
 
             if Messages.RECORD_NOT_FOUND in str(e):
@@ -274,7 +369,7 @@ class DeleteStatementExecutor:
                 )
             )
         
-    def execute_delete_many(self, query, params=None, commit=True):
+    def execute_delete_many(self, query, params=None):
         """
         Executes a DELETE statement for multiple records.
 
@@ -284,17 +379,13 @@ class DeleteStatementExecutor:
         try:
             Debug.log(f"Executing SQL: {query} with parameters: {params}")
             if params:
-                self.cursor.executemany(query, params)
+                _executemany(self.cursor, query, params)
             else:
                 self.cursor.execute(query)
 
-            if commit:
-                self.cursor.connection.commit()
-
             Debug.log(f"Deleted {self.cursor.rowcount} record(s)")
 
         except Exception as e:
-            self.cursor.connection.rollback()
             Debug.log(f"Database error during delete many: {str(e)}")
             raise ValueError(
                 APIResponse(
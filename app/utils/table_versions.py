@@ -0,0 +1,84 @@
+import time
+
+VERSIONS_TABLE = "TableVersions"
+VERSIONS_TABLE_EXISTS_SQL = "SELECT OBJECT_ID(?, 'U') AS object_id"
+
+# Seconds between checks for the TableVersions table while it is missing, e.g. until migration
+# 4 is applied by hand when DB_MIGRATE_ON_STARTUP is off
+VERSIONS_TABLE_CHECK_INTERVAL = 30
+
+# Tables whose writes are counted; each has a row in TableVersions (see migration 4)
+VERSIONED_TABLES = ("Users", "CarInsurancePolicy", "OptionalExtras", "CarInsurancePolicyOptionalExtras")
+
+# Callbacks told about every set of versions read, e.g. so in-memory copies of a table can
+# notice when another process has written to it
+_version_observers = []
+
+def observe_table_versions(callback):
+    """
+    Registers `callback` to be called with the {table_name: version} dict of every
+    read_table_versions call.
+    """
+    _version_observers.append(callback)
+
+# Whether TableVersions exists: None until checked, then trusted once seen
+_versions_table_exists = None
+_versions_table_checked_at = None
+
+def set_versions_table_exists(exists: bool):
+    """
+    Records whether TableVersions exists, e.g. after the startup migrations ran. None
+    forgets it, so the next read or bump checks again.
+    """
+    global _versions_table_exists, _versions_table_checked_at
+    _versions_table_exists = exists
+    _versions_table_checked_at = None if exists is None else time.monotonic()
+
+def _versions_table_check_due() -> bool:
+    if _versions_table_exists:
+        return False
+    return _versions_table_checked_at is None or time.monotonic() - _versions_table_checked_at >= VERSIONS_TABLE_CHECK_INTERVAL
+
+def bump_table_versions(cursor, tables):
+    """
+    Increments the change counter of each table in `tables`. Runs on the request's cursor
+    right before its commit, so the new versions become visible together with the writes.
+    Does nothing while TableVersions does not exist, so writes still succeed on a database
+    that has not been migrated yet.
+    """
+    if _versions_table_check_due():
+        cursor.execute(VERSIONS_TABLE_EXISTS_SQL, (VERSIONS_TABLE,))
+        set_versions_table_exists(cursor.fetchone()[0] is not None)
+    if not _versions_table_exists:
+        return
+    tables = sorted(tables)
+    placeholders = ", ".join("?" for _ in tables)
+    cursor.execute(
+        f"UPDATE {VERSIONS_TABLE} SET version = version + 1 WHERE table_name IN ({placeholders})",
+        tuple(tables)
+    )
+
+async def read_table_versions(db, tables) -> dict:
+    """
+    Reads the current change counter of each table in `tables` with a single primary key
+    lookup.
+
+    :param db: An AsyncDatabase.
+    :return: Version per table name; tables without a counter row are missing, and so is
+        every table while TableVersions does not exist.
+    """
+    if _versions_table_check_due():
+        rows = await db.select(VERSIONS_TABLE_EXISTS_SQL, (VERSIONS_TABLE,))
+        set_versions_table_exists(rows[0]["object_id"] is not None)
+    if not _versions_table_exists:
+        return {}
+    tables = sorted(tables)
+    placeholders = ", ".join("?" for _ in tables)
+    rows = await db.select(
+        f"SELECT table_name, version FROM {VERSIONS_TABLE} WHERE table_name IN ({placeholders})",
+        tuple(tables)
+    )
+    versions = {row["table_name"]: row["version"] for row in rows}
+    for callback in _version_observers:
+        callback(versions)
+    return versions
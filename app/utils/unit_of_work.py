@@ -0,0 +1,120 @@
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+import pyodbc
+
+from .debug import Debug
+from app.utils.async_db import AsyncDatabase, run_blocking
+from app.utils.table_versions import bump_table_versions
+
+_current_unit_of_work = ContextVar("current_unit_of_work", default=None)
+
+class UnitOfWork:
+    def __init__(self, db_pool):
+        """
+        One database transaction spanning a whole request. Statement executors never commit,
+        so everything the request writes is committed once at the end, or rolled back if the
+        request fails.
+
+        The pooled connection is only checked out on the first call to begin(), so requests
+        rejected by validation never touch the database.
+
+        :param db_pool: The ConnectionPool to check the connection out of.
+        """
+        self.db_pool = db_pool
+        self.connection = None
+        self.cursor = None
+        self.db = None
+        self._pooled = None
+        self._after_commit = []
+        self._touched_tables = set()
+
+    async def begin(self):
+        """
+        Returns the request's cursor, checking a connection out of the pool on first use.
+        """
+        if self.cursor is None:
+            self._pooled = await self.db_pool.acquire_async()
+            self.connection = self._pooled.connection
+            self.cursor = self.connection.cursor()
+            self.db = AsyncDatabase(self.cursor)
+        return self.cursor
+
+    async def commit(self):
+        if self.connection is not None:
+            if self._touched_tables:
+                await run_blocking(bump_table_versions, self.cursor, self._touched_tables)
+            await run_blocking(self.connection.commit)
+        self._touched_tables = set()
+        callbacks, self._after_commit = self._after_commit, []
+        for callback in callbacks:
+            callback()
+
+    async def rollback(self):
+        self._after_commit = []
+        self._touched_tables = set()
+        if self.connection is not None:
+            await run_blocking(self.connection.rollback)
+
+    async def close(self, discard: bool = False):
+        """
+        Returns the connection to the pool, or drops it if it may be broken.
+        """
+        if self._pooled is not None:
+            pooled, self._pooled = self._pooled, None
+            self.connection = self.cursor = self.db = None
+            await self.db_pool.release_async(pooled, discard)
+
+def after_commit(callback):
+    """
+    Runs `callback` once the current request's transaction has committed, e.g. to update
+    in-process caches only with data that is actually durable. Outside a unit of work the
+    callback runs immediately.
+    """
+    unit_of_work = _current_unit_of_work.get()
+    if unit_of_work is None:
+        callback()
+    else:
+        unit_of_work._after_commit.append(callback)
+
+def touch_tables(*tables):
+    """
+    Records that the current request wrote to `tables`. Their change counters are bumped in
+    the same transaction just before it commits, which changes the ETags of reads that
+    depend on them. Outside a unit of work nothing is recorded.
+    """
+    unit_of_work = _current_unit_of_work.get()
+    if unit_of_work is not None:
+        unit_of_work._touched_tables.update(tables)
+
+@asynccontextmanager
+async def transaction(db_pool):
+    """
+    Yields a UnitOfWork, committing on success or rolling back on any exception before its
+    connection (if one was used) goes back to the pool.
+
+    Usage:
+        async with transaction(pool) as unit_of_work:
+            service = UserService(await unit_of_work.begin())
+    """
+    unit_of_work = UnitOfWork(db_pool)
+    token = _current_unit_of_work.set(unit_of_work)
+    discard = False
+    try:
+        yield unit_of_work
+    except BaseException as e:
+        Debug.log("Rolling back request transaction")
+        discard = isinstance(e, pyodbc.Error)
+        try:
+            await unit_of_work.rollback()
+        except pyodbc.Error:
+            discard = True
+        raise
+    else:
+        try:
+            await unit_of_work.commit()
+        except pyodbc.Error:
+            discard = True
+            raise
+    finally:
+        _current_unit_of_work.reset(token)
+        await unit_of_work.close(discard)
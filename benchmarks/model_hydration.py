@@ -0,0 +1,59 @@
+"""
+Micro-benchmark for turning database rows into response models.
+
+Compares, per row, building the same CarInsurancePolicy models (nothing is dumped):
+  - legacy:      the former path, i.e. a validating constructor that then re-assigned every
+                 field, one row at a time
+  - per_row:     CarInsurancePolicy.model_validate(row), one row at a time
+  - page:        CAR_INSURANCE_POLICY_LIST.validate_python(rows), the whole page in one call
+
+Usage:
+    python -m benchmarks.model_hydration [--rows 1000] [--repeat 5]
+"""
+import argparse
+import timeit
+from datetime import date
+
+from app.models.car_insurance_policy import CAR_INSURANCE_POLICY_LIST, CarInsurancePolicy
+from app.utils.rows import Row, column_index
+
+class LegacyCarInsurancePolicy(CarInsurancePolicy):
+    # Reproduces the constructor this benchmark was written against
+    def __init__(self, **data):
+        super().__init__(**data)
+        for name, value in data.items():
+            setattr(self, name, value.upper() if name == "vrn" else value)
+
+def make_rows(count: int) -> list:
+    index = column_index([(column,) for column in CarInsurancePolicy.model_fields])
+    return [
+        Row(index, (n, n % 50 + 1, f"AB{n:04d}", "Toyota", "Corolla", f"POL{n:06d}", date(2025, 1, 1), date(2025, 12, 31), "Comprehensive"))
+        for n in range(1, count + 1)
+    ]
+
+def as_strings(row) -> dict:
+    return {**row, "start_date": row["start_date"].isoformat(), "end_date": row["end_date"].isoformat()}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    cases = {
+        "legacy": lambda: [LegacyCarInsurancePolicy(**as_strings(row)) for row in rows],
+        "per_row": lambda: [CarInsurancePolicy.model_validate(row) for row in rows],
+        "page": lambda: CAR_INSURANCE_POLICY_LIST.validate_python(rows),
+    }
+
+    baseline = None
+    print(f"{'path':<10} {'us/row':>8} {'speedup':>8}")
+    for name, case in cases.items():
+        best = min(timeit.repeat(case, number=1, repeat=args.repeat))
+        per_row = best / args.rows * 1e6
+        baseline = baseline or per_row
+        print(f"{name:<10} {per_row:>8.2f} {baseline / per_row:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
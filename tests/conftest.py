@@ -0,0 +1,20 @@
+import pytest
+from app.utils.auth import token_revocations
+from app.utils.cache import user_cache, token_cache
+from app.services.optional_extra_catalog import optional_extra_catalog
+from app.utils.table_versions import set_versions_table_exists
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    # Cached users, tokens, extras and revocations must not leak between tests that patch lookups differently
+    user_cache.clear()
+    optional_extra_catalog.clear()
+    token_revocations.clear()
+    token_cache.clear()
+    # Migrated test databases have TableVersions; tests of the missing table reset this themselves
+    set_versions_table_exists(True)
+    yield
+    user_cache.clear()
+    optional_extra_catalog.clear()
+    token_revocations.clear()
+    token_cache.clear()
@@ -0,0 +1,102 @@
+import json
+import os
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.utils.assets import (
+    IMMUTABLE_CACHE_CONTROL, AssetManifest, FingerprintedStaticFiles, fingerprint_assets, fingerprinted_name, minify
+)
+
+SCRIPT = """
+// Greets the user
+function greet(name) {
+    /* build the message */
+    const message = "Hello, " + name;
+    return message;
+}
+"""
+
+STYLE = """
+body {
+    margin: 0;   /* reset */
+    color: #333333;
+}
+"""
+
+@pytest.fixture
+def static_dir(tmp_path):
+    (tmp_path / "js").mkdir()
+    (tmp_path / "css").mkdir()
+    (tmp_path / "js" / "main.js").write_text(SCRIPT)
+    (tmp_path / "css" / "style.css").write_text(STYLE)
+    (tmp_path / "favicon.png").write_bytes(b"\x89PNG")
+    return tmp_path
+
+def test_minify():
+    script = minify("js/main.js", SCRIPT)
+    assert "Greets" not in script and "build the message" not in script
+    assert '"Hello, "' in script and len(script) < len(SCRIPT)
+    style = minify("css/style.css", STYLE)
+    assert "reset" not in style and "margin:0" in style
+    assert minify("notes.txt", SCRIPT) == SCRIPT
+
+def test_fingerprinted_name_follows_content():
+    first = fingerprinted_name("js/main.js", b"one")
+    assert first.startswith("js/main.") and first.endswith(".js")
+    assert first == fingerprinted_name("js/main.js", b"one")
+    assert first != fingerprinted_name("js/main.js", b"two")
+
+def test_fingerprint_assets_writes_copies_and_manifest(static_dir):
+    manifest = fingerprint_assets(str(static_dir))
+    assert set(manifest) == {"js/main.js", "css/style.css"}
+    assert manifest["js/main.js"].startswith("dist/js/main.")
+    assert (static_dir / manifest["js/main.js"]).read_text() == minify("js/main.js", SCRIPT)
+    assert json.loads((static_dir / "dist" / "manifest.json").read_text()) == manifest
+
+def test_fingerprint_assets_removes_previous_build(static_dir):
+    old = fingerprint_assets(str(static_dir))["js/main.js"]
+    (static_dir / "js" / "main.js").write_text(SCRIPT + "greet('world');")
+    new = fingerprint_assets(str(static_dir))["js/main.js"]
+    assert new != old
+    assert not (static_dir / old).exists()
+
+def test_manifest_resolves_urls(static_dir):
+    manifest = fingerprint_assets(str(static_dir))
+    assets = AssetManifest(str(static_dir), "/app/static")
+    assert assets.url("js/main.js") == f"/app/static/{manifest['js/main.js']}"
+    assert assets.url("/css/style.css") == f"/app/static/{manifest['css/style.css']}"
+    assert assets.url("favicon.png") == "/app/static/favicon.png"
+
+def test_manifest_missing_serves_sources(static_dir):
+    assert AssetManifest(str(static_dir), "/app/static").url("js/main.js") == "/app/static/js/main.js"
+
+def test_manifest_ignores_stale_copies_when_checking_sources(static_dir):
+    manifest = fingerprint_assets(str(static_dir))
+    source = static_dir / "js" / "main.js"
+    built = os.stat(static_dir / "dist" / "manifest.json").st_mtime
+    checked = AssetManifest(str(static_dir), "/app/static", check_sources=True)
+    unchecked = AssetManifest(str(static_dir), "/app/static")
+
+    assert checked.url("js/main.js") == f"/app/static/{manifest['js/main.js']}"
+    os.utime(source, (built + 10, built + 10))
+    assert checked.url("js/main.js") == "/app/static/js/main.js"
+    assert unchecked.url("js/main.js") == f"/app/static/{manifest['js/main.js']}"
+
+def test_fingerprinted_files_are_immutable(static_dir):
+    manifest = fingerprint_assets(str(static_dir))
+    api = FastAPI()
+    api.mount("/app/static", FingerprintedStaticFiles(directory=str(static_dir)), name="static")
+    client = TestClient(api)
+
+    response = client.get(f"/app/static/{manifest['js/main.js']}")
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+
+    response = client.get(f"/app/static/{manifest['js/main.js']}", headers={"If-None-Match": response.headers["etag"]})
+    assert response.status_code == 304
+    assert response.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+
+    assert "cache-control" not in client.get("/app/static/js/main.js").headers
+    assert client.get("/app/static/dist/js/missing.js").status_code == 404
@@ -0,0 +1,44 @@
+import threading
+import pytest
+from app.utils.async_db import AsyncDatabase, run_blocking
+
+@pytest.fixture
+def mock_cursor(mocker):
+    cursor = mocker.Mock()
+    cursor.connection = mocker.Mock()
+    return cursor
+
+@pytest.mark.asyncio
+async def test_run_blocking_uses_db_thread_pool():
+    thread_name = await run_blocking(lambda: threading.current_thread().name)
+    assert thread_name.startswith("db")
+
+@pytest.mark.asyncio
+async def test_select_runs_executor(mocker, mock_cursor):
+    mock_select = mocker.patch("app.utils.statements.SelectStatementExecutor.execute_select", return_value=[{"id": 1}])
+    db = AsyncDatabase(mock_cursor)
+    result = await db.select("SELECT * FROM test WHERE id = ?", (1,))
+    assert result == [{"id": 1}]
+    mock_select.assert_called_once_with("SELECT * FROM test WHERE id = ?", (1,))
+
+@pytest.mark.asyncio
+async def test_delete_forwards_keyword_arguments(mocker, mock_cursor):
+    mock_delete = mocker.patch("app.utils.statements.DeleteStatementExecutor.execute_delete", return_value=None)
+    db = AsyncDatabase(mock_cursor)
+    await db.delete("DELETE FROM test WHERE parent_id = ?", (1,), require_rows=False)
+    mock_delete.assert_called_once_with("DELETE FROM test WHERE parent_id = ?", (1,), require_rows=False)
+
+@pytest.mark.asyncio
+async def test_select_propagates_errors(mocker, mock_cursor):
+    mocker.patch("app.utils.statements.SelectStatementExecutor.execute_select", side_effect=ValueError("boom"))
+    db = AsyncDatabase(mock_cursor)
+    with pytest.raises(ValueError):
+        await db.select("SELECT * FROM test")
+
+@pytest.mark.asyncio
+async def test_iter_select_yields_batches(mock_cursor):
+    mock_cursor.description = [("id",)]
+    mock_cursor.fetchmany.side_effect = [[(1,), (2,)], [(3,)], []]
+    db = AsyncDatabase(mock_cursor)
+    batches = [batch async for batch in db.iter_select("SELECT * FROM test", batch_size=2)]
+    assert batches == [[{"id": 1}, {"id": 2}], [{"id": 3}]]
@@ -0,0 +1,57 @@
+import pytest
+from app.utils.cache import TTLCache
+
+def test_get_missing_returns_none():
+    cache = TTLCache(max_size=2, ttl=60)
+    assert cache.get("missing") is None
+
+def test_set_and_get():
+    cache = TTLCache(max_size=2, ttl=60)
+    cache.set(1, "alice")
+    assert cache.get(1) == "alice"
+
+def test_entry_expires(mocker):
+    clock = mocker.patch("app.utils.cache.time.monotonic", return_value=100.0)
+    cache = TTLCache(max_size=2, ttl=10)
+    cache.set(1, "alice")
+    clock.return_value = 110.0
+    assert cache.get(1) is None
+    assert len(cache) == 0
+
+def test_entry_ttl_is_capped_by_cache_ttl(mocker):
+    clock = mocker.patch("app.utils.cache.time.monotonic", return_value=100.0)
+    cache = TTLCache(max_size=2, ttl=10)
+    cache.set("short", 1, ttl=5)
+    cache.set("long", 2, ttl=60)
+    cache.set("expired", 3, ttl=0)
+    assert cache.get("expired") is None
+    clock.return_value = 106.0
+    assert cache.get("short") is None
+    assert cache.get("long") == 2
+    clock.return_value = 111.0
+    assert cache.get("long") is None
+
+def test_least_recently_used_is_evicted():
+    cache = TTLCache(max_size=2, ttl=60)
+    cache.set(1, "alice")
+    cache.set(2, "bob")
+    cache.get(1)
+    cache.set(3, "carol")
+    assert cache.get(2) is None
+    assert cache.get(1) == "alice"
+    assert cache.get(3) == "carol"
+
+def test_invalidate_and_clear():
+    cache = TTLCache(max_size=2, ttl=60)
+    cache.set(1, "alice")
+    cache.set(2, "bob")
+    cache.invalidate(1)
+    assert cache.get(1) is None
+    cache.clear()
+    assert len(cache) == 0
+
+@pytest.mark.parametrize("max_size, ttl", [(0, 60), (2, 0)])
+def test_disabled_cache_stores_nothing(max_size, ttl):
+    cache = TTLCache(max_size=max_size, ttl=ttl)
+    cache.set(1, "alice")
+    assert cache.get(1) is None
@@ -1,5 +1,7 @@
 import pytest
-from app.models.car_insurance_policy import CarInsurancePolicy
+from datetime import date
+from app.models.car_insurance_policy import CAR_INSURANCE_POLICY_LIST, CarInsurancePolicy
+from app.utils.rows import Row, column_index
 
 @pytest.fixture
 def valid_policy_data():
@@ -105,4 +107,14 @@ async def test_start_date_after_end_date(valid_policy_data):
     policy = CarInsurancePolicy(**data)
     with pytest.raises(ValueError) as exc:
         await policy.validate_car_insurance_policy_values()
-    assert "Start date must be before end date." in str(exc.value)
\ No newline at end of file
+    assert "Start date must be before end date." in str(exc.value)
+def test_constructor_uppercases_vrn(valid_policy_data):
+    policy = CarInsurancePolicy(**{**valid_policy_data, "vrn": "abc123"})
+    assert policy.vrn == "ABC123"
+
+def test_policy_list_validates_rows_and_formats_dates(valid_policy_data):
+    row = {**valid_policy_data, "start_date": date(2025, 1, 1), "end_date": date(2025, 12, 31)}
+    index = column_index([(column,) for column in row])
+    policies = CAR_INSURANCE_POLICY_LIST.validate_python([Row(index, tuple(row.values()))])
+    assert policies == [CarInsurancePolicy(**valid_policy_data)]
+    assert policies[0].model_dump_json() == CarInsurancePolicy(**valid_policy_data).model_dump_json()
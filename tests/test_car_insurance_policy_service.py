@@ -1,10 +1,14 @@
 import pytest
+from datetime import date
+from http import HTTPStatus
 from app.services.car_insurance_policy_service import CarInsurancePolicyService
 from app.services.user_service import UserService
-from app.models.car_insurance_policy import CarInsurancePolicy
+from app.models.car_insurance_policy import CarInsurancePolicy, CarInsurancePolicyBatchItem
 from app.models.optional_extra import OptionalExtra
 from app.models.user import User
 from app.utils.messages import Messages
+from app.utils.response import APIResponse
+from app.services.optional_extra_catalog import optional_extra_catalog
 
 @pytest.fixture
 def mock_cursor(mocker):
@@ -45,13 +49,14 @@ def optional_extras():
 @pytest.mark.asyncio
 async def test_create_car_insurance_policy_success(mocker, mock_cursor, admin_user, policy, optional_extras):
     mocker.patch("app.services.user_service.UserService", autospec=True)
-    mocker.patch("app.services.car_insurance_policy_service.InsertStatementExecutor.execute_insert", return_value=101)
-    mocker.patch("app.services.car_insurance_policy_service.InsertStatementExecutor.execute_insert_many", return_value=None)
+    mocker.patch("app.utils.statements.InsertStatementExecutor.execute_insert", return_value=101)
+    mocker.patch("app.utils.statements.InsertStatementExecutor.execute_insert_many", return_value=None)
     mocker.patch.object(CarInsurancePolicyService, "compare_valid_optional_extras", return_value=None)
     service = CarInsurancePolicyService(mock_cursor, admin_user, policy, optional_extras)
     policy_id = await service.create_car_insurance_policy()
     assert policy_id == 101
-    mock_cursor.commit.assert_called_once()
+    # Committed by the request's unit of work, not the service
+    mock_cursor.commit.assert_not_called()
 
 @pytest.mark.asyncio
 async def test_update_car_insurance_policy_success(mocker, mock_cursor, admin_user, policy, optional_extras):
@@ -62,13 +67,13 @@ async def test_update_car_insurance_policy_success(mocker, mock_cursor, admin_us
     mocker.patch.object(CarInsurancePolicyService, "perform_update", return_value=None)
     service = CarInsurancePolicyService(mock_cursor, admin_user, policy, optional_extras)
     await service.update_car_insurance_policy()
-    mock_cursor.commit.assert_called_once()
+    mock_cursor.commit.assert_not_called()
 
 @pytest.mark.asyncio
 async def test_delete_car_insurance_policy_success(mocker, mock_cursor, admin_user, policy):
     mocker.patch("app.services.user_service.UserService", autospec=True)
-    mocker.patch("app.services.car_insurance_policy_service.SelectStatementExecutor.execute_select", return_value=[])
-    mocker.patch("app.services.car_insurance_policy_service.DeleteStatementExecutor.execute_delete", return_value=None)
+    mocker.patch("app.utils.statements.SelectStatementExecutor.execute_select", return_value=[])
+    mocker.patch("app.utils.statements.DeleteStatementExecutor.execute_delete", return_value=None)
     service = CarInsurancePolicyService(mock_cursor, admin_user, policy)
     result = await service.delete_car_insurance_policy()
     assert result == policy.ci_policy_id
@@ -76,24 +81,74 @@ async def test_delete_car_insurance_policy_success(mocker, mock_cursor, admin_us
 @pytest.mark.asyncio
 async def test_list_all_car_insurance_policies_admin(mocker, mock_cursor, admin_user, policy):
     mocker.patch("app.services.user_service.UserService.check_admin", return_value=True)
-    mocker.patch("app.services.car_insurance_policy_service.SelectStatementExecutor.execute_select", return_value=[policy.model_dump()])
+    mocker.patch("app.utils.statements.SelectStatementExecutor.execute_select", return_value=[policy.model_dump()])
     mocker.patch.object(CarInsurancePolicyService, "format_car_insurance_policies", return_value=[policy])
     service = CarInsurancePolicyService(mock_cursor, admin_user, policy)
     result = await service.list_all_car_insurance_policies()
     assert result == [policy]
 
+def catalog_version(version=1):
+    return [{"table_name": "OptionalExtras", "version": version}]
+
+async def load_catalog(mocker, optional_extras):
+    db = mocker.Mock()
+    db.select = mocker.AsyncMock(side_effect=[catalog_version(), [extra.model_dump() for extra in optional_extras]])
+    await optional_extra_catalog.load(db)
+
 @pytest.mark.asyncio
 async def test_get_policy_extras(mocker, mock_cursor, admin_user, policy, optional_extras):
-    mocker.patch("app.services.car_insurance_policy_service.SelectStatementExecutor.execute_select", return_value=[extra.model_dump() for extra in optional_extras])
-    mocker.patch("app.services.optional_extra_service.OptionalExtraService.format_optional_extras", side_effect=lambda x: x)
+    mocker.patch(
+        "app.utils.statements.SelectStatementExecutor.execute_select",
+        side_effect=[
+            [{"ci_policy_id": policy.ci_policy_id, "extra_id": extra.extra_id} for extra in optional_extras],
+            catalog_version(),
+            [extra.model_dump() for extra in optional_extras]
+        ]
+    )
     service = CarInsurancePolicyService(mock_cursor, admin_user, policy)
     result = await service.get_policy_extras([policy])
-    assert result[0]["policy"]["ci_policy_id"] == policy.ci_policy_id
-    assert result[0]["optional_extras"] == [extra.model_dump() for extra in optional_extras]
+    assert result[0]["policy"] is policy
+    assert result[0]["optional_extras"] == optional_extras
+
+@pytest.mark.asyncio
+async def test_get_policy_extras_single_query_for_many_policies(mocker, mock_cursor, admin_user, policy, optional_extras):
+    await load_catalog(mocker, optional_extras)
+    policies = [policy.model_copy(update={"ci_policy_id": policy_id}) for policy_id in range(1, 51)]
+    mock_select = mocker.patch(
+        "app.utils.statements.SelectStatementExecutor.execute_select",
+        return_value=[{"ci_policy_id": 2, "extra_id": 2}, {"ci_policy_id": 2, "extra_id": 1}]
+    )
+    service = CarInsurancePolicyService(mock_cursor, admin_user, policy)
+    result = await service.get_policy_extras(policies)
+    mock_select.assert_called_once()
+    assert len(result) == 50
+    assert result[0]["optional_extras"] == []
+    assert [extra.extra_id for extra in result[1]["optional_extras"]] == [1, 2]
+
+@pytest.mark.asyncio
+async def test_verify_optional_extras_served_from_catalog(mocker, mock_cursor, admin_user, policy, optional_extras):
+    await load_catalog(mocker, optional_extras)
+    mock_select = mocker.patch("app.utils.statements.SelectStatementExecutor.execute_select")
+    service = CarInsurancePolicyService(mock_cursor, admin_user, policy, optional_extras)
+    result = await service.verify_optional_extras([extra.extra_id for extra in optional_extras])
+    assert result == {1, 2}
+    mock_select.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_get_policy_extras_chunks_large_pages(mocker, mock_cursor, admin_user, policy):
+    mocker.patch("app.services.car_insurance_policy_service.POLICY_EXTRAS_BATCH_SIZE", 10)
+    policies = [policy.model_copy(update={"ci_policy_id": policy_id}) for policy_id in range(1, 26)]
+    mock_select = mocker.patch("app.utils.statements.SelectStatementExecutor.execute_select", return_value=[])
+    service = CarInsurancePolicyService(mock_cursor, admin_user, policy)
+    await service.get_policy_extras(policies)
+    assert mock_select.call_count == 3
 
 @pytest.mark.asyncio
 async def test_compare_valid_optional_extras_success(mocker, mock_cursor, admin_user, policy, optional_extras):
-    mocker.patch("app.services.car_insurance_policy_service.SelectStatementExecutor.execute_select", return_value=[extra.model_dump() for extra in optional_extras])
+    mocker.patch(
+        "app.utils.statements.SelectStatementExecutor.execute_select",
+        side_effect=[catalog_version(), [extra.model_dump() for extra in optional_extras]]
+    )
     mocker.patch("app.services.optional_extra_service.OptionalExtraService.format_optional_extras", side_effect=lambda x: x)
     service = CarInsurancePolicyService(mock_cursor, admin_user, policy, optional_extras)
     extra_ids = [extra.extra_id for extra in optional_extras]  # <-- FIX HERE
@@ -103,7 +158,7 @@ async def test_compare_valid_optional_extras_success(mocker, mock_cursor, admin_
 
 @pytest.mark.asyncio
 async def test_compare_valid_optional_extras_invalid(mocker, mock_cursor, admin_user, policy):
-    mocker.patch("app.services.car_insurance_policy_service.SelectStatementExecutor.execute_select", return_value=[])
+    mocker.patch("app.utils.statements.SelectStatementExecutor.execute_select", return_value=[])
     mocker.patch("app.services.optional_extra_service.OptionalExtraService.format_optional_extras", side_effect=lambda x: x)
     service = CarInsurancePolicyService(mock_cursor, admin_user, policy)
     invalid_extra_ids = [999]
@@ -111,24 +166,22 @@ async def test_compare_valid_optional_extras_invalid(mocker, mock_cursor, admin_
         await service.compare_valid_optional_extras(invalid_extra_ids)
     assert Messages.OPTIONAL_EXTRAS_NOT_FOUND.format("999") in str(exc.value)
 
+def authorised_policy_rows(policy, optional_extras, is_owner=1):
+    # Rows as returned by the combined policy/ownership/extras query
+    extras = [extra.model_dump() for extra in optional_extras] or [{"extra_id": None, "name": None, "code": None, "price": None}]
+    return [{**policy.model_dump(), "is_owner": is_owner, **extra} for extra in extras]
+
 @pytest.mark.asyncio
 async def test_check_car_insurance_policy_exists_success(mocker, mock_cursor, admin_user, policy, optional_extras):
-    # Mock get_car_insurance_policy_by_id to return a valid policy dict
-    mocker.patch.object(
-        CarInsurancePolicyService,
-        "get_car_insurance_policy_by_id",
-        return_value=[policy.model_dump()]
-    )
-    # Mock the extras query to return only OptionalExtra fields
-    mocker.patch(
-        "app.services.car_insurance_policy_service.SelectStatementExecutor.execute_select",
-        return_value=[extra.model_dump() for extra in optional_extras]
+    mock_select = mocker.patch(
+        "app.utils.statements.SelectStatementExecutor.execute_select",
+        return_value=authorised_policy_rows(policy, optional_extras)
     )
     service = CarInsurancePolicyService(mock_cursor, admin_user, policy)
     await service.check_car_insurance_policy_exists()
     assert isinstance(service.current_policy, CarInsurancePolicy)
-    assert isinstance(service.current_optional_extras, list)
-    assert all(isinstance(e, OptionalExtra) for e in service.current_optional_extras)
+    assert service.current_optional_extras == optional_extras
+    mock_select.assert_called_once()
 
 @pytest.mark.asyncio
 async def test_perform_update_no_changes(mocker, mock_cursor, admin_user, policy, optional_extras):
@@ -157,7 +210,7 @@ async def test_perform_update_policy_changed(mocker, mock_cursor, admin_user, po
     )
     service.current_policy = changed_policy
     service.current_optional_extras = optional_extras
-    mocker.patch("app.services.car_insurance_policy_service.UpdateStatementExecutor.execute_update", return_value=None)
+    mocker.patch("app.utils.statements.UpdateStatementExecutor.execute_update", return_value=None)
     # update_optional_extras should not be called since optional_extras didn't change
     mocker.patch.object(service, "update_optional_extras", return_value=None)
     await service.perform_update()
@@ -168,7 +221,7 @@ async def test_perform_update_optional_extras_changed(mocker, mock_cursor, admin
     # Set current_optional_extras to something different
     service.current_policy = policy
     service.current_optional_extras = []
-    mocker.patch("app.services.car_insurance_policy_service.UpdateStatementExecutor.execute_update", return_value=None)
+    mocker.patch("app.utils.statements.UpdateStatementExecutor.execute_update", return_value=None)
     mock_update_extras = mocker.patch.object(service, "update_optional_extras", return_value=None)
     await service.perform_update()
     mock_update_extras.assert_called_once()
@@ -180,7 +233,7 @@ async def test_update_optional_extras_add_and_remove(mocker, mock_cursor, admin_
     mocker.patch.object(service, "compare_valid_optional_extras", return_value=None)
     # Mock current_extras to simulate DB state
     mocker.patch(
-        "app.services.car_insurance_policy_service.SelectStatementExecutor.execute_select",
+        "app.utils.statements.SelectStatementExecutor.execute_select",
         return_value=[{"extra_id": 1}]
     )
     # Patch add/remove methods
@@ -197,7 +250,7 @@ async def test_update_optional_extras_remove_only(mocker, mock_cursor, admin_use
     service = CarInsurancePolicyService(mock_cursor, admin_user, policy, optional_extras=[])
     mocker.patch.object(service, "compare_valid_optional_extras", return_value=None)
     mocker.patch(
-        "app.services.car_insurance_policy_service.SelectStatementExecutor.execute_select",
+        "app.utils.statements.SelectStatementExecutor.execute_select",
         return_value=[{"extra_id": 1}]
     )
     mock_add = mocker.patch.object(service, "add_optional_extras", return_value=None)
@@ -210,7 +263,7 @@ async def test_update_optional_extras_remove_only(mocker, mock_cursor, admin_use
 async def test_delete_car_insurance_policy_removes_extras(mocker, mock_cursor, admin_user, policy, optional_extras):
     # Patch SelectStatementExecutor.execute_select to return extras (simulate extras exist)
     mocker.patch(
-        "app.services.car_insurance_policy_service.SelectStatementExecutor.execute_select",
+        "app.utils.statements.SelectStatementExecutor.execute_select",
         return_value=[extra.model_dump() for extra in optional_extras]
     )
     # Patch remove_optional_extras and DeleteStatementExecutor.execute_delete
@@ -218,7 +271,7 @@ async def test_delete_car_insurance_policy_removes_extras(mocker, mock_cursor, a
         CarInsurancePolicyService, "remove_optional_extras", return_value=None
     )
     mocker.patch(
-        "app.services.car_insurance_policy_service.DeleteStatementExecutor.execute_delete",
+        "app.utils.statements.DeleteStatementExecutor.execute_delete",
         return_value=None
     )
     service = CarInsurancePolicyService(mock_cursor, admin_user, policy)
@@ -229,18 +282,37 @@ async def test_delete_car_insurance_policy_removes_extras(mocker, mock_cursor, a
 async def test_get_car_insurance_policy_by_id_forbidden(mocker, mock_cursor, policy):
     user = User(user_id=2, username="user", password="", email="user@example.com", is_admin=False)
     service = CarInsurancePolicyService(mock_cursor, user, policy)
-    # Patch check_user_owns_policy to return False
-    mocker.patch.object(service.user_service, "check_user_owns_policy", return_value=False)
+    mocker.patch("app.utils.statements.SelectStatementExecutor.execute_select", return_value=authorised_policy_rows(policy, [], is_owner=0))
+    with pytest.raises(ValueError) as exc:
+        await service.get_car_insurance_policy_by_id(policy.ci_policy_id)
+    assert Messages.USER_NO_PERMISSION in str(exc.value)
+
+@pytest.mark.asyncio
+async def test_get_car_insurance_policy_by_id_missing_is_forbidden_for_non_admin(mocker, mock_cursor, policy):
+    user = User(user_id=2, username="user", password="", email="user@example.com", is_admin=False)
+    service = CarInsurancePolicyService(mock_cursor, user, policy)
+    mocker.patch("app.utils.statements.SelectStatementExecutor.execute_select", return_value=[])
     with pytest.raises(ValueError) as exc:
         await service.get_car_insurance_policy_by_id(policy.ci_policy_id)
     assert Messages.USER_NO_PERMISSION in str(exc.value)
 
+@pytest.mark.asyncio
+async def test_get_car_insurance_policy_by_id_owner_single_query(mocker, mock_cursor, policy, optional_extras):
+    user = User(user_id=1, username="user", password="", email="user@example.com", is_admin=False)
+    service = CarInsurancePolicyService(mock_cursor, user, policy)
+    mock_select = mocker.patch("app.utils.statements.SelectStatementExecutor.execute_select", return_value=authorised_policy_rows(policy, optional_extras))
+    result = await service.get_car_insurance_policy_by_id(policy.ci_policy_id)
+    assert result == [policy.model_dump()]
+    with_extras = await service.get_policy_extras([policy])
+    assert with_extras[0]["optional_extras"] == optional_extras
+    mock_select.assert_called_once()
+
 @pytest.mark.asyncio
 async def test_get_car_insurance_policy_by_id_not_found(mocker, mock_cursor, policy):
     user = User(user_id=1, username="admin", password="", email="admin@example.com", is_admin=True)
     service = CarInsurancePolicyService(mock_cursor, user, policy)
     # Patch execute_select to return empty list
-    mocker.patch("app.services.car_insurance_policy_service.SelectStatementExecutor.execute_select", return_value=[])
+    mocker.patch("app.utils.statements.SelectStatementExecutor.execute_select", return_value=[])
     with pytest.raises(ValueError) as exc:
         await service.get_car_insurance_policy_by_id(policy.ci_policy_id)
     assert Messages.POLICY_NOT_FOUND in str(exc.value)
@@ -250,7 +322,7 @@ async def test_get_car_insurance_policy_by_id_success(mocker, mock_cursor, polic
     user = User(user_id=1, username="admin", password="", email="admin@example.com", is_admin=True)
     service = CarInsurancePolicyService(mock_cursor, user, policy)
     # Patch execute_select to return a policy dict
-    mocker.patch("app.services.car_insurance_policy_service.SelectStatementExecutor.execute_select", return_value=[policy.model_dump()])
+    mocker.patch("app.utils.statements.SelectStatementExecutor.execute_select", return_value=authorised_policy_rows(policy, []))
     result = await service.get_car_insurance_policy_by_id(policy.ci_policy_id)
     assert result[0]["ci_policy_id"] == policy.ci_policy_id
 
@@ -259,7 +331,7 @@ async def test_get_car_insurance_policy_by_id_success_with_format(mocker, mock_c
     user = User(user_id=1, username="admin", password="", email="admin@example.com", is_admin=True)
     service = CarInsurancePolicyService(mock_cursor, user, policy)
     # Patch execute_select to return a policy dict
-    mocker.patch("app.services.car_insurance_policy_service.SelectStatementExecutor.execute_select", return_value=[policy.model_dump()])
+    mocker.patch("app.utils.statements.SelectStatementExecutor.execute_select", return_value=authorised_policy_rows(policy, []))
     # Patch format_car_insurance_policies to return a formatted list
     mocker.patch.object(service, "format_car_insurance_policies", return_value=["formatted_policy"])
     result = await service.get_car_insurance_policy_by_id(policy.ci_policy_id, format=True)
@@ -281,7 +353,7 @@ async def test_get_car_insurance_policy_by_user_id_success(mocker, mock_cursor,
     service = CarInsurancePolicyService(mock_cursor, user, policy)
     # Patch execute_select to return a policy dict
     mocker.patch(
-        "app.services.car_insurance_policy_service.SelectStatementExecutor.execute_select",
+        "app.utils.statements.SelectStatementExecutor.execute_select",
         return_value=[policy.model_dump()]
     )
     # Patch format_car_insurance_policies to just return a marker
@@ -290,7 +362,7 @@ async def test_get_car_insurance_policy_by_user_id_success(mocker, mock_cursor,
         "format_car_insurance_policies",
         return_value=["formatted_policy"]
     )
-    result = service.get_car_insurance_policy_by_user_id(user.user_id)
+    result = await service.get_car_insurance_policy_by_user_id(user.user_id)
     assert result == ["formatted_policy"]
 
 @pytest.mark.asyncio
@@ -303,7 +375,7 @@ async def test_filter_car_insurance_policies(mocker, mock_cursor, admin_user, po
     )
     # Patch execute_select to return a list of dicts
     mocker.patch(
-        "app.services.car_insurance_policy_service.SelectStatementExecutor.execute_select",
+        "app.utils.statements.SelectStatementExecutor.execute_select",
         return_value=[policy.model_dump()]
     )
     # Patch format_car_insurance_policies to just return a marker
@@ -317,15 +389,275 @@ async def test_filter_car_insurance_policies(mocker, mock_cursor, admin_user, po
     mock_format.assert_called_once()
     assert result == ["formatted_policy"]
 
+@pytest.mark.asyncio
+async def test_filter_car_insurance_policies_next_cursor(mocker, mock_cursor, admin_user, policy):
+    mocker.patch.object(UserService, "check_admin", return_value=True)
+    mock_select = mocker.patch(
+        "app.utils.statements.SelectStatementExecutor.execute_select",
+        return_value=[policy.model_dump(), policy.model_dump()]
+    )
+    mocker.patch.object(CarInsurancePolicyService, "format_car_insurance_policies", side_effect=lambda rows, fields=None: rows)
+    service = CarInsurancePolicyService(mock_cursor, admin_user, policy)
+    result = await service.filter_car_insurance_policies("make", "Toyota", limit=1)
+    assert len(result) == 1
+    assert service.next_cursor is not None
+    mock_select.assert_called_once_with(
+        "SELECT TOP (?) ci_policy_id, user_id, vrn, make, model, policy_number, start_date, end_date, coverage"
+        " FROM CarInsurancePolicy WHERE (make = ?) ORDER BY ci_policy_id",
+        (2, "Toyota")
+    )
+
+@pytest.mark.asyncio
+async def test_filter_car_insurance_policies_typed_predicates(mocker, mock_cursor, admin_user):
+    mocker.patch.object(UserService, "check_admin", return_value=True)
+    mock_select = mocker.patch("app.utils.statements.SelectStatementExecutor.execute_select", return_value=[])
+    service = CarInsurancePolicyService(mock_cursor, admin_user, None)
+    await service.filter_car_insurance_policies("user_id", "2", filters=["start_date:gte:2025-01-01", "vrn:in:ABC123,XYZ789"], fields=["ci_policy_id"])
+    mock_select.assert_called_once_with(
+        "SELECT TOP (?) ci_policy_id FROM CarInsurancePolicy"
+        " WHERE (user_id = ? AND start_date >= ? AND vrn IN (?, ?)) ORDER BY ci_policy_id",
+        (101, 2, date(2025, 1, 1), "ABC123", "XYZ789")
+    )
+
+@pytest.mark.asyncio
+async def test_filter_car_insurance_policies_rejects_unknown_field(mocker, mock_cursor, admin_user):
+    mocker.patch.object(UserService, "check_admin", return_value=True)
+    mock_select = mocker.patch("app.utils.statements.SelectStatementExecutor.execute_select", return_value=[])
+    service = CarInsurancePolicyService(mock_cursor, admin_user, None)
+    with pytest.raises(ValueError) as exc:
+        await service.filter_car_insurance_policies("1=1 OR make", "x")
+    assert exc.value.args[0].status == 400
+    mock_select.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_export_car_insurance_policies_ndjson(mocker, mock_cursor, admin_user, policy):
+    mock_cursor.description = [(column,) for column in CarInsurancePolicy.model_fields]
+    mock_cursor.fetchmany.side_effect = [[tuple(policy.model_dump().values())], [tuple(policy.model_dump().values())], []]
+    service = CarInsurancePolicyService(mock_cursor, admin_user, None)
+    chunks = [chunk async for chunk in service.export_car_insurance_policies("ndjson", batch_size=1)]
+    assert len(chunks) == 2
+    assert chunks[0] == policy.model_dump_json() + "\n"
+    mock_cursor.fetchall.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_export_car_insurance_policies_csv(mocker, mock_cursor, admin_user, policy):
+    mock_cursor.description = [(column,) for column in CarInsurancePolicy.model_fields]
+    mock_cursor.fetchmany.side_effect = [[tuple(policy.model_dump().values())], []]
+    service = CarInsurancePolicyService(mock_cursor, admin_user, None)
+    chunks = [chunk async for chunk in service.export_car_insurance_policies("csv")]
+    assert chunks[0] == "ci_policy_id,user_id,vrn,make,model,policy_number,start_date,end_date,coverage\r\n"
+    assert chunks[1] == "1,1,ABC123,Toyota,Corolla,POL12345,2025-01-01,2025-12-31,Comprehensive\r\n"
+
 def test_format_car_insurance_policies(mocker, mock_cursor, admin_user, policy):
-    # Prepare a list of dicts as would be returned from the DB
-    policy_dict = policy.model_dump()
-    # Patch dates_to_string to just pass (or check call count)
-    mock_dates = mocker.patch("app.services.car_insurance_policy_service.dates_to_string")
+    # Prepare a row as would be returned from the DB, with DATE columns
+    policy_dict = {**policy.model_dump(), "start_date": date(2025, 1, 1), "end_date": date(2025, 12, 31)}
+    validate = mocker.spy(CarInsurancePolicy, "__init__")
     service = CarInsurancePolicyService(mock_cursor, admin_user, policy)
     result = service.format_car_insurance_policies([policy_dict])
     assert isinstance(result, list)
     assert len(result) == 1
     assert isinstance(result[0], CarInsurancePolicy)
-    assert result[0].ci_policy_id == policy.ci_policy_id
-    mock_dates.assert_called_once_with(policy_dict)    
\ No newline at end of file
+    assert result[0] == policy
+    # Trusted rows are not validated again
+    validate.assert_not_called()
+
+def batch_policy(policy_number, user_id=2, vrn="ABC123"):
+    return CarInsurancePolicy(
+        user_id=user_id,
+        vrn=vrn,
+        make="Toyota",
+        model="Corolla",
+        policy_number=policy_number,
+        start_date="2025-01-01",
+        end_date="2025-12-31",
+        coverage="Comprehensive"
+    )
+
+@pytest.mark.asyncio
+async def test_create_car_insurance_policies_bulk_insert(mocker, mock_cursor, non_admin_user, optional_extras):
+    await load_catalog(mocker, optional_extras)
+    mock_select = mocker.patch("app.utils.statements.SelectStatementExecutor.execute_select", return_value=[])
+    mock_insert = mocker.patch(
+        "app.utils.statements.InsertStatementExecutor.execute_insert_returning",
+        return_value=[{"ci_policy_id": 11, "policy_number": "POLA"}, {"ci_policy_id": 12, "policy_number": "POLB"}]
+    )
+    mock_insert_many = mocker.patch("app.utils.statements.InsertStatementExecutor.execute_insert_many", return_value=None)
+    items = [
+        CarInsurancePolicyBatchItem(policy=batch_policy("POLA"), optional_extras=optional_extras),
+        CarInsurancePolicyBatchItem(policy=batch_policy("POLB"), optional_extras=[optional_extras[0]])
+    ]
+    service = CarInsurancePolicyService(mock_cursor, non_admin_user, None)
+    results = await service.create_car_insurance_policies(items)
+
+    assert [result["status"] for result in results] == [201, 201]
+    assert [result["policy"].ci_policy_id for result in results] == [11, 12]
+    # One existing-policy-number check (no user check for non-admins), one policy insert, one extras insert
+    assert mock_select.call_count == 1
+    assert mock_insert.call_count == 1
+    query, params = mock_insert.call_args[0]
+    assert query.count("(?, ?, ?, ?, ?, ?, ?, ?)") == 2
+    assert len(params) == 16
+    mock_insert_many.assert_called_once()
+    assert mock_insert_many.call_args[0][1] == [(11, 1), (11, 2), (12, 1)]
+    mock_cursor.commit.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_create_car_insurance_policies_reports_per_item_errors(mocker, mock_cursor, non_admin_user, optional_extras):
+    await load_catalog(mocker, optional_extras)
+    mocker.patch(
+        "app.utils.statements.SelectStatementExecutor.execute_select",
+        # The unknown extra_id only re-reads the catalog's version, which has not moved, before the policy number check
+        side_effect=[catalog_version(), [{"policy_number": "TAKEN"}]]
+    )
+    mock_insert = mocker.patch(
+        "app.utils.statements.InsertStatementExecutor.execute_insert_returning",
+        return_value=[{"ci_policy_id": 20, "policy_number": "GOOD"}]
+    )
+    mock_insert_many = mocker.patch("app.utils.statements.InsertStatementExecutor.execute_insert_many", return_value=None)
+    unknown_extra = OptionalExtra(extra_id=99, name="Unknown", code="UN099", price=1.0)
+    items = [
+        CarInsurancePolicyBatchItem(policy=batch_policy("GOOD")),
+        CarInsurancePolicyBatchItem(policy=batch_policy("OTHER", user_id=3)),
+        CarInsurancePolicyBatchItem(policy=batch_policy("BAD!")),
+        CarInsurancePolicyBatchItem(policy=batch_policy("EXTRA"), optional_extras=[unknown_extra]),
+        CarInsurancePolicyBatchItem(policy=batch_policy("GOOD")),
+        CarInsurancePolicyBatchItem(policy=batch_policy("TAKEN"))
+    ]
+    service = CarInsurancePolicyService(mock_cursor, non_admin_user, None)
+    results = await service.create_car_insurance_policies(items)
+
+    assert [result["status"] for result in results] == [201, 403, 400, 400, 409, 409]
+    assert results[1]["message"] == Messages.USER_NO_PERMISSION
+    assert results[2]["message"] == Messages.INVALID_FIELD_VALUE.format("Policy number", "must be alphanumeric.")
+    assert results[3]["message"] == Messages.OPTIONAL_EXTRAS_NOT_FOUND.format("99")
+    assert results[5]["message"] == Messages.DUPLICATION_ERROR
+    assert len(mock_insert.call_args[0][1]) == 8
+    mock_insert_many.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_create_car_insurance_policies_duplicates_ignore_case(mocker, mock_cursor, non_admin_user):
+    mocker.patch("app.utils.statements.SelectStatementExecutor.execute_select", return_value=[{"policy_number": "taken"}])
+    mock_insert = mocker.patch(
+        "app.utils.statements.InsertStatementExecutor.execute_insert_returning",
+        return_value=[{"ci_policy_id": 40, "policy_number": "POLA"}]
+    )
+    items = [
+        CarInsurancePolicyBatchItem(policy=batch_policy("POLA")),
+        CarInsurancePolicyBatchItem(policy=batch_policy("pola")),
+        CarInsurancePolicyBatchItem(policy=batch_policy("TAKEN"))
+    ]
+    service = CarInsurancePolicyService(mock_cursor, non_admin_user, None)
+    results = await service.create_car_insurance_policies(items)
+    assert [result["status"] for result in results] == [201, 409, 409]
+    assert results[0]["policy"].ci_policy_id == 40
+    assert len(mock_insert.call_args[0][1]) == 8
+
+@pytest.mark.asyncio
+async def test_create_car_insurance_policies_failed_chunk_reported_per_item(mocker, mock_cursor, non_admin_user):
+    mocker.patch("app.services.car_insurance_policy_service.POLICY_INSERT_BATCH_SIZE", 1)
+    mocker.patch("app.utils.statements.SelectStatementExecutor.execute_select", return_value=[])
+    mocker.patch(
+        "app.utils.statements.InsertStatementExecutor.execute_insert_returning",
+        side_effect=[
+            [{"ci_policy_id": 50, "policy_number": "POLA"}],
+            ValueError(APIResponse(status=HTTPStatus.CONFLICT, message=Messages.DUPLICATION_ERROR, data=None)),
+            [{"ci_policy_id": 52, "policy_number": "POLC"}]
+        ]
+    )
+    items = [
+        CarInsurancePolicyBatchItem(policy=batch_policy("POLA")),
+        CarInsurancePolicyBatchItem(policy=batch_policy("POLB")),
+        CarInsurancePolicyBatchItem(policy=batch_policy("POLC"))
+    ]
+    service = CarInsurancePolicyService(mock_cursor, non_admin_user, None)
+    results = await service.create_car_insurance_policies(items)
+    assert [result["status"] for result in results] == [201, 409, 201]
+    assert results[1]["message"] == Messages.DUPLICATION_ERROR
+    assert [results[0]["policy"].ci_policy_id, results[2]["policy"].ci_policy_id] == [50, 52]
+
+@pytest.mark.asyncio
+async def test_create_car_insurance_policies_admin_unknown_user(mocker, mock_cursor, admin_user):
+    mocker.patch(
+        "app.utils.statements.SelectStatementExecutor.execute_select",
+        side_effect=[[], [{"user_id": 2}]]
+    )
+    mocker.patch(
+        "app.utils.statements.InsertStatementExecutor.execute_insert_returning",
+        return_value=[{"ci_policy_id": 30, "policy_number": "POLA"}]
+    )
+    items = [
+        CarInsurancePolicyBatchItem(policy=batch_policy("POLA", user_id=2)),
+        CarInsurancePolicyBatchItem(policy=batch_policy("POLB", user_id=404))
+    ]
+    service = CarInsurancePolicyService(mock_cursor, admin_user, None)
+    results = await service.create_car_insurance_policies(items)
+    assert [result["status"] for result in results] == [201, 404]
+    assert results[1]["message"] == Messages.USER_NOT_FOUND
+
+@pytest.mark.asyncio
+async def test_create_car_insurance_policies_empty_batch(mock_cursor, admin_user):
+    service = CarInsurancePolicyService(mock_cursor, admin_user, None)
+    with pytest.raises(ValueError) as exc:
+        await service.create_car_insurance_policies([])
+    assert exc.value.args[0].status == 400
+
+@pytest.mark.asyncio
+async def test_list_all_car_insurance_policies_sparse_fields(mocker, mock_cursor, admin_user):
+    mocker.patch.object(UserService, "check_admin", return_value=True)
+    mock_select = mocker.patch(
+        "app.utils.statements.SelectStatementExecutor.execute_select",
+        return_value=[{"ci_policy_id": 1, "policy_number": "POL1"}]
+    )
+    service = CarInsurancePolicyService(mock_cursor, admin_user, None)
+    result = await service.list_all_car_insurance_policies(fields=["ci_policy_id", "policy_number"])
+    assert result == [{"ci_policy_id": 1, "policy_number": "POL1"}]
+    assert mock_select.call_args[0][0] == "SELECT TOP (?) ci_policy_id, policy_number FROM CarInsurancePolicy ORDER BY ci_policy_id"
+
+@pytest.mark.asyncio
+async def test_get_policy_extras_sparse_policies(mocker, mock_cursor, admin_user, optional_extras):
+    await load_catalog(mocker, optional_extras)
+    mocker.patch(
+        "app.utils.statements.SelectStatementExecutor.execute_select",
+        return_value=[{"ci_policy_id": 1, "extra_id": 2}]
+    )
+    service = CarInsurancePolicyService(mock_cursor, admin_user, None)
+    result = await service.get_policy_extras([{"ci_policy_id": 1, "vrn": "ABC123"}])
+    assert result == [{"policy": {"ci_policy_id": 1, "vrn": "ABC123"}, "optional_extras": [optional_extras[1]]}]
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("mode", ["list_all", "filter"])
+async def test_check_read_permissions_admin_modes_forbidden(mode, mock_cursor, non_admin_user):
+    service = CarInsurancePolicyService(mock_cursor, non_admin_user, None)
+    with pytest.raises(ValueError) as exc:
+        await service.check_read_permissions(mode)
+    assert Messages.USER_NO_PERMISSION in str(exc.value)
+
+@pytest.mark.asyncio
+async def test_check_read_permissions_by_id_not_owned(mocker, mock_cursor, non_admin_user):
+    service = CarInsurancePolicyService(mock_cursor, non_admin_user, None)
+    select = mocker.patch("app.utils.statements.SelectStatementExecutor.execute_select", return_value=[])
+    with pytest.raises(ValueError) as exc:
+        await service.check_read_permissions("by_id", 1)
+    assert Messages.USER_NO_PERMISSION in str(exc.value)
+    assert select.call_args[0][1] == (1, non_admin_user.user_id)
+
+@pytest.mark.asyncio
+async def test_check_read_permissions_by_id_owned(mocker, mock_cursor, non_admin_user):
+    service = CarInsurancePolicyService(mock_cursor, non_admin_user, None)
+    mocker.patch("app.utils.statements.SelectStatementExecutor.execute_select", return_value=[{"is_owner": 1}])
+    assert await service.check_read_permissions("by_id", 1) is True
+
+@pytest.mark.asyncio
+async def test_check_read_permissions_admin_skips_query(mocker, mock_cursor, admin_user):
+    service = CarInsurancePolicyService(mock_cursor, admin_user, None)
+    select = mocker.patch("app.utils.statements.SelectStatementExecutor.execute_select")
+    assert await service.check_read_permissions("by_id", 1) is True
+    assert await service.check_read_permissions("list_all") is True
+    select.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_check_read_permissions_myself(mocker, mock_cursor, non_admin_user):
+    service = CarInsurancePolicyService(mock_cursor, non_admin_user, None)
+    select = mocker.patch("app.utils.statements.SelectStatementExecutor.execute_select")
+    assert await service.check_read_permissions("myself") is True
+    select.assert_not_called()
@@ -0,0 +1,155 @@
+import gzip
+import os
+
+import brotli
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.utils.compression import (
+    CompressionMiddleware, PrecompressedStaticFiles, negotiate_encoding, precompress_directory
+)
+
+BODY = "policy," * 1000
+
+def make_app():
+    api = FastAPI()
+    api.add_middleware(CompressionMiddleware, minimum_size=100)
+
+    @api.get("/large")
+    async def large():
+        return PlainTextResponse(BODY, headers={"ETag": '"abc"'})
+
+    @api.get("/small")
+    async def small():
+        return PlainTextResponse("ok")
+
+    @api.get("/encoded")
+    async def encoded():
+        return Response(gzip.compress(BODY.encode()), media_type="text/plain", headers={"Content-Encoding": "gzip"})
+
+    @api.get("/stream")
+    async def stream():
+        async def chunks():
+            for _ in range(3):
+                yield BODY
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    @api.get("/image")
+    async def image():
+        return Response(BODY.encode(), media_type="image/png")
+
+    return api
+
+@pytest.fixture
+def client():
+    return TestClient(make_app())
+
+@pytest.mark.parametrize("header, expected", [
+    ("", None),
+    ("gzip", "gzip"),
+    ("gzip, deflate, br", "br"),
+    ("br;q=0.5, gzip", "gzip"),
+    ("br;q=0, gzip;q=0", None),
+    ("*", "br"),
+    ("*;q=0.1, br;q=0", "gzip"),
+    ("identity", None),
+    ("GZIP;Q=0.8", "gzip"),
+])
+def test_negotiate_encoding(header, expected):
+    assert negotiate_encoding(header) == expected
+
+def test_negotiate_encoding_limited_to_available():
+    assert negotiate_encoding("br, gzip", ("gzip",)) == "gzip"
+    assert negotiate_encoding("br", ("gzip",)) is None
+
+def test_brotli_response(client):
+    response = client.get("/large", headers={"Accept-Encoding": "br"})
+    assert response.headers["content-encoding"] == "br"
+    assert "accept-encoding" in response.headers["vary"].lower()
+    assert response.text == BODY
+    assert int(response.headers["content-length"]) < len(BODY)
+
+def test_gzip_response(client):
+    response = client.get("/large", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.text == BODY
+
+def test_compressed_response_has_weak_etag(client):
+    assert client.get("/large", headers={"Accept-Encoding": "br"}).headers["etag"] == 'W/"abc"'
+    assert client.get("/large", headers={"Accept-Encoding": "identity"}).headers["etag"] == '"abc"'
+
+def test_small_and_unaccepted_responses_are_not_compressed(client):
+    assert "content-encoding" not in client.get("/small", headers={"Accept-Encoding": "br"}).headers
+    assert "content-encoding" not in client.get("/large", headers={"Accept-Encoding": "identity"}).headers
+
+@pytest.mark.parametrize("encoding", ["br", "gzip"])
+def test_streaming_response_is_compressed(client, encoding):
+    response = client.get("/stream", headers={"Accept-Encoding": encoding})
+    assert response.headers["content-encoding"] == encoding
+    assert "content-length" not in response.headers
+    assert response.text == BODY * 3
+
+def test_compressed_media_type_is_not_compressed(client):
+    response = client.get("/image", headers={"Accept-Encoding": "br"})
+    assert "content-encoding" not in response.headers
+    assert response.content == BODY.encode()
+
+def test_already_encoded_response_is_passed_through(client):
+    response = client.get("/encoded", headers={"Accept-Encoding": "br"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.text == BODY
+
+@pytest.fixture
+def static_client(tmp_path):
+    (tmp_path / "app.js").write_text(BODY)
+    (tmp_path / "tiny.css").write_text("a{}")
+    written = precompress_directory(str(tmp_path), minimum_size=100)
+    assert sorted(os.path.basename(path) for path in written) == ["app.js.br", "app.js.gz"]
+    api = FastAPI()
+    api.mount("/static", PrecompressedStaticFiles(directory=str(tmp_path)), name="static")
+    return TestClient(api)
+
+def test_static_serves_precompressed_sibling(static_client, tmp_path):
+    response = static_client.get("/static/app.js", headers={"Accept-Encoding": "gzip, br"})
+    assert response.headers["content-encoding"] == "br"
+    assert response.headers["content-type"].startswith("text/javascript")
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert int(response.headers["content-length"]) == (tmp_path / "app.js.br").stat().st_size
+    assert response.text == BODY
+
+    response = static_client.get("/static/app.js", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.text == BODY
+
+def test_static_without_accepted_sibling_serves_original(static_client):
+    response = static_client.get("/static/app.js", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in response.headers
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.text == BODY
+
+    response = static_client.get("/static/tiny.css", headers={"Accept-Encoding": "br"})
+    assert "content-encoding" not in response.headers
+    assert response.text == "a{}"
+
+def test_static_precompressed_revalidation(static_client):
+    first = static_client.get("/static/app.js", headers={"Accept-Encoding": "br"})
+    response = static_client.get("/static/app.js", headers={"Accept-Encoding": "br", "If-None-Match": first.headers["etag"]})
+    assert response.status_code == 304
+    assert response.headers["vary"] == "Accept-Encoding"
+
+def test_static_ignores_stale_sibling(static_client, tmp_path):
+    source = tmp_path / "app.js"
+    source.write_text("changed" * 100)
+    stale = (tmp_path / "app.js.br").stat().st_mtime
+    os.utime(source, (stale + 10, stale + 10))
+    response = static_client.get("/static/app.js", headers={"Accept-Encoding": "br"})
+    assert "content-encoding" not in response.headers
+    assert response.text == "changed" * 100
+
+def test_precompress_writes_decodable_copies(tmp_path):
+    (tmp_path / "app.js").write_text(BODY)
+    precompress_directory(str(tmp_path), minimum_size=100)
+    assert brotli.decompress((tmp_path / "app.js.br").read_bytes()).decode() == BODY
+    assert gzip.decompress((tmp_path / "app.js.gz").read_bytes()).decode() == BODY
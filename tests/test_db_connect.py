@@ -1,5 +1,10 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
-from app.utils.db_connect import DBConnect, DatabaseConnectionError
+from app.utils.async_db import run_blocking
+from app.utils.db_connect import DBConnect, DatabaseConnectionError, ConnectionPool, PoolTimeoutError
 import pyodbc
 
 @pytest.fixture
@@ -96,4 +101,96 @@ def test_db_connect_sql_auth_failure(mocker):
     )
     with pytest.raises(DatabaseConnectionError) as exc_info:
         db.connect()
-    assert "Error connecting to the database: SQL Auth failed" in str(exc_info.value)
\ No newline at end of file
+    assert "Error connecting to the database: SQL Auth failed" in str(exc_info.value)
+
+@pytest.fixture
+def pool():
+    """Fixture to create a small ConnectionPool instance."""
+    return ConnectionPool(server="test_server", database="test_database", min_size=1, max_size=2, timeout=0.05)
+
+def test_pool_open_creates_min_size(mocker, pool):
+    mock_connect = mocker.patch("pyodbc.connect", return_value=mocker.Mock())
+    pool.open()
+    assert mock_connect.call_count == 1
+    assert pool.stats()["idle"] == 1
+
+def test_pool_reuses_released_connection(mocker, pool):
+    mock_connect = mocker.patch("pyodbc.connect", side_effect=lambda *args, **kwargs: mocker.Mock())
+    pool.open()
+    with pool.connection() as first:
+        pass
+    with pool.connection() as second:
+        pass
+    assert first is second
+    assert mock_connect.call_count == 1
+    # The transaction is rolled back before the connection goes back to the pool
+    first.connection.rollback.assert_called()
+
+def test_pool_checkout_timeout(mocker, pool):
+    mocker.patch("pyodbc.connect", side_effect=lambda *args, **kwargs: mocker.Mock())
+    first = pool.acquire()
+    second = pool.acquire()
+    with pytest.raises(PoolTimeoutError):
+        pool.acquire()
+    assert pool.stats()["checkout_timeouts"] == 1
+    pool.release(first)
+    pool.release(second)
+
+def test_pool_discards_connection_on_driver_error(mocker, pool):
+    mocker.patch("pyodbc.connect", side_effect=lambda *args, **kwargs: mocker.Mock())
+    with pytest.raises(pyodbc.Error):
+        with pool.connection():
+            raise pyodbc.Error("Connection lost")
+    stats = pool.stats()
+    assert stats["size"] == 0
+    assert stats["connections_closed"] == 1
+
+def test_pool_pre_ping_replaces_dead_connection(mocker):
+    pool = ConnectionPool(server="test_server", database="test_database", min_size=1, max_size=1, ping_interval=0)
+    dead = mocker.Mock()
+    dead.cursor.return_value.execute.side_effect = pyodbc.Error("Connection lost")
+    healthy = mocker.Mock()
+    mocker.patch("pyodbc.connect", side_effect=[dead, healthy])
+    pool.open()
+    db = pool.acquire()
+    assert db.connection is healthy
+    assert pool.stats()["ping_failures"] == 1
+
+def test_pool_evicts_idle_connections_above_min_size(mocker):
+    pool = ConnectionPool(server="test_server", database="test_database", min_size=0, max_size=2, idle_timeout=0)
+    mocker.patch("pyodbc.connect", side_effect=lambda *args, **kwargs: mocker.Mock())
+    pool.release(pool.acquire())
+    pool.release(pool.acquire())
+    assert pool.stats()["idle_evictions"] == 1
+
+def test_pool_close(mocker, pool):
+    mocker.patch("pyodbc.connect", return_value=mocker.Mock())
+    pool.open()
+    pool.close()
+    assert pool.stats()["size"] == 0
+    with pytest.raises(DatabaseConnectionError):
+        pool.acquire()
+
+@pytest.mark.asyncio
+async def test_pool_async_checkout_does_not_starve_holders(mocker):
+    # More concurrent requests than connections and database workers: waiting requests must
+    # not occupy the workers the connection holders need for their queries
+    pool = ConnectionPool(server="test_server", database="test_database", min_size=0, max_size=2, timeout=2)
+    mocker.patch("pyodbc.connect", side_effect=lambda *args, **kwargs: mocker.Mock())
+    executor = ThreadPoolExecutor(max_workers=2)
+    mocker.patch("app.utils.async_db.get_db_executor", return_value=executor)
+
+    async def request():
+        async with pool.connection_async():
+            await run_blocking(time.sleep, 0.1)
+
+    started = time.monotonic()
+    try:
+        results = await asyncio.gather(*(request() for _ in range(6)), return_exceptions=True)
+    finally:
+        executor.shutdown(wait=True)
+    assert [result for result in results if isinstance(result, Exception)] == []
+    assert time.monotonic() - started < 1.5
+    stats = pool.stats()
+    assert stats["checkouts"] == 6
+    assert stats["size"] == 2 and stats["in_use"] == 0
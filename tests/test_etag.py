@@ -0,0 +1,81 @@
+import pytest
+from starlette.requests import Request
+
+from app.utils.etag import resource_etag, etag_matches, etag_headers, not_modified
+from app.utils.table_versions import set_versions_table_exists
+
+def make_request(query: bytes = b"mode=list_all", if_none_match: str = None):
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+    return Request({"type": "http", "method": "GET", "path": "/read_user", "query_string": query, "headers": headers})
+
+def mock_db(mocker, rows):
+    db = mocker.Mock()
+    db.select = mocker.AsyncMock(return_value=rows)
+    return db
+
+@pytest.mark.asyncio
+async def test_etag_changes_with_table_version(mocker):
+    request = make_request()
+    first = await resource_etag(request, mock_db(mocker, [{"table_name": "Users", "version": 7}]), ("Users",), 1)
+    same = await resource_etag(request, mock_db(mocker, [{"table_name": "Users", "version": 7}]), ("Users",), 1)
+    bumped = await resource_etag(request, mock_db(mocker, [{"table_name": "Users", "version": 8}]), ("Users",), 1)
+    assert first == same
+    assert first != bumped
+    assert first.startswith('"') and first.endswith('"')
+
+@pytest.mark.asyncio
+async def test_etag_varies_by_caller_and_query(mocker):
+    rows = [{"table_name": "Users", "version": 7}]
+    base = await resource_etag(make_request(), mock_db(mocker, rows), ("Users",), 1)
+    assert await resource_etag(make_request(), mock_db(mocker, rows), ("Users",), 2) != base
+    assert await resource_etag(make_request(b"mode=myself"), mock_db(mocker, rows), ("Users",), 1) != base
+
+@pytest.mark.asyncio
+async def test_no_etag_without_version_row(mocker):
+    db = mock_db(mocker, [{"table_name": "Users", "version": 7}])
+    assert await resource_etag(make_request(), db, ("Users", "OptionalExtras"), 1) is None
+    sql, params = db.select.call_args.args
+    assert "FROM TableVersions" in sql
+    assert params == ("OptionalExtras", "Users")
+
+@pytest.mark.asyncio
+async def test_no_etag_without_versions_table(mocker):
+    set_versions_table_exists(None)
+    db = mock_db(mocker, [{"object_id": None}])
+    assert await resource_etag(make_request(), db, ("Users",), 1) is None
+    assert await resource_etag(make_request(), db, ("Users",), 1) is None
+    # Missing tables are looked for again only after VERSIONS_TABLE_CHECK_INTERVAL
+    db.select.assert_called_once()
+    assert "OBJECT_ID" in db.select.call_args.args[0]
+
+@pytest.mark.asyncio
+async def test_versions_table_found_later(mocker):
+    set_versions_table_exists(False)
+    mocker.patch("app.utils.table_versions.VERSIONS_TABLE_CHECK_INTERVAL", 0)
+    db = mocker.Mock()
+    db.select = mocker.AsyncMock(side_effect=[[{"object_id": 42}], [{"table_name": "Users", "version": 7}], [{"table_name": "Users", "version": 7}]])
+    assert await resource_etag(make_request(), db, ("Users",), 1) is not None
+    assert await resource_etag(make_request(), db, ("Users",), 1) is not None
+    assert db.select.call_count == 3
+
+@pytest.mark.parametrize("header, expected", [
+    (None, False),
+    ('"abc"', True),
+    ('W/"abc"', True),
+    ('"other", "abc"', True),
+    ('"other"', False),
+    ("*", True),
+])
+def test_etag_matches(header, expected):
+    assert etag_matches(make_request(if_none_match=header), '"abc"') is expected
+
+def test_etag_matches_without_etag():
+    assert etag_matches(make_request(if_none_match="*"), None) is False
+
+def test_not_modified_response():
+    response = not_modified('"abc"')
+    assert response.status_code == 304
+    assert response.body == b""
+    assert response.headers["etag"] == '"abc"'
+    assert response.headers["cache-control"] == "private, no-cache"
+    assert etag_headers(None) == {}
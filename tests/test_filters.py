@@ -0,0 +1,46 @@
+import pytest
+from datetime import date
+from app.utils.filters import build_where, parse_filter, MAX_FILTER_VALUES
+from app.utils.messages import Messages
+from app.services.car_insurance_policy_service import POLICY_FILTER_FIELDS
+
+def test_build_where_coerces_values_to_column_types():
+    where, params = build_where(POLICY_FILTER_FIELDS, [("user_id", "eq", "2"), ("make", "eq", "Toyota")])
+    assert where == "user_id = ? AND make = ?"
+    assert params == (2, "Toyota")
+
+def test_build_where_date_ranges_and_in_lists():
+    where, params = build_where(POLICY_FILTER_FIELDS, [
+        parse_filter("start_date:gte:2025-01-01"),
+        parse_filter("end_date:lt:2026-01-01"),
+        parse_filter("ci_policy_id:in:1,2,2,3")
+    ])
+    assert where == "start_date >= ? AND end_date < ? AND ci_policy_id IN (?, ?, ?)"
+    assert params == (date(2025, 1, 1), date(2026, 1, 1), 1, 2, 3)
+
+@pytest.mark.parametrize("predicate, message", [
+    (("coverage; DROP TABLE Users --", "eq", "x"), Messages.INVALID_FIELD.format("coverage; DROP TABLE Users --")),
+    (("make", "gte", "Ford"), Messages.INVALID_FILTER_OPERATOR.format("gte", "make")),
+    (("user_id", "eq", "two"), Messages.INVALID_FILTER_VALUE.format("user_id")),
+    (("start_date", "gt", "01/01/2025"), Messages.INVALID_FILTER_VALUE.format("start_date")),
+])
+def test_build_where_rejects_invalid_predicates(predicate, message):
+    with pytest.raises(ValueError) as exc:
+        build_where(POLICY_FILTER_FIELDS, [predicate])
+    assert exc.value.args[0].status == 400
+    assert exc.value.args[0].message == message
+
+def test_build_where_requires_a_predicate():
+    with pytest.raises(ValueError):
+        build_where(POLICY_FILTER_FIELDS, [])
+
+def test_build_where_limits_parameter_count():
+    values = ",".join(str(i) for i in range(MAX_FILTER_VALUES + 1))
+    with pytest.raises(ValueError) as exc:
+        build_where(POLICY_FILTER_FIELDS, [("ci_policy_id", "in", values)])
+    assert exc.value.args[0].message == Messages.TOO_MANY_FILTER_VALUES.format(MAX_FILTER_VALUES)
+
+@pytest.mark.parametrize("expression", ["make", "make:eq", ":eq:Ford", "make::Ford"])
+def test_parse_filter_rejects_malformed_expressions(expression):
+    with pytest.raises(ValueError):
+        parse_filter(expression)
@@ -230,8 +230,10 @@ def test_verify_token_valid():
     valid_token = TokenData.create_token(user_id=1, expires_in=datetime.timedelta(minutes=15))
 
     # Call the verify_token function
-    decoded_token = verify_token(valid_token)
-    assert decoded_token["user_id"] == 1
+    principal = verify_token(valid_token)
+    assert principal.user_id == 1
+    # Tokens without role claims are resolved from the database
+    assert principal.has_role_claims is False
 
 def test_verify_token_expired():
     # Create an expired token
@@ -243,6 +245,37 @@ def test_verify_token_expired():
     assert exc_info.value.status_code == 401
     assert exc_info.value.detail == Messages.TOKEN_HAS_EXPIRED
 
+def test_verify_token_cached_skips_decode(mocker):
+    valid_token = TokenData.create_token(user_id=1, expires_in=datetime.timedelta(minutes=15))
+    decode = mocker.spy(jwt, "decode")
+
+    first = verify_token(valid_token)
+    second = verify_token(valid_token)
+    assert decode.call_count == 1
+    assert second == first
+
+def test_verify_token_cache_expires_with_token(mocker):
+    clock = mocker.patch("app.utils.cache.time.monotonic", return_value=100.0)
+    valid_token = TokenData.create_token(user_id=1, expires_in=datetime.timedelta(seconds=30))
+    decode = mocker.spy(jwt, "decode")
+
+    verify_token(valid_token)
+    clock.return_value = 120.0
+    verify_token(valid_token)
+    assert decode.call_count == 1
+
+    # Past the token's exp the claims are no longer served from the cache
+    clock.return_value = 131.0
+    verify_token(valid_token)
+    assert decode.call_count == 2
+
+def test_verify_token_invalid_is_not_cached(mocker):
+    decode = mocker.spy(jwt, "decode")
+    for _ in range(2):
+        with pytest.raises(HTTPException):
+            verify_token("invalid.token.value")
+    assert decode.call_count == 2
+
 def test_verify_token_invalid():
     # Create an invalid token
     invalid_token = "invalid.token.value"
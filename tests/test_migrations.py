@@ -0,0 +1,67 @@
+import pytest
+from app.migrations import MIGRATIONS, Migration, MigrationError, Migrator
+
+@pytest.fixture
+def mock_connection(mocker):
+    connection = mocker.Mock()
+    cursor = mocker.Mock()
+    cursor.fetchall.return_value = []
+    cursor.fetchone.return_value = (0,)
+    connection.cursor.return_value = cursor
+    return connection
+
+def executed(connection):
+    return [call.args[0] for call in connection.cursor.return_value.execute.call_args_list]
+
+def test_migrations_have_unique_increasing_versions():
+    versions = [migration.version for migration in MIGRATIONS]
+    assert versions == sorted(set(versions))
+
+def test_index_migration_covers_hot_predicates():
+    sql = "\n".join(statement for migration in MIGRATIONS for statement in migration.statements)
+    for index in (
+        "IX_CarInsurancePolicy_user_id",
+        "IX_CarInsurancePolicy_policy_number",
+        "IX_CarInsurancePolicy_vrn",
+        "IX_CarInsurancePolicyOptionalExtras_ci_policy_id",
+        "IX_CarInsurancePolicyOptionalExtras_extra_id",
+    ):
+        assert index in sql
+
+def test_table_versions_seeded_for_every_versioned_table():
+    sql = "\n".join(MIGRATIONS[-1].statements)
+    assert "CREATE TABLE TableVersions" in sql
+    for table in ("Users", "CarInsurancePolicy", "OptionalExtras", "CarInsurancePolicyOptionalExtras"):
+        assert f"(N'{table}')" in sql
+
+def test_apply_runs_pending_migrations_in_order(mock_connection):
+    migrations = [Migration(2, "second", ["SELECT 2"]), Migration(1, "first", ["SELECT 1"])]
+    applied = Migrator(mock_connection, migrations).apply()
+    assert [migration.version for migration in applied] == [1, 2]
+    statements = executed(mock_connection)
+    assert statements.index("SELECT 1") < statements.index("SELECT 2")
+    assert any("sp_getapplock" in statement for statement in statements)
+    assert "sp_releaseapplock" in statements[-1]
+
+def test_apply_skips_applied_versions(mock_connection):
+    mock_connection.cursor.return_value.fetchall.return_value = [(1,)]
+    migrations = [Migration(1, "first", ["SELECT 1"]), Migration(2, "second", ["SELECT 2"])]
+    applied = Migrator(mock_connection, migrations).apply()
+    assert [migration.version for migration in applied] == [2]
+    assert "SELECT 1" not in executed(mock_connection)
+
+def test_failed_migration_rolls_back_and_stops(mock_connection):
+    def execute(sql, *args):
+        if sql == "BAD":
+            raise Exception("boom")
+    mock_connection.cursor.return_value.execute.side_effect = execute
+    migrations = [Migration(1, "bad", ["BAD"]), Migration(2, "second", ["SELECT 2"])]
+    with pytest.raises(MigrationError):
+        Migrator(mock_connection, migrations).apply()
+    mock_connection.rollback.assert_called_once()
+    assert "SELECT 2" not in executed(mock_connection)
+    assert "sp_releaseapplock" in executed(mock_connection)[-1]
+
+def test_duplicate_versions_rejected(mock_connection):
+    with pytest.raises(MigrationError):
+        Migrator(mock_connection, [Migration(1, "a", []), Migration(1, "b", [])])
@@ -1,5 +1,6 @@
 import pytest
-from app.models.optional_extra import OptionalExtra
+from decimal import Decimal
+from app.models.optional_extra import OPTIONAL_EXTRA_LIST, OptionalExtra
 
 @pytest.fixture
 def valid_optional_extra_data():
@@ -67,4 +68,12 @@ async def test_code_too_long(valid_optional_extra_data):
     extra = OptionalExtra(**data)
     with pytest.raises(ValueError) as exc:
         await extra.validate_optional_extra_values()
-    assert "must not be longer than 10 characters" in str(exc.value)
\ No newline at end of file
+    assert "must not be longer than 10 characters" in str(exc.value)
+def test_constructor_keeps_validated_values(valid_optional_extra_data):
+    extra = OptionalExtra(**{**valid_optional_extra_data, "price": 50})
+    assert isinstance(extra.price, float)
+
+def test_optional_extra_list_converts_decimal_price(valid_optional_extra_data):
+    extras = OPTIONAL_EXTRA_LIST.validate_python([{**valid_optional_extra_data, "price": Decimal("50.00")}])
+    assert extras == [OptionalExtra(**valid_optional_extra_data)]
+    assert isinstance(extras[0].price, float)
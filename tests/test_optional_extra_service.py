@@ -2,6 +2,10 @@ import pytest
 from app.services.optional_extra_service import OptionalExtraService
 from app.models.optional_extra import OptionalExtra
 from app.utils.messages import Messages
+from app.services.optional_extra_catalog import optional_extra_catalog
+from app.utils.table_versions import read_table_versions
+
+CATALOG_VERSION = [{"table_name": "OptionalExtras", "version": 1}]
 
 @pytest.fixture
 def mock_cursor(mocker):
@@ -15,7 +19,7 @@ def optional_extra():
 @pytest.mark.asyncio
 async def test_create_optional_extra(mocker, mock_cursor, optional_extra):
     mock_insert = mocker.patch(
-        "app.services.optional_extra_service.InsertStatementExecutor.execute_insert",
+        "app.utils.statements.InsertStatementExecutor.execute_insert",
         return_value=42
     )
     service = OptionalExtraService(mock_cursor)
@@ -32,7 +36,7 @@ async def test_update_optional_extra_success(mocker, mock_cursor, optional_extra
         return_value=[optional_extra.model_dump()]
     )
     mock_update = mocker.patch(
-        "app.services.optional_extra_service.UpdateStatementExecutor.execute_update",
+        "app.utils.statements.UpdateStatementExecutor.execute_update",
         return_value=None
     )
     service = OptionalExtraService(mock_cursor)
@@ -78,11 +82,11 @@ async def test_delete_optional_extra_success(mocker, mock_cursor, optional_extra
     )
     # Patch execute_select for related records to return empty list (no related records)
     mocker.patch(
-        "app.services.optional_extra_service.SelectStatementExecutor.execute_select",
+        "app.utils.statements.SelectStatementExecutor.execute_select",
         return_value=[]
     )
     mock_delete = mocker.patch(
-        "app.services.optional_extra_service.DeleteStatementExecutor.execute_delete",
+        "app.utils.statements.DeleteStatementExecutor.execute_delete",
         return_value=None
     )
     service = OptionalExtraService(mock_cursor)
@@ -105,20 +109,123 @@ async def test_delete_optional_extra_not_found(mocker, mock_cursor):
 @pytest.mark.asyncio
 async def test_list_all_optional_extras(mocker, mock_cursor, optional_extra):
     mock_select = mocker.patch(
-        "app.services.optional_extra_service.SelectStatementExecutor.execute_select",
-        return_value=[optional_extra.model_dump()]
+        "app.utils.statements.SelectStatementExecutor.execute_select",
+        side_effect=[CATALOG_VERSION, [optional_extra.model_dump()]]
     )
     service = OptionalExtraService(mock_cursor)
-    # Patch format_optional_extras to just return a marker
-    mocker.patch.object(service, "format_optional_extras", return_value=["formatted_extra"])
     result = await service.list_all_optional_extras()
-    assert result == ["formatted_extra"]
-    mock_select.assert_called_once()
+    # The catalog's models are returned as they are
+    assert result == [optional_extra]
+    assert mock_select.call_count == 2
+    assert await service.list_all_optional_extras(fields=["extra_id", "price"]) == [{"extra_id": 1, "price": 50.0}]
+
+@pytest.mark.asyncio
+async def test_list_all_optional_extras_served_from_catalog(mocker, mock_cursor, optional_extra):
+    second = OptionalExtra(extra_id=2, name="Personal Accident", code="PA002", price=75.0)
+    mock_select = mocker.patch(
+        "app.utils.statements.SelectStatementExecutor.execute_select",
+        side_effect=[CATALOG_VERSION, [second.model_dump(), optional_extra.model_dump()]]
+    )
+    service = OptionalExtraService(mock_cursor)
+    first_page = await service.list_all_optional_extras(limit=1)
+    assert [extra.extra_id for extra in first_page] == [1]
+    second_page = await service.list_all_optional_extras(limit=1, cursor=service.next_cursor)
+    assert [extra.extra_id for extra in second_page] == [2]
+    assert service.next_cursor is None
+    assert mock_select.call_count == 2
+
+@pytest.mark.asyncio
+async def test_optional_extra_writes_refresh_catalog(mocker, mock_cursor, optional_extra):
+    mocker.patch(
+        "app.utils.statements.SelectStatementExecutor.execute_select",
+        side_effect=lambda query, params=None: CATALOG_VERSION if "TableVersions" in query else [optional_extra.model_dump()]
+    )
+    mocker.patch("app.utils.statements.InsertStatementExecutor.execute_insert", return_value=2)
+    mocker.patch("app.utils.statements.UpdateStatementExecutor.execute_update", return_value=None)
+    mocker.patch("app.utils.statements.DeleteStatementExecutor.execute_delete", return_value=None)
+    service = OptionalExtraService(mock_cursor)
+    await optional_extra_catalog.load(service.db)
+
+    await service.create_optional_extra(OptionalExtra(name="Personal Accident", code="PA002", price=75.0))
+    assert [extra.extra_id for extra in await optional_extra_catalog.all(service.db)] == [1, 2]
+
+    await service.update_optional_extra(OptionalExtra(extra_id=1, name="New Name", code="RA001", price=50.0))
+    assert (await optional_extra_catalog.get_many(service.db, [1]))[0].name == "New Name"
+
+    mocker.patch.object(OptionalExtraService, "get_optional_extra_by_id", return_value=[optional_extra.model_dump()])
+    await service.delete_optional_extra(2)
+    assert [extra.extra_id for extra in await optional_extra_catalog.all(service.db)] == [1]
+
+@pytest.mark.asyncio
+async def test_catalog_reloads_when_table_version_moves_on(mocker, mock_cursor, optional_extra):
+    renamed = optional_extra.model_copy(update={"name": "Renamed"})
+    mock_select = mocker.patch(
+        "app.utils.statements.SelectStatementExecutor.execute_select",
+        side_effect=[
+            CATALOG_VERSION, [optional_extra.model_dump()],
+            # An ETag read that sees no other writer, then one that sees another process's write
+            CATALOG_VERSION,
+            [{"table_name": "OptionalExtras", "version": 2}],
+            [{"table_name": "OptionalExtras", "version": 2}], [renamed.model_dump()]
+        ]
+    )
+    service = OptionalExtraService(mock_cursor)
+    await optional_extra_catalog.load(service.db)
+
+    await read_table_versions(service.db, ("OptionalExtras",))
+    assert (await optional_extra_catalog.all(service.db))[0].name == "Roadside Assistance"
+    assert mock_select.call_count == 3
+
+    await read_table_versions(service.db, ("OptionalExtras",))
+    assert (await optional_extra_catalog.all(service.db))[0].name == "Renamed"
+    assert mock_select.call_count == 6
+    assert (await optional_extra_catalog.all(service.db))[0].name == "Renamed"
+
+@pytest.mark.asyncio
+async def test_catalog_unknown_id_reloads_only_when_table_changed(mocker, mock_cursor, optional_extra):
+    second = OptionalExtra(extra_id=2, name="Personal Accident", code="PA002", price=75.0)
+    mock_select = mocker.patch(
+        "app.utils.statements.SelectStatementExecutor.execute_select",
+        side_effect=[
+            CATALOG_VERSION, [optional_extra.model_dump()],
+            CATALOG_VERSION,
+            CATALOG_VERSION,
+            [{"table_name": "OptionalExtras", "version": 2}],
+            [{"table_name": "OptionalExtras", "version": 2}], [optional_extra.model_dump(), second.model_dump()]
+        ]
+    )
+    service = OptionalExtraService(mock_cursor)
+    await optional_extra_catalog.load(service.db)
+
+    assert await optional_extra_catalog.get_many(service.db, [1, 99]) == [optional_extra]
+    assert await optional_extra_catalog.get_many(service.db, [99]) == []
+    assert mock_select.call_count == 4
+    assert [extra.extra_id for extra in await optional_extra_catalog.get_many(service.db, [1, 2])] == [1, 2]
+    assert mock_select.call_count == 7
+
+@pytest.mark.asyncio
+async def test_catalog_unknown_id_reloads_rate_limited_without_version(mocker, mock_cursor, optional_extra):
+    mock_select = mocker.patch(
+        "app.utils.statements.SelectStatementExecutor.execute_select",
+        side_effect=lambda query, params=None: [] if "TableVersions" in query else [optional_extra.model_dump()]
+    )
+    clock = mocker.patch("app.services.optional_extra_catalog.time.monotonic", return_value=1000.0)
+    service = OptionalExtraService(mock_cursor)
+    await optional_extra_catalog.load(service.db)
+    assert mock_select.call_count == 2
+
+    await optional_extra_catalog.get_many(service.db, [99])
+    assert mock_select.call_count == 4
+    await optional_extra_catalog.get_many(service.db, [98])
+    assert mock_select.call_count == 4
+    clock.return_value += optional_extra_catalog.miss_reload_interval
+    await optional_extra_catalog.get_many(service.db, [98])
+    assert mock_select.call_count == 6
 
 @pytest.mark.asyncio
 async def test_get_optional_extra_by_id_success(mocker, mock_cursor, optional_extra):
     mock_select = mocker.patch(
-        "app.services.optional_extra_service.SelectStatementExecutor.execute_select",
+        "app.utils.statements.SelectStatementExecutor.execute_select",
         return_value=[optional_extra.model_dump()]
     )
     service = OptionalExtraService(mock_cursor)
@@ -129,7 +236,7 @@ async def test_get_optional_extra_by_id_success(mocker, mock_cursor, optional_ex
 @pytest.mark.asyncio
 async def test_get_optional_extra_by_id_not_found(mocker, mock_cursor):
     mocker.patch(
-        "app.services.optional_extra_service.SelectStatementExecutor.execute_select",
+        "app.utils.statements.SelectStatementExecutor.execute_select",
         return_value=[]
     )
     service = OptionalExtraService(mock_cursor)
@@ -142,4 +249,4 @@ def test_format_optional_extras(optional_extra):
     extras = [optional_extra.model_dump()]
     result = service.format_optional_extras(extras)
     assert isinstance(result, list)
-    assert result[0]["extra_id"] == optional_extra.extra_id
\ No newline at end of file
+    assert result == [optional_extra]
\ No newline at end of file
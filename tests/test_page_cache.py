@@ -0,0 +1,121 @@
+import gzip
+import os
+
+import brotli
+import pytest
+from fastapi.templating import Jinja2Templates
+from starlette.requests import Request
+
+from app.utils.page_cache import PageCache
+
+class FakeAssets:
+    def __init__(self):
+        self.version = "v1"
+
+    def url(self, name):
+        return f"/app/static/{self.version}/{name}"
+
+def make_request(headers=None):
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": "/",
+        "headers": [(key.lower().encode(), value.encode()) for key, value in (headers or {}).items()]
+    })
+
+@pytest.fixture
+def template_dir(tmp_path):
+    (tmp_path / "base.html").write_text("<html>{% include 'header.html' %}{% block content %}{% endblock %}</html>")
+    (tmp_path / "header.html").write_text("<h1>Header</h1>")
+    (tmp_path / "index.html").write_text(
+        "{% extends 'base.html' %}{% block content %}<script src=\"{{ static_url('js/index.js') }}\"></script>"
+        + "<p>policy</p>" * 200 + "{% endblock %}"
+    )
+    return tmp_path
+
+@pytest.fixture
+def assets():
+    return FakeAssets()
+
+def make_cache(template_dir, assets, check_sources=False):
+    templates = Jinja2Templates(directory=str(template_dir))
+    templates.env.globals["static_url"] = assets.url
+    return PageCache(templates, assets, check_sources=check_sources)
+
+def touch_later(path):
+    later = os.stat(path).st_mtime + 10
+    os.utime(path, (later, later))
+
+def test_page_is_rendered_once(template_dir, assets, mocker):
+    cache = make_cache(template_dir, assets)
+    cache.warm(["index.html"])
+    render = mocker.spy(cache, "_render")
+    first = cache.response(make_request(), "index.html")
+    second = cache.response(make_request(), "index.html")
+    assert render.call_count == 0
+    assert first.body == second.body
+    assert first.body.startswith(b"<html><h1>Header</h1><script src=\"/app/static/v1/js/index.js\">")
+    assert first.headers["content-type"] == "text/html; charset=utf-8"
+    assert first.headers["cache-control"] == "no-cache"
+    assert "last-modified" in first.headers
+
+def test_response_uses_precompressed_variant(template_dir, assets):
+    cache = make_cache(template_dir, assets)
+    plain = cache.response(make_request(), "index.html")
+    br = cache.response(make_request({"Accept-Encoding": "gzip, br"}), "index.html")
+    gz = cache.response(make_request({"Accept-Encoding": "gzip"}), "index.html")
+    assert "content-encoding" not in plain.headers
+    assert br.headers["content-encoding"] == "br"
+    assert brotli.decompress(br.body) == plain.body
+    assert gz.headers["content-encoding"] == "gzip"
+    assert gzip.decompress(gz.body) == plain.body
+    assert len({plain.headers["etag"], br.headers["etag"], gz.headers["etag"]}) == 3
+    assert br.headers["vary"] == "Accept-Encoding"
+
+def test_revalidation_returns_304(template_dir, assets):
+    cache = make_cache(template_dir, assets)
+    first = cache.response(make_request({"Accept-Encoding": "br"}), "index.html")
+
+    response = cache.response(make_request({"Accept-Encoding": "br", "If-None-Match": first.headers["etag"]}), "index.html")
+    assert response.status_code == 304
+    assert response.body == b""
+    assert response.headers["etag"] == first.headers["etag"]
+
+    response = cache.response(make_request({"If-Modified-Since": first.headers["last-modified"]}), "index.html")
+    assert response.status_code == 304
+
+def test_revalidation_with_other_etag_returns_page(template_dir, assets):
+    cache = make_cache(template_dir, assets)
+    first = cache.response(make_request(), "index.html")
+    # The ETag wins over If-Modified-Since
+    response = cache.response(make_request({"If-None-Match": '"other"', "If-Modified-Since": first.headers["last-modified"]}), "index.html")
+    assert response.status_code == 200
+    response = cache.response(make_request({"Accept-Encoding": "br", "If-None-Match": first.headers["etag"]}), "index.html")
+    assert response.status_code == 200
+    response = cache.response(make_request({"If-Modified-Since": "Mon, 01 Jan 2001 00:00:00 GMT"}), "index.html")
+    assert response.status_code == 200
+    response = cache.response(make_request({"If-Modified-Since": "not a date"}), "index.html")
+    assert response.status_code == 200
+
+@pytest.mark.parametrize("template", ["index.html", "base.html", "header.html"])
+def test_template_edit_rerenders_when_checking_sources(template_dir, assets, template):
+    cache = make_cache(template_dir, assets, check_sources=True)
+    before = cache.response(make_request(), "index.html").body
+    content = (template_dir / template).read_text()
+    (template_dir / template).write_text(content.replace("</", "<!-- edited --></", 1))
+    touch_later(template_dir / template)
+    after = cache.response(make_request(), "index.html").body
+    assert b"<!-- edited -->" in after and after != before
+
+def test_template_edit_ignored_without_checking_sources(template_dir, assets):
+    cache = make_cache(template_dir, assets)
+    before = cache.response(make_request(), "index.html").body
+    (template_dir / "header.html").write_text("<h1>Changed</h1>")
+    touch_later(template_dir / "header.html")
+    assert cache.response(make_request(), "index.html").body == before
+
+def test_asset_url_change_rerenders_when_checking_sources(template_dir, assets):
+    cache = make_cache(template_dir, assets, check_sources=True)
+    cache.response(make_request(), "index.html")
+    assets.version = "v2"
+    assert b"/app/static/v2/js/index.js" in cache.response(make_request(), "index.html").body
@@ -0,0 +1,47 @@
+import pytest
+from app.utils.pagination import KeysetPage, encode_cursor, decode_cursor
+from app.utils.config import DEFAULT_PAGE_LIMIT, MAX_PAGE_LIMIT
+from app.utils.messages import Messages
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor(42)) == 42
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", encode_cursor("42"), encode_cursor(True)])
+def test_decode_cursor_invalid(cursor):
+    with pytest.raises(ValueError) as exc:
+        decode_cursor(cursor)
+    assert Messages.INVALID_CURSOR in str(exc.value)
+
+def test_keyset_page_default_limit():
+    page = KeysetPage("user_id")
+    assert page.limit == DEFAULT_PAGE_LIMIT
+    assert page.after is None
+
+@pytest.mark.parametrize("limit", [0, MAX_PAGE_LIMIT + 1])
+def test_keyset_page_invalid_limit(limit):
+    with pytest.raises(ValueError) as exc:
+        KeysetPage("user_id", limit)
+    assert Messages.INVALID_PAGE_LIMIT.format(MAX_PAGE_LIMIT) in str(exc.value)
+
+def test_build_query_first_page():
+    sql, params = KeysetPage("user_id", 10).build_query("*", "Users")
+    assert sql == "SELECT TOP (?) * FROM Users ORDER BY user_id"
+    assert params == (11,)
+
+def test_build_query_with_cursor_and_filter():
+    page = KeysetPage("user_id", 10, encode_cursor(25))
+    sql, params = page.build_query("*", "Users", "username = ?", ("alice",))
+    assert sql == "SELECT TOP (?) * FROM Users WHERE (username = ?) AND user_id > ? ORDER BY user_id"
+    assert params == (11, "alice", 25)
+
+def test_trim_sets_next_cursor_when_more_rows():
+    page = KeysetPage("user_id", 2)
+    rows = page.trim([{"user_id": 1}, {"user_id": 2}, {"user_id": 3}])
+    assert rows == [{"user_id": 1}, {"user_id": 2}]
+    assert decode_cursor(page.next_cursor) == 2
+
+def test_trim_last_page_has_no_cursor():
+    page = KeysetPage("user_id", 2)
+    rows = page.trim([{"user_id": 1}])
+    assert rows == [{"user_id": 1}]
+    assert page.next_cursor is None
@@ -0,0 +1,19 @@
+import pytest
+from app.utils.projection import parse_fields, project, select_list
+from app.utils.messages import Messages
+
+def test_parse_fields_none():
+    assert parse_fields(None, ["user_id", "username"], "user_id") is None
+
+def test_parse_fields_keeps_key_first_and_dedupes():
+    assert parse_fields("email, username,email", ["user_id", "username", "email"], "user_id") == ["user_id", "email", "username"]
+
+def test_parse_fields_rejects_unknown_field():
+    with pytest.raises(ValueError) as exc:
+        parse_fields("username,password", ["user_id", "username"], "user_id")
+    assert exc.value.args[0].status == 400
+    assert exc.value.args[0].message == Messages.INVALID_FIELD.format("password")
+
+def test_select_list_and_project():
+    assert select_list(["ci_policy_id", "vrn"], "p.") == "p.ci_policy_id, p.vrn"
+    assert project({"user_id": 1, "username": "alice", "email": "a@example.com"}, ["user_id", "email"]) == {"user_id": 1, "email": "a@example.com"}
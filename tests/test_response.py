@@ -0,0 +1,29 @@
+import json
+from datetime import date
+from http import HTTPStatus
+
+import pytest
+from fastapi.responses import JSONResponse
+from pydantic_core import PydanticSerializationError
+
+from app.models.optional_extra import OptionalExtra
+from app.utils.response import FastJSONResponse
+from app.utils.rows import Row, column_index
+
+def test_matches_json_response_for_plain_content():
+    content = {"message": "ok", "items": [1, 2.5, None, True], "name": "Zoë"}
+    assert json.loads(FastJSONResponse(content).body) == json.loads(JSONResponse(content).body)
+
+def test_serialises_models_rows_dates_and_enums():
+    row = Row(column_index([("ci_policy_id",), ("start_date",)]), (1, date(2025, 1, 1)))
+    extra = OptionalExtra(extra_id=1, name="Roadside Assistance", code="RA001", price=50.0)
+    response = FastJSONResponse({"status": HTTPStatus.CREATED, "policy": row, "optional_extras": [extra]})
+    assert json.loads(response.body) == {
+        "status": 201,
+        "policy": {"ci_policy_id": 1, "start_date": "2025-01-01"},
+        "optional_extras": [{"extra_id": 1, "name": "Roadside Assistance", "code": "RA001", "price": 50.0}]
+    }
+
+def test_rejects_unknown_types():
+    with pytest.raises(PydanticSerializationError):
+        FastJSONResponse({"value": object()})
@@ -0,0 +1,24 @@
+from app.utils.rows import Row, column_index
+
+def make_rows():
+    index = column_index([("id",), ("name",), ("start_date",)])
+    return [Row(index, (1, "Alice", None)), Row(index, (2, "Bob", None))]
+
+def test_row_lookup_by_name():
+    row = make_rows()[0]
+    assert row["id"] == 1
+    assert row["name"] == "Alice"
+    assert row.get("missing") is None
+    assert "name" in row
+    assert list(row) == ["id", "name", "start_date"]
+    assert len(row) == 3
+
+def test_row_equals_dict_and_unpacks():
+    row = make_rows()[0]
+    assert row == {"id": 1, "name": "Alice", "start_date": None}
+    assert {"id": 1, "name": "Alice", "start_date": None} == row
+    assert dict(**row) == {"id": 1, "name": "Alice", "start_date": None}
+
+def test_rows_share_column_index():
+    first, second = make_rows()
+    assert first._index is second._index
@@ -46,19 +46,37 @@ def test_select_statement_executor_db_error(mock_cursor):
         executor.execute_select("SELECT * FROM test")
     assert Messages.DB_ERROR in str(exc.value)
 
+def test_select_statement_executor_iter_select(mock_cursor):
+    mock_cursor.description = [("id",), ("name",)]
+    mock_cursor.fetchmany.side_effect = [[(1, "Alice"), (2, "Bob")], [(3, "Carol")], []]
+    executor = SelectStatementExecutor(mock_cursor)
+    result = list(executor.iter_select("SELECT * FROM test", batch_size=2))
+    assert result == [{"id": 1, "name": "Alice"}, {"id": 2, "name": "Bob"}, {"id": 3, "name": "Carol"}]
+    mock_cursor.fetchall.assert_not_called()
+    mock_cursor.fetchmany.assert_called_with(2)
+
+def test_select_statement_executor_iter_select_db_error(mock_cursor):
+    mock_cursor.description = [("id",)]
+    mock_cursor.fetchmany.side_effect = Exception("some db error")
+    executor = SelectStatementExecutor(mock_cursor)
+    with pytest.raises(ValueError) as exc:
+        list(executor.iter_select("SELECT * FROM test"))
+    assert Messages.DB_ERROR in str(exc.value)
+    mock_cursor.connection.rollback.assert_not_called()
+
 def test_insert_statement_executor_success(mock_cursor):
     mock_cursor.fetchone.return_value = [42]
     executor = InsertStatementExecutor(mock_cursor)
     result = executor.execute_insert("INSERT INTO test VALUES (1)")
     assert result == 42
-    mock_cursor.connection.commit.assert_called_once()
+    mock_cursor.connection.commit.assert_not_called()
 
 def test_insert_statement_executor_success_params(mock_cursor):
     mock_cursor.fetchone.return_value = [42]
     executor = InsertStatementExecutor(mock_cursor)
     result = executor.execute_insert("INSERT INTO test VALUES (?)", (1))
     assert result == 42
-    mock_cursor.connection.commit.assert_called_once()    
+    mock_cursor.connection.commit.assert_not_called()    
 
 def test_insert_statement_executor_unique_constraint(mock_cursor):
     mock_cursor.execute.side_effect = Exception(UNIQUE_KEY_CONSTRAINT)
@@ -82,6 +100,22 @@ def test_insert_statement_executor_db_error(mock_cursor):
     assert Messages.DB_ERROR in str(exc.value)
 
 # test insert many
+def test_insert_returning_statement_executor_success(mock_cursor):
+    mock_cursor.description = [("ci_policy_id",), ("policy_number",)]
+    mock_cursor.fetchall.return_value = [(1, "POLA"), (2, "POLB")]
+    executor = InsertStatementExecutor(mock_cursor)
+    result = executor.execute_insert_returning("INSERT INTO test OUTPUT INSERTED.id VALUES (?), (?)", ("POLA", "POLB"))
+    assert result == [{"ci_policy_id": 1, "policy_number": "POLA"}, {"ci_policy_id": 2, "policy_number": "POLB"}]
+    mock_cursor.connection.commit.assert_not_called()
+
+def test_insert_returning_statement_executor_unique_constraint(mock_cursor):
+    mock_cursor.execute.side_effect = Exception(UNIQUE_KEY_CONSTRAINT)
+    executor = InsertStatementExecutor(mock_cursor)
+    with pytest.raises(ValueError) as exc:
+        executor.execute_insert_returning("INSERT INTO test OUTPUT INSERTED.id VALUES (?)", (1,))
+    assert Messages.DUPLICATION_ERROR in str(exc.value)
+    mock_cursor.connection.rollback.assert_not_called()
+
 def test_insert_many_statement_executor_success(mock_cursor):
     mock_cursor.executemany.return_value = None
     executor = InsertStatementExecutor(mock_cursor)
@@ -117,17 +151,36 @@ def test_insert_many_statement_executor_db_error(mock_cursor):
         executor.execute_insert_many("INSERT INTO test VALUES (?)", [(1), (2)])
     assert Messages.DB_ERROR in str(exc.value)
 
+def test_insert_many_statement_executor_small_batch_row_by_row(mock_cursor, mocker):
+    mocker.patch("app.utils.statements.BULK_EXECUTEMANY_THRESHOLD", 3)
+    mock_cursor.fast_executemany = False
+    seen = []
+    mock_cursor.executemany.side_effect = lambda query, params: seen.append(mock_cursor.fast_executemany)
+    executor = InsertStatementExecutor(mock_cursor)
+    executor.execute_insert_many("INSERT INTO test VALUES (?, ?)", [(1, 1), (1, 2)])
+    assert seen == [False]
+
+def test_insert_many_statement_executor_bulk_uses_fast_executemany(mock_cursor, mocker):
+    mocker.patch("app.utils.statements.BULK_EXECUTEMANY_THRESHOLD", 3)
+    mock_cursor.fast_executemany = False
+    seen = []
+    mock_cursor.executemany.side_effect = lambda query, params: seen.append(mock_cursor.fast_executemany)
+    executor = InsertStatementExecutor(mock_cursor)
+    executor.execute_insert_many("INSERT INTO test VALUES (?, ?)", [(1, 1), (1, 2), (1, 3)])
+    assert seen == [True]
+    assert mock_cursor.fast_executemany is False
+
 def test_update_statement_executor_success(mock_cursor):
     mock_cursor.rowcount = 1
     executor = UpdateStatementExecutor(mock_cursor)
     executor.execute_update("UPDATE test SET name='Alice' WHERE id=1")
-    mock_cursor.connection.commit.assert_called_once()
+    mock_cursor.connection.commit.assert_not_called()
 
 def test_update_statement_executor_success_params(mock_cursor):
     mock_cursor.rowcount = 1
     executor = UpdateStatementExecutor(mock_cursor)
     executor.execute_update("UPDATE test SET name='Alice' WHERE id=?", (1))
-    mock_cursor.connection.commit.assert_called_once()
+    mock_cursor.connection.commit.assert_not_called()
 
 def test_update_statement_executor_not_found(mock_cursor):
     mock_cursor.rowcount = 0
@@ -157,17 +210,23 @@ def test_update_statement_executor_db_error(mock_cursor):
         executor.execute_update("UPDATE test SET name='Alice' WHERE id=1")
     assert Messages.DB_ERROR in str(exc.value)
 
+def test_delete_statement_executor_allows_no_rows(mock_cursor):
+    mock_cursor.rowcount = 0
+    executor = DeleteStatementExecutor(mock_cursor)
+    executor.execute_delete("DELETE FROM test WHERE parent_id = ?", (1,), require_rows=False)
+    mock_cursor.connection.commit.assert_not_called()
+
 def test_delete_statement_executor_success_params(mock_cursor):
     mock_cursor.rowcount = 1
     executor = DeleteStatementExecutor(mock_cursor)
     executor.execute_delete("DELETE FROM test WHERE id=?", (1))
-    mock_cursor.connection.commit.assert_called_once()
+    mock_cursor.connection.commit.assert_not_called()
 
 def test_delete_statement_executor_success(mock_cursor):
     mock_cursor.rowcount = 1
     executor = DeleteStatementExecutor(mock_cursor)
     executor.execute_delete("DELETE FROM test WHERE id=1")
-    mock_cursor.connection.commit.assert_called_once()
+    mock_cursor.connection.commit.assert_not_called()
 
 def test_delete_statement_executor_not_found(mock_cursor):
     mock_cursor.rowcount = 0
@@ -187,18 +246,27 @@ def test_delete_many_statement_executor_success(mock_cursor):
     mock_cursor.rowcount = 1
     executor = DeleteStatementExecutor(mock_cursor)
     executor.execute_delete_many("DELETE FROM test WHERE id=1")
-    mock_cursor.connection.commit.assert_called_once()
+    mock_cursor.connection.commit.assert_not_called()
 
 def test_delete_many_statement_executor_success_params(mock_cursor):
     mock_cursor.rowcount = 1
     executor = DeleteStatementExecutor(mock_cursor)
     executor.execute_delete_many("DELETE FROM test WHERE id=?", [(1), (2)])
-    mock_cursor.connection.commit.assert_called_once()
+    mock_cursor.connection.commit.assert_not_called()
 
 def test_delete_many_statement_executor_db_error(mock_cursor):
     mock_cursor.rowcount = -1
     mock_cursor.executemany.side_effect = Exception("db error")
     executor = DeleteStatementExecutor(mock_cursor)
     with pytest.raises(ValueError) as exc:
-        executor.execute_delete_many("DELETE FROM test WHERE id=?", [(1), (2)], False)
-    assert Messages.DB_ERROR in str(exc.value)
\ No newline at end of file
+        executor.execute_delete_many("DELETE FROM test WHERE id=?", [(1), (2)])
+    assert Messages.DB_ERROR in str(exc.value)
+
+def test_delete_many_statement_executor_bulk_restores_flag_on_error(mock_cursor, mocker):
+    mocker.patch("app.utils.statements.BULK_EXECUTEMANY_THRESHOLD", 2)
+    mock_cursor.fast_executemany = False
+    mock_cursor.executemany.side_effect = Exception("db error")
+    executor = DeleteStatementExecutor(mock_cursor)
+    with pytest.raises(ValueError):
+        executor.execute_delete_many("DELETE FROM test WHERE id=?", [(1,), (2,)])
+    assert mock_cursor.fast_executemany is False
@@ -0,0 +1,119 @@
+import pytest
+from app.utils.unit_of_work import UnitOfWork, transaction, after_commit, touch_tables
+from app.utils.table_versions import set_versions_table_exists
+
+@pytest.fixture
+def mock_db(mocker):
+    db = mocker.Mock()
+    db.connection = mocker.Mock()
+    return db
+
+@pytest.fixture
+def pool(mocker, mock_db):
+    pool = mocker.Mock()
+    pool.acquire_async = mocker.AsyncMock(return_value=mock_db)
+    pool.release_async = mocker.AsyncMock()
+    return pool
+
+@pytest.mark.asyncio
+async def test_transaction_commits_once_on_success(pool, mock_db):
+    async with transaction(pool) as unit_of_work:
+        assert isinstance(unit_of_work, UnitOfWork)
+        assert await unit_of_work.begin() is mock_db.connection.cursor.return_value
+        assert await unit_of_work.begin() is mock_db.connection.cursor.return_value
+    pool.acquire_async.assert_called_once()
+    mock_db.connection.commit.assert_called_once()
+    mock_db.connection.rollback.assert_not_called()
+    pool.release_async.assert_called_once_with(mock_db, False)
+
+@pytest.mark.asyncio
+async def test_transaction_without_begin_never_checks_out(pool):
+    async with transaction(pool):
+        pass
+    pool.acquire_async.assert_not_called()
+    pool.release_async.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_transaction_rolls_back_on_error(pool, mock_db):
+    with pytest.raises(ValueError):
+        async with transaction(pool) as unit_of_work:
+            await unit_of_work.begin()
+            raise ValueError("boom")
+    mock_db.connection.rollback.assert_called_once()
+    mock_db.connection.commit.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_nested_transaction_restores_outer_unit_of_work(pool, mock_db, mocker):
+    async with transaction(pool) as outer:
+        await outer.begin()
+        async with transaction(pool):
+            pass
+        touch_tables("Users")
+        assert outer._touched_tables == {"Users"}
+    callback = mocker.Mock()
+    after_commit(callback)
+    callback.assert_called_once()
+
+@pytest.mark.asyncio
+async def test_after_commit_runs_only_after_commit(pool, mocker):
+    callback = mocker.Mock()
+    async with transaction(pool):
+        after_commit(callback)
+        callback.assert_not_called()
+    callback.assert_called_once()
+
+@pytest.mark.asyncio
+async def test_after_commit_discarded_on_rollback(pool, mocker):
+    callback = mocker.Mock()
+    with pytest.raises(ValueError):
+        async with transaction(pool):
+            after_commit(callback)
+            raise ValueError("boom")
+    callback.assert_not_called()
+
+def test_after_commit_outside_unit_of_work_runs_immediately(mocker):
+    callback = mocker.Mock()
+    after_commit(callback)
+    callback.assert_called_once()
+
+@pytest.mark.asyncio
+async def test_touched_tables_bumped_before_commit(pool, mock_db, mocker):
+    manager = mocker.Mock()
+    cursor = mock_db.connection.cursor.return_value
+    manager.attach_mock(cursor.execute, "execute")
+    manager.attach_mock(mock_db.connection.commit, "commit")
+    async with transaction(pool) as unit_of_work:
+        await unit_of_work.begin()
+        touch_tables("Users", "CarInsurancePolicy")
+        touch_tables("Users")
+    assert [call[0] for call in manager.mock_calls] == ["execute", "commit"]
+    sql, params = cursor.execute.call_args.args
+    assert "UPDATE TableVersions SET version = version + 1" in sql
+    assert params == ("CarInsurancePolicy", "Users")
+
+@pytest.mark.asyncio
+async def test_touched_tables_not_bumped_without_versions_table(pool, mock_db):
+    set_versions_table_exists(None)
+    cursor = mock_db.connection.cursor.return_value
+    cursor.fetchone.return_value = (None,)
+    async with transaction(pool) as unit_of_work:
+        await unit_of_work.begin()
+        touch_tables("Users")
+    assert "OBJECT_ID" in cursor.execute.call_args.args[0]
+    cursor.execute.assert_called_once()
+    mock_db.connection.commit.assert_called_once()
+
+@pytest.mark.asyncio
+async def test_touched_tables_discarded_on_rollback(pool, mock_db):
+    with pytest.raises(ValueError):
+        async with transaction(pool) as unit_of_work:
+            await unit_of_work.begin()
+            touch_tables("Users")
+            raise ValueError("boom")
+    mock_db.connection.cursor.return_value.execute.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_commit_without_writes_does_not_bump(pool, mock_db):
+    async with transaction(pool) as unit_of_work:
+        await unit_of_work.begin()
+    mock_db.connection.cursor.return_value.execute.assert_not_called()
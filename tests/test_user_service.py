@@ -2,6 +2,10 @@ import pytest
 from app.services.user_service import UserService
 from app.models.user import User
 from app.utils.messages import Messages
+from app.utils.cache import user_cache
+from app.utils.auth import token_revocations
+from app.models.principal import Principal
+import time
 
 @pytest.fixture
 def mock_cursor(mocker):
@@ -14,7 +18,7 @@ def user():
 @pytest.mark.asyncio
 async def test_get_user_by_id_success(mocker, mock_cursor, user):
     mocker.patch(
-        "app.services.user_service.SelectStatementExecutor.execute_select",
+        "app.utils.statements.SelectStatementExecutor.execute_select",
         return_value=[user.model_dump()]
     )
     service = UserService(mock_cursor)
@@ -22,6 +26,30 @@ async def test_get_user_by_id_success(mocker, mock_cursor, user):
     assert isinstance(result, User)
     assert result.user_id == user.user_id
 
+@pytest.mark.asyncio
+async def test_get_requesting_user_is_cached(mocker, mock_cursor, user):
+    mock_select = mocker.patch(
+        "app.utils.statements.SelectStatementExecutor.execute_select",
+        return_value=[user.model_dump()]
+    )
+    service = UserService(mock_cursor)
+    first = await service.get_requesting_user(user.user_id)
+    second = await service.get_requesting_user(user.user_id)
+    assert first == second
+    assert first.password is None
+    mock_select.assert_called_once()
+
+@pytest.mark.asyncio
+async def test_get_requesting_user_returns_copy(mocker, mock_cursor, user):
+    mocker.patch(
+        "app.utils.statements.SelectStatementExecutor.execute_select",
+        return_value=[user.model_dump()]
+    )
+    service = UserService(mock_cursor)
+    first = await service.get_requesting_user(user.user_id)
+    first.is_admin = False
+    assert (await service.get_requesting_user(user.user_id)).is_admin is True
+
 @pytest.mark.asyncio
 async def test_get_user_by_id_forbidden(mocker, mock_cursor, user):
     other_user = User(user_id=2, username="bob", password="", email="bob@example.com", is_admin=False)
@@ -33,7 +61,7 @@ async def test_get_user_by_id_forbidden(mocker, mock_cursor, user):
 @pytest.mark.asyncio
 async def test_get_user_by_id_not_found(mocker, mock_cursor, user):
     mocker.patch(
-        "app.services.user_service.SelectStatementExecutor.execute_select",
+        "app.utils.statements.SelectStatementExecutor.execute_select",
         return_value=[]
     )
     service = UserService(mock_cursor)
@@ -44,7 +72,7 @@ async def test_get_user_by_id_not_found(mocker, mock_cursor, user):
 @pytest.mark.asyncio
 async def test_authenticate_user_success(mocker, mock_cursor, user):
     mocker.patch(
-        "app.services.user_service.SelectStatementExecutor.execute_select",
+        "app.utils.statements.SelectStatementExecutor.execute_select",
         return_value=[user.model_dump()]
     )
     service = UserService(mock_cursor)
@@ -55,7 +83,7 @@ async def test_authenticate_user_success(mocker, mock_cursor, user):
 @pytest.mark.asyncio
 async def test_authenticate_user_invalid(mocker, mock_cursor):
     mocker.patch(
-        "app.services.user_service.SelectStatementExecutor.execute_select",
+        "app.utils.statements.SelectStatementExecutor.execute_select",
         return_value=[]
     )
     service = UserService(mock_cursor)
@@ -66,7 +94,7 @@ async def test_authenticate_user_invalid(mocker, mock_cursor):
 @pytest.mark.asyncio
 async def test_create_user(mocker, mock_cursor, user):
     mocker.patch(
-        "app.services.user_service.InsertStatementExecutor.execute_insert",
+        "app.utils.statements.InsertStatementExecutor.execute_insert",
         return_value=42
     )
     service = UserService(mock_cursor)
@@ -82,13 +110,16 @@ async def test_update_user_success(mocker, mock_cursor, user):
         return_value=user
     )
     mock_update = mocker.patch(
-        "app.services.user_service.UpdateStatementExecutor.execute_update",
+        "app.utils.statements.UpdateStatementExecutor.execute_update",
         return_value=None
     )
+    user_cache.set(user.user_id, user)
     service = UserService(mock_cursor)
     updated = User(user_id=1, username="alice2", password="", email="alice2@example.com", is_admin=True)
     await service.update_user(updated)
     mock_update.assert_called_once()
+    assert user_cache.get(user.user_id) is None
+    assert token_revocations.is_revoked(user.user_id, int(time.time()) - 1)
 
 @pytest.mark.asyncio
 async def test_update_user_no_change(mocker, mock_cursor, user):
@@ -123,12 +154,18 @@ async def test_delete_user_success(mocker, mock_cursor, user):
         return_value=user
     )
     mock_delete = mocker.patch(
-        "app.services.user_service.DeleteStatementExecutor.execute_delete",
+        "app.utils.statements.DeleteStatementExecutor.execute_delete",
         return_value=None
     )
+    user_cache.set(user.user_id, user)
     service = UserService(mock_cursor)
     await service.delete_user(user.user_id)
-    mock_delete.assert_called_once()
+    # Extras, policies and the user, committed together by the request's unit of work
+    assert mock_delete.call_count == 3
+    assert "WHERE ci_policy_id IN (SELECT ci_policy_id FROM CarInsurancePolicy WHERE user_id = ?)" in mock_delete.call_args_list[0].args[0]
+    mock_cursor.commit.assert_not_called()
+    assert user_cache.get(user.user_id) is None
+    assert token_revocations.is_revoked(user.user_id, int(time.time()) - 1)
 
 @pytest.mark.asyncio
 async def test_delete_user_not_found(mocker, mock_cursor):
@@ -142,6 +179,39 @@ async def test_delete_user_not_found(mocker, mock_cursor):
         await service.delete_user(999)
     assert Messages.USER_NOT_FOUND in str(exc.value)
 
+@pytest.mark.asyncio
+async def test_resolve_principal_trusts_role_claims(mocker, mock_cursor):
+    mock_lookup = mocker.patch.object(UserService, "get_requesting_user")
+    principal = Principal(user_id=2, username="bob", is_admin=False, issued_at=int(time.time()))
+    service = UserService(mock_cursor)
+    assert await service.resolve_principal(principal) is principal
+    mock_lookup.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_resolve_principal_legacy_token_uses_lookup(mocker, mock_cursor, user):
+    mock_lookup = mocker.patch.object(UserService, "get_requesting_user", return_value=user)
+    service = UserService(mock_cursor)
+    resolved = await service.resolve_principal(Principal(user_id=user.user_id, username=user.username))
+    mock_lookup.assert_called_once_with(user.user_id)
+    assert resolved.is_admin is True
+
+@pytest.mark.asyncio
+async def test_resolve_principal_revoked_claims_use_lookup(mocker, mock_cursor, user):
+    demoted = User(user_id=1, username="alice", password=None, email="alice@example.com", is_admin=False)
+    mock_lookup = mocker.patch.object(UserService, "get_requesting_user", return_value=demoted)
+    issued_at = int(time.time()) - 1
+    token_revocations.revoke(user.user_id)
+    service = UserService(mock_cursor)
+    resolved = await service.resolve_principal(Principal(user_id=1, username="alice", is_admin=True, issued_at=issued_at))
+    mock_lookup.assert_called_once_with(1)
+    assert resolved.is_admin is False
+
+def test_token_revocations_ignore_tokens_issued_later():
+    token_revocations.revoke(5)
+    assert token_revocations.is_revoked(5, int(time.time()) - 1)
+    assert not token_revocations.is_revoked(5, int(time.time()) + 1)
+    assert not token_revocations.is_revoked(6, int(time.time()) - 1)
+
 def test_check_admin_success(mock_cursor, user):
     service = UserService(mock_cursor)
     assert service.check_admin(user) is True
@@ -153,6 +223,22 @@ def test_check_admin_forbidden(mock_cursor):
         service.check_admin(user)
     assert Messages.USER_NO_PERMISSION in str(exc.value)
 
+def test_check_read_permissions_admin(mock_cursor, user):
+    service = UserService(mock_cursor)
+    assert service.check_read_permissions(user, 2) is True
+
+def test_check_read_permissions_self(mock_cursor):
+    user = User(user_id=2, username="bob", password="", email="bob@example.com", is_admin=False)
+    service = UserService(mock_cursor)
+    assert service.check_read_permissions(user, 2) is True
+
+def test_check_read_permissions_forbidden(mock_cursor):
+    user = User(user_id=2, username="bob", password="", email="bob@example.com", is_admin=False)
+    service = UserService(mock_cursor)
+    with pytest.raises(ValueError) as exc:
+        service.check_read_permissions(user, 1)
+    assert Messages.USER_NO_PERMISSION in str(exc.value)
+
 def test_check_update_permissions_admin(mock_cursor, user):
     service = UserService(mock_cursor)
     assert service.check_update_permissions(user, 1) is True
@@ -175,31 +261,11 @@ def test_check_update_permissions_no_exception(mocker, mock_cursor):
     result = service.check_update_permissions(user, 1, throw_exception=False)
     assert result is False
 
-@pytest.mark.asyncio
-async def test_check_user_owns_policy_true(mocker, mock_cursor, user):
-    mocker.patch(
-        "app.services.user_service.SelectStatementExecutor.execute_select",
-        return_value=[{"ci_policy_id": 1, "user_id": user.user_id}]
-    )
-    service = UserService(mock_cursor)
-    result = await service.check_user_owns_policy(user, 1)
-    assert result is True
-
-@pytest.mark.asyncio
-async def test_check_user_owns_policy_false(mocker, mock_cursor, user):
-    mocker.patch(
-        "app.services.user_service.SelectStatementExecutor.execute_select",
-        return_value=[]
-    )
-    service = UserService(mock_cursor)
-    result = await service.check_user_owns_policy(user, 1)
-    assert result is False
-
 @pytest.mark.asyncio
 async def test_list_all_users_success(mocker, mock_cursor, user):
     mocker.patch.object(UserService, "check_admin", return_value=True)
     mocker.patch(
-        "app.services.user_service.SelectStatementExecutor.execute_select",
+        "app.utils.statements.SelectStatementExecutor.execute_select",
         return_value=[user.model_dump()]
     )
     mocker.patch.object(UserService, "format_users", return_value=["formatted_user"])
@@ -211,7 +277,7 @@ async def test_list_all_users_success(mocker, mock_cursor, user):
 async def test_filter_users_success(mocker, mock_cursor, user):
     mocker.patch.object(UserService, "check_admin", return_value=True)
     mocker.patch(
-        "app.services.user_service.SelectStatementExecutor.execute_select",
+        "app.utils.statements.SelectStatementExecutor.execute_select",
         return_value=[user.model_dump()]
     )
     mocker.patch.object(UserService, "format_users", return_value=["formatted_user"])
@@ -219,6 +285,37 @@ async def test_filter_users_success(mocker, mock_cursor, user):
     result = await service.filter_users(user, "username", "alice")
     assert result == ["formatted_user"]
 
+@pytest.mark.asyncio
+async def test_list_all_users_paginated(mocker, mock_cursor, user):
+    mocker.patch.object(UserService, "check_admin", return_value=True)
+    second = User(user_id=2, username="bob", password="", email="bob@example.com", is_admin=False)
+    mock_select = mocker.patch(
+        "app.utils.statements.SelectStatementExecutor.execute_select",
+        return_value=[user.model_dump(), second.model_dump()]
+    )
+    service = UserService(mock_cursor)
+    result = await service.list_all_users(user, limit=1)
+    assert [u.user_id for u in result] == [user.user_id]
+    assert service.next_cursor is not None
+    mock_select.assert_called_once_with("SELECT TOP (?) user_id, username, email, is_admin FROM Users ORDER BY user_id", (2,))
+
+    mock_select.return_value = [second.model_dump()]
+    result = await service.list_all_users(user, limit=1, cursor=service.next_cursor)
+    assert [u.user_id for u in result] == [second.user_id]
+    assert service.next_cursor is None
+    mock_select.assert_called_with("SELECT TOP (?) user_id, username, email, is_admin FROM Users WHERE user_id > ? ORDER BY user_id", (2, user.user_id))
+
+@pytest.mark.asyncio
+async def test_get_user_by_id_never_selects_password_for_reads(mocker, mock_cursor, user):
+    mock_select = mocker.patch(
+        "app.utils.statements.SelectStatementExecutor.execute_select",
+        return_value=[{"user_id": user.user_id, "email": user.email}]
+    )
+    service = UserService(mock_cursor)
+    result = await service.get_user_by_id(user.user_id, requesting_user=user, format=True, fields=["user_id", "email"])
+    assert result == [{"user_id": user.user_id, "email": user.email}]
+    assert mock_select.call_args[0][0] == "SELECT user_id, email FROM Users WHERE user_id = ?"
+
 @pytest.mark.asyncio
 async def test_filter_users_invalid_field(mocker, mock_cursor, user):
     mocker.patch.object(UserService, "check_admin", return_value=True)
@@ -231,7 +328,7 @@ async def test_filter_users_invalid_field(mocker, mock_cursor, user):
 async def test_filter_users_not_found(mocker, mock_cursor, user):
     mocker.patch.object(UserService, "check_admin", return_value=True)
     mocker.patch(
-        "app.services.user_service.SelectStatementExecutor.execute_select",
+        "app.utils.statements.SelectStatementExecutor.execute_select",
         return_value=[]
     )
     service = UserService(mock_cursor)
@@ -244,7 +341,11 @@ def test_format_users(user):
     users = [user.model_dump()]
     result = service.format_users(users)
     assert isinstance(result, list)
-    assert result[0]["user_id"] == user.user_id
+    assert result[0].user_id == user.user_id
+    # The password is never exposed
+    assert result[0].password is None
+    # Sparse fieldset rows already hold only the selected columns
+    assert service.format_users(users, ["user_id"]) is users
 
 @pytest.mark.asyncio
 async def test_update_user_password_success(mocker, mock_cursor, user):
@@ -255,12 +356,14 @@ async def test_update_user_password_success(mocker, mock_cursor, user):
         return_value=user
     )
     mock_update = mocker.patch(
-        "app.services.user_service.UpdateStatementExecutor.execute_update",
+        "app.utils.statements.UpdateStatementExecutor.execute_update",
         return_value=None
     )
+    user_cache.set(user.user_id, user)
     service = UserService(mock_cursor)
     await service.update_user_password(user.user_id, "newpassword")
     mock_update.assert_called_once_with("UPDATE Users SET password = ? WHERE user_id = ?", ("newpassword", user.user_id))
+    assert user_cache.get(user.user_id) is None
 
 @pytest.mark.asyncio
 async def test_update_user_password_user_not_found(mocker, mock_cursor, user):